@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for building trakt.calendar objects"""
+import pytest
+
+from trakt.calendar import ShowCalendar
+
+from benchmarks import data
+
+
+@pytest.mark.parametrize('scale', data.SCALES)
+def test_calendar_build(transport, measure, scale):
+    transport.add('GET', 'calendars/all/shows/2014-07-01/7', [])
+    calendar = ShowCalendar('2014-07-01')
+    measure(calendar._build, scale, payload=data.calendar(scale))
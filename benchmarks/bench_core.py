@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for request dispatch and JSON decoding in trakt.core"""
+import pytest
+
+from trakt.core import Core
+from trakt.transport import MemoryTransport
+
+from benchmarks import data
+
+
+@pytest.fixture
+def core():
+    return Core(transport=MemoryTransport())
+
+
+def test_get_dispatch(core, measure):
+    """The fixed cost of a decorated GET, from generator to result"""
+    core.transport.add('GET', 'ping', {})
+
+    @core.get
+    def ping():
+        result = yield 'ping'
+        yield result
+
+    measure(ping, 1)
+
+
+@pytest.mark.parametrize('scale', data.SCALES)
+def test_get_decode(core, measure, scale):
+    """Dispatching a GET whose response is a list of *scale* shows, which is
+    dominated by decoding the JSON body
+    """
+    core.transport.add('GET', 'shows', [data.show_full(i)
+                                        for i in range(scale)])
+
+    @core.get
+    def shows():
+        result = yield 'shows'
+        yield result
+
+    measure(shows, scale)
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for the start up cost of importing trakt in a fresh process"""
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize('statement', ['pass', 'import trakt',
+                                       'import trakt.tv',
+                                       'import trakt.users'])
+def test_import_time(benchmark, statement):
+    """Wall time of starting an interpreter and running *statement*. The
+    'pass' case gives the interpreter's own start up cost as a baseline
+    """
+    benchmark.pedantic(subprocess.check_call,
+                       args=([sys.executable, '-c', statement],),
+                       rounds=10, warmup_rounds=1)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for building trakt.tv model objects from decoded JSON"""
+import json
+import time
+
+import pytest
+
+from trakt import snapshot
+from trakt.extended import hydrate
+from trakt.transport import MemoryTransport
+from trakt.tv import TVEpisode, TVShow
+
+from benchmarks import data
+
+
+@pytest.mark.parametrize('scale', data.SCALES)
+def test_tvshow_build(measure, scale):
+    def build(shows):
+        return [TVShow(**show) for show in shows]
+    measure(build, scale, payload=[data.show_full(i) for i in range(scale)])
+
+
+@pytest.mark.parametrize('scale', data.SCALES)
+def test_tvepisode_build(measure, scale):
+    def build(episodes):
+        return [TVEpisode('Show', **episode) for episode in episodes]
+    measure(build, scale, payload=[data.episode(i) for i in range(scale)])
+
+
+@pytest.mark.parametrize('scale', data.SCALES)
+def test_warm_start_json(measure, scale):
+    """Rebuild a catalog of full shows from its JSON"""
+    encoded = json.dumps([data.show_full(i) for i in range(scale)])
+
+    def load():
+        return [TVShow(**show) for show in json.loads(encoded)]
+    measure(load, scale)
+
+
+@pytest.mark.parametrize('scale', data.SCALES)
+def test_warm_start_snapshot(measure, scale):
+    """Load the same catalog from a snapshot"""
+    encoded = snapshot.dumps([TVShow(**data.show_full(i))
+                              for i in range(scale)])
+    measure(lambda: snapshot.loads(encoded), scale)
+
+
+class LatentTransport(MemoryTransport):
+    """A :class:`MemoryTransport` delaying every response, to model the
+    round trip to trakt
+    """
+    def request(self, *args, **kwargs):
+        time.sleep(0.002)
+        return super(LatentTransport, self).request(*args, **kwargs)
+
+
+@pytest.fixture
+def latent_shows(transport):
+    """Minimal shows whose full data is served with a small latency"""
+    import trakt.core
+    latent = LatentTransport()
+    for i in range(100):
+        latent.add('GET', 'shows/show-{}?extended=full'.format(i),
+                   data.show_full(i))
+    trakt.core.CORE.transport = latent
+
+    def build():
+        return [TVShow(**data.show(i)) for i in range(100)]
+    return build
+
+
+def test_upgrade_serial(measure, latent_shows):
+    def upgrade():
+        for show in latent_shows():
+            show._get()
+    measure(upgrade, 100)
+
+
+def test_upgrade_hydrate(measure, latent_shows):
+    measure(lambda: hydrate(latent_shows()), 100)
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for trakt.sync search results"""
+import pytest
+
+from trakt.sync import get_search_results
+
+from benchmarks import data
+
+
+@pytest.mark.parametrize('scale', data.SCALES)
+def test_get_search_results(transport, measure, scale):
+    transport.add('GET', 'search/movie,show,episode,person?query=batman',
+                  data.search_results(scale))
+    measure(lambda: get_search_results('batman'), scale)
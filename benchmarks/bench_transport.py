@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks comparing the throughput of the transports when many threads
+send concurrent GETs to a single host. Requests go to local stand-in servers
+rather than trakt: a threaded HTTP/1.1 server from the standard library and,
+when the h2 package is installed, a minimal cleartext HTTP/2 server. Each
+server delays its responses slightly to model network latency.
+"""
+import heapq
+import json
+import select
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import pytest
+
+from trakt.core import Core
+from trakt.transport import (HTTPXTransport, SessionTransport,
+                             Urllib3Transport)
+
+from benchmarks import data
+
+#: Simulated server side latency of every response, in seconds
+LATENCY = 0.005
+#: The number of concurrent requests in flight
+CONCURRENCY = 32
+#: The number of requests sent per benchmark round
+REQUESTS = 256
+
+BODY = json.dumps([data.show(i) for i in range(10)]).encode('UTF-8')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class _HTTP1Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def _serve_h2(sock):
+    """Serve a single cleartext HTTP/2 connection. Only this thread touches
+    the connection: responses are scheduled *LATENCY* after their request and
+    sent once due, so that they're multiplexed, with their bodies split to
+    fit the flow control windows granted by the client
+    """
+    import h2.config
+    import h2.connection
+    import h2.events
+
+    conn = h2.connection.H2Connection(
+        h2.config.H2Configuration(client_side=False))
+    conn.initiate_connection()
+    sock.sendall(conn.data_to_send())
+    due, unsent = [], {}
+
+    while True:
+        timeout = None
+        if due:
+            timeout = max(due[0][0] - time.monotonic(), 0)
+        readable, _, _ = select.select([sock], [], [], timeout)
+        if readable:
+            try:
+                chunk = sock.recv(65535)
+            except OSError:
+                break
+            if not chunk:
+                break
+            for event in conn.receive_data(chunk):
+                if isinstance(event, h2.events.RequestReceived):
+                    heapq.heappush(due, (time.monotonic() + LATENCY,
+                                         event.stream_id))
+                elif isinstance(event, h2.events.DataReceived):
+                    conn.acknowledge_received_data(
+                        event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamReset):
+                    unsent.pop(event.stream_id, None)
+        while due and due[0][0] <= time.monotonic():
+            _, stream_id = heapq.heappop(due)
+            conn.send_headers(stream_id, [
+                (':status', '200'), ('content-type', 'application/json'),
+                ('content-length', str(len(BODY)))])
+            unsent[stream_id] = BODY
+        for stream_id, body in list(unsent.items()):
+            while body:
+                size = min(len(body), conn.max_outbound_frame_size,
+                           conn.local_flow_control_window(stream_id))
+                if size <= 0:
+                    break
+                conn.send_data(stream_id, body[:size],
+                               end_stream=size == len(body))
+                body = body[size:]
+            if body:
+                unsent[stream_id] = body
+            else:
+                del unsent[stream_id]
+        sock.sendall(conn.data_to_send())
+    sock.close()
+
+
+def _h2_server():
+    listener = socket.socket()
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(16)
+
+    def accept():
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=_serve_h2, args=(sock,),
+                             daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return listener
+
+
+@pytest.fixture(scope='module')
+def http1_url():
+    server = _HTTP1Server(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield 'http://127.0.0.1:{}/'.format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope='module')
+def http2_url():
+    pytest.importorskip('h2')
+    listener = _h2_server()
+    yield 'http://127.0.0.1:{}/'.format(listener.getsockname()[1])
+    listener.close()
+
+
+def _session_transport():
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=CONCURRENCY)
+    session.mount('http://', adapter)
+    return SessionTransport(session)
+
+
+def _httpx_transport(http2):
+    httpx = pytest.importorskip('httpx')
+    limits = httpx.Limits(max_connections=CONCURRENCY)
+    if http2:
+        # prior knowledge HTTP/2, since the stand-in server has no TLS
+        return HTTPXTransport(http1=False, http2=True, limits=limits)
+    return HTTPXTransport(http2=False, limits=limits)
+
+
+def _run(measure, transport, url):
+    core = Core(transport=transport)
+
+    @core.get
+    def shows(index):
+        result = yield 'shows?index={}'.format(index)
+        yield result
+
+    # Core resolves uris against BASE_URL, so point requests at the server
+    import trakt.core
+    original, trakt.core.BASE_URL = trakt.core.BASE_URL, url
+    try:
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+            def burst():
+                return list(executor.map(shows, range(REQUESTS)))
+            results = measure(burst, REQUESTS)
+    finally:
+        trakt.core.BASE_URL = original
+        close = getattr(transport, 'close', None)
+        if close is not None:
+            close()
+    assert len(results) == REQUESTS
+
+
+def test_session_http1(measure, http1_url):
+    """The default requests session over pooled HTTP/1.1 connections"""
+    _run(measure, _session_transport(), http1_url)
+
+
+def test_urllib3_http1(measure, http1_url):
+    """A bare urllib3 pool over pooled HTTP/1.1 connections"""
+    transport = Urllib3Transport(num_pools=1, maxsize=CONCURRENCY)
+    _run(measure, transport, http1_url)
+
+
+def test_httpx_http1(measure, http1_url):
+    """httpx over pooled HTTP/1.1 connections"""
+    _run(measure, _httpx_transport(http2=False), http1_url)
+
+
+def test_httpx_http2(measure, http2_url):
+    """httpx multiplexing the requests of every thread over the HTTP/2
+    connection of a single client, driven by the transport's event loop
+    """
+    _run(measure, _httpx_transport(http2=True), http2_url)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks for the library properties of trakt.users.User"""
+import pytest
+
+import trakt.core
+from trakt.progress import clear_structures, compute_progress, watched_progress
+from trakt.tv import TVShow
+from trakt.users import User
+
+from benchmarks import data
+from benchmarks.bench_models import LatentTransport
+
+
+@pytest.mark.parametrize('scale', data.SCALES)
+def test_watched_shows(transport, measure, scale):
+    transport.add('GET', 'users/bench/watched/shows',
+                  data.watched_shows(scale))
+    measure(lambda: User('bench', name='Bench').watched_shows, scale)
+
+
+@pytest.mark.parametrize('scale', data.SCALES)
+def test_show_collection(transport, measure, scale):
+    transport.add('GET', 'users/bench/collection/shows?extended=metadata',
+                  data.show_collection(scale))
+    measure(lambda: User('bench', name='Bench').show_collection, scale)
+
+
+@pytest.fixture
+def latent_progress(transport):
+    """The watched shows of a user, and the seasons and watched progress of
+    each show, served with a small latency
+    """
+    latent = LatentTransport()
+    watched = data.watched_shows(100, episodes=12)
+    latent.add('GET', 'users/bench/watched/shows', watched)
+    for i, item in enumerate(watched):
+        seasons = [{'number': n, 'aired_episodes': 10} for n in range(3)]
+        latent.add('GET', 'shows/show-{}/seasons?extended=full'.format(i),
+                   seasons)
+        latent.add('GET', 'shows/show-{}/progress/watched'.format(i),
+                   compute_progress({0: 10, 1: 10, 2: 10}, item['seasons']))
+    trakt.core.CORE.transport = latent
+    clear_structures()
+    yield
+    clear_structures()
+
+
+def test_progress_per_show(measure, latent_progress):
+    def progress():
+        return [TVShow(**data.show(i)).watched_progress for i in range(100)]
+    measure(progress, 100)
+
+
+def test_progress_bulk(measure, latent_progress):
+    measure(lambda: watched_progress('bench'), 100)
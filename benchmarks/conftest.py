@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Fixtures shared by the benchmark suite. The benchmarks never touch the
+network, every request is served from an in-memory transport.
+"""
+import json
+import tracemalloc
+
+import pytest
+
+import trakt.core
+from trakt.transport import MemoryTransport
+
+
+@pytest.fixture
+def transport():
+    """Serve every request made through trakt.core from an empty
+    :class:`MemoryTransport` for the duration of a benchmark
+    """
+    original = trakt.core.CORE.transport
+    memory = MemoryTransport()
+    trakt.core.CORE.transport = memory
+    yield memory
+    trakt.core.CORE.transport = original
+
+
+def peak_memory(fn, *args):
+    """Run *fn* once and return the peak memory it allocated, in KiB"""
+    tracemalloc.start()
+    try:
+        fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak // 1024
+
+
+@pytest.fixture
+def measure(benchmark):
+    """Benchmark *fn* over *items* items, reporting throughput and peak
+    memory in the benchmark's extra info. When *payload* is given it's
+    decoded afresh for every round, since the code under test consumes it.
+    """
+    def run(fn, items, payload=None):
+        if payload is None:
+            peak = peak_memory(fn)
+            result = benchmark(fn)
+        else:
+            encoded = json.dumps(payload)
+
+            def setup():
+                return (json.loads(encoded),), {}
+
+            peak = peak_memory(fn, json.loads(encoded))
+            result = benchmark.pedantic(fn, setup=setup, rounds=5)
+        benchmark.extra_info.update(items=items, peak_memory_kib=peak)
+        stats = getattr(benchmark.stats, 'stats', None)
+        if stats is not None and stats.mean:
+            benchmark.extra_info['items_per_second'] = int(items / stats.mean)
+        return result
+    return run
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Generators for synthetic Trakt API payloads of arbitrary size"""
+import os
+
+#: The number of items each scaled benchmark is run with. May be overridden
+#: with a comma separated TRAKT_BENCH_SCALES environment variable
+SCALES = [int(s) for s in
+          os.environ.get('TRAKT_BENCH_SCALES', '1000,10000,100000').split(',')]
+
+
+def show(i):
+    """A minimal show object"""
+    return {'title': 'Show {}'.format(i), 'year': 2000 + i % 20,
+            'ids': {'trakt': i, 'slug': 'show-{}'.format(i), 'tvdb': i,
+                    'imdb': 'tt{:07d}'.format(i), 'tmdb': i, 'tvrage': None}}
+
+
+def show_full(i):
+    """A show object at the 'full' extended level"""
+    data = show(i)
+    data.update({
+        'overview': 'An overview of show {}. '.format(i) * 8,
+        'first_aired': '2011-04-18T01:00:00.000Z',
+        'airs': {'day': 'Sunday', 'time': '21:00',
+                 'timezone': 'America/New_York'},
+        'runtime': 60, 'certification': 'TV-MA', 'network': 'HBO',
+        'country': 'us', 'updated_at': '2014-08-22T08:32:06.000Z',
+        'trailer': None, 'homepage': 'http://example.com/{}'.format(i),
+        'status': 'returning series', 'rating': 9.0, 'votes': 111,
+        'language': 'en', 'available_translations': ['en', 'de', 'fr'],
+        'genres': ['drama', 'fantasy'], 'aired_episodes': 50,
+    })
+    return data
+
+
+def movie(i):
+    """A minimal movie object"""
+    return {'title': 'Movie {}'.format(i), 'year': 2000 + i % 20,
+            'ids': {'trakt': i, 'slug': 'movie-{}'.format(i),
+                    'imdb': 'tt{:07d}'.format(i), 'tmdb': i}}
+
+
+def episode(i):
+    """An episode object at the 'full' extended level"""
+    return {'season': 1 + i // 20, 'number': 1 + i % 20,
+            'title': 'Episode {}'.format(i),
+            'ids': {'trakt': i, 'tvdb': i, 'imdb': 'tt{:07d}'.format(i),
+                    'tmdb': i, 'tvrage': None},
+            'number_abs': None,
+            'overview': 'An overview of episode {}. '.format(i) * 4,
+            'first_aired': '2011-04-18T01:00:00.000Z',
+            'updated_at': '2014-08-29T23:16:39.000Z', 'rating': 9.0,
+            'votes': 111, 'available_translations': ['en'], 'runtime': 58}
+
+
+def calendar(n):
+    """A calendars/all/shows response with *n* airings"""
+    return [{'first_aired': '2014-07-{:02d}T01:00:00.000Z'.format(1 + i % 28),
+             'episode': {'season': 1 + i // 20, 'number': 1 + i % 20,
+                         'title': 'Episode {}'.format(i),
+                         'ids': episode(i)['ids']},
+             'show': show(i % 500)}
+            for i in range(n)]
+
+
+def search_results(n):
+    """A search response with *n* results, evenly mixing every media type"""
+    results = []
+    for i in range(n):
+        kind = ('movie', 'show', 'episode', 'person')[i % 4]
+        result = {'type': kind, 'score': 100.0 - i / n}
+        if kind == 'movie':
+            result['movie'] = movie(i)
+        elif kind == 'show':
+            result['show'] = show(i)
+        elif kind == 'episode':
+            result['show'] = show(i)
+            result['episode'] = {'title': 'Episode {}'.format(i),
+                                 'season': 1, 'number': 1 + i % 20,
+                                 'ids': episode(i)['ids']}
+        else:
+            result['person'] = {'name': 'Person {}'.format(i),
+                                'ids': {'trakt': i,
+                                        'slug': 'person-{}'.format(i)}}
+        results.append(result)
+    return results
+
+
+def _seasons(episodes, **extra):
+    """Seasons of 10 episodes each, covering *episodes* episodes"""
+    return [{'number': s + 1,
+             'episodes': [dict(number=e + 1, **extra)
+                          for e in range(min(10, episodes - s * 10))]}
+            for s in range((episodes + 9) // 10)]
+
+
+def watched_shows(n, episodes=4):
+    """A users/{user}/watched/shows response with *n* shows"""
+    return [{'plays': episodes, 'last_watched_at': '2014-10-11T17:00:54.000Z',
+             'show': show(i),
+             'seasons': _seasons(episodes, plays=1,
+                                 last_watched_at='2014-10-11T17:00:54.000Z')}
+            for i in range(n)]
+
+
+def show_collection(n, episodes=4):
+    """A users/{user}/collection/shows response with *n* shows"""
+    return [{'last_collected_at': '2014-09-01T09:10:11.000Z',
+             'show': show(i),
+             'seasons': _seasons(episodes,
+                                 collected_at='2014-09-01T09:10:11.000Z')}
+            for i in range(n)]
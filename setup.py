@@ -25,6 +25,7 @@ setup(
     url='https://github.com/moogar0880/PyTrakt',
     packages=packages,
     install_requires=requires,
+    extras_require={'http2': ['httpx[http2]'], 'snapshot': ['msgpack']},
     license='Apache 2.0',
     zip_safe=False,
     classifiers=[
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 import json
 import os
-from copy import deepcopy
+
+import pytest
 
 import trakt
+from trakt.transport import MemoryTransport
 
 TESTS_DIR = os.path.dirname(__file__)
 MOCK_DATA_DIR = os.path.join(TESTS_DIR, "mock_data")
@@ -25,31 +27,35 @@ MOCK_DATA_FILES = [
 ]
 
 
-class MockCore(trakt.core.Core):
-    def __init__(self, *args, **kwargs):
-        super(MockCore, self).__init__(*args, **kwargs)
-        self.mock_data = {}
-        for mock_file in MOCK_DATA_FILES:
-            with open(mock_file, encoding='utf-8') as f:
-                self.mock_data.update(json.load(f))
-
-    def _handle_request(self, method, url, data=None):
-        uri = url[len(trakt.core.BASE_URL):]
-        if uri.startswith('/'):
-            uri = uri[1:]
-        # use a deepcopy of the mocked data to ensure clean responses on every
-        # request. this prevents rewrites to JSON responses from persisting
-        method_responses = deepcopy(self.mock_data).get(uri, {})
-        return method_responses.get(method.upper())
+def load_mock_data():
+    """Load all of the mocked API responses into a single dict"""
+    mock_data = {}
+    for mock_file in MOCK_DATA_FILES:
+        with open(mock_file, encoding='utf-8') as f:
+            mock_data.update(json.load(f))
+    return mock_data
 
 
-"""Override utility functions from trakt.core to use an underlying MockCore
-instance
+"""Serve all requests made through trakt.core from the mocked API responses.
+Requests without a mocked response are answered with a 204 No Content
 """
-trakt.core.CORE = MockCore()
-trakt.core.get = trakt.core.CORE.get
-trakt.core.post = trakt.core.CORE.post
-trakt.core.delete = trakt.core.CORE.delete
-trakt.core.put = trakt.core.CORE.put
+trakt.core.CORE.transport = MemoryTransport.from_mock_data(
+    load_mock_data(), missing_status=204)
 trakt.core.CLIENT_ID = 'FOO'
 trakt.core.CLIENT_SECRET = 'BAR'
+
+
+class FakeClock(object):
+    """A clock for the *clock* argument of timed objects, which only moves
+    when a test sets :attr:`now`
+    """
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.cache module"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import trakt.core
+from trakt.cache import NegativeCache, StaleWhileRevalidateCache
+from trakt.core import Core
+from trakt.errors import NotFoundException
+from trakt.transport import MemoryTransport
+
+URL = 'https://api.trakt.tv/'
+
+
+class CountingTransport(MemoryTransport):
+    """A MemoryTransport counting the requests it serves"""
+    def __init__(self):
+        super(CountingTransport, self).__init__()
+        self.requests = 0
+        self.add('GET', 'shows/game-of-thrones', {'title': 'Game of Thrones'})
+        self.add('GET', 'shows/game-of-thrones/next_episode', None)
+        self.add('GET', 'search/imdb/tt0000000', [],
+                 headers={'X-Pagination-Item-Count': '0'})
+        self.add('POST', 'sync/watchlist', {'added': {}})
+
+    def request(self, *args, **kwargs):
+        self.requests += 1
+        return super(CountingTransport, self).request(*args, **kwargs)
+
+
+@pytest.fixture
+def cache(clock):
+    return NegativeCache(CountingTransport(), ttl=60, clock=clock)
+
+
+def test_negative_responses_are_cached(cache, clock):
+    for uri in ('shows/unknown', 'shows/game-of-thrones/next_episode',
+                'search/imdb/tt0000000'):
+        first = cache.request('get', URL + uri)
+        second = cache.request('get', URL + uri)
+        assert second.status_code == first.status_code
+        assert second.content == first.content
+        assert second.from_cache and not first.from_cache
+        assert second.headers == first.headers
+    assert second.headers['x-pagination-item-count'] == '0'
+    assert cache.transport.requests == 3
+    assert (cache.hits, cache.misses, len(cache)) == (3, 3, 3)
+
+    # positive responses are always passed through
+    cache.request('get', URL + 'shows/game-of-thrones')
+    cache.request('get', URL + 'shows/game-of-thrones')
+    assert cache.transport.requests == 5
+
+    clock.now = 61
+    cache.request('get', URL + 'shows/unknown')
+    assert cache.transport.requests == 6
+
+
+def test_keyed_on_credentials(cache):
+    cache.request('get', URL + 'shows/unknown',
+                  headers={'Authorization': 'Bearer a'})
+    cache.request('get', URL + 'shows/unknown',
+                  headers={'Authorization': 'Bearer b'})
+    assert cache.transport.requests == 2
+
+
+def test_invalidation(cache):
+    cache.request('get', URL + 'shows/unknown')
+    cache.request('get', URL + 'search/imdb/tt0000000')
+    cache.invalidate('shows/unknown')
+    assert len(cache) == 1
+    cache.request('post', URL + 'sync/watchlist', body={'shows': []})
+    assert len(cache) == 0
+
+
+def test_max_entries(clock):
+    cache = NegativeCache(CountingTransport(), max_entries=2, clock=clock)
+    for slug in ('a', 'b', 'a', 'c'):
+        cache.request('get', URL + 'shows/' + slug)
+    assert len(cache) == 2
+    cache.request('get', URL + 'shows/a')
+    assert cache.hits == 2
+
+
+def test_core_fires_cache_hits(cache):
+    core = Core(transport=cache)
+    hits = []
+    core.register_hook('on_cache_hit', lambda **kw: hits.append(kw['url']))
+
+    @core.get
+    def show(slug):
+        data = yield 'shows/' + slug
+        yield data
+
+    for _ in range(2):
+        with pytest.raises(NotFoundException):
+            show('unknown')
+    assert cache.transport.requests == 1
+    assert hits == [trakt.core.BASE_URL + 'shows/unknown']
+
+
+class GatedTransport(CountingTransport):
+    """A CountingTransport whose requests block until its gate is opened"""
+    def __init__(self):
+        super(GatedTransport, self).__init__()
+        self.gate = threading.Event()
+        self.gate.set()
+        self.add('GET', 'shows/trending?page=1', [{'title': 'v1'}])
+
+    def request(self, *args, **kwargs):
+        self.gate.wait(5)
+        return super(GatedTransport, self).request(*args, **kwargs)
+
+
+@pytest.fixture
+def swr(clock):
+    cache = StaleWhileRevalidateCache(GatedTransport(), ttl=60, stale_ttl=600,
+                                      clock=clock)
+    yield cache
+    cache.transport.gate.set()
+    cache.close()
+
+
+def trending(cache):
+    return cache.request('get', URL + 'shows/trending',
+                         params={'page': 1}).json()
+
+
+def test_swr_serves_stale_while_refreshing(swr, clock):
+    assert trending(swr) == [{'title': 'v1'}]
+    assert trending(swr) == [{'title': 'v1'}]
+    assert (swr.transport.requests, swr.hits) == (1, 1)
+
+    swr.transport.add('GET', 'shows/trending?page=1', [{'title': 'v2'}])
+    clock.now = 61
+    swr.transport.gate.clear()
+    # served stale straight away, by a single background refresh
+    for _ in range(5):
+        assert trending(swr) == [{'title': 'v1'}]
+    assert swr.stale_hits == 5
+    swr.transport.gate.set()
+    swr.wait()
+    assert swr.transport.requests == 2
+    assert trending(swr) == [{'title': 'v2'}]
+
+    # expired entries are fetched synchronously
+    clock.now = 61 + 61 + 600
+    swr.transport.add('GET', 'shows/trending?page=1', [{'title': 'v3'}])
+    assert trending(swr) == [{'title': 'v3'}]
+    assert swr.transport.requests == 3
+
+
+def test_swr_refreshes_time_out(clock):
+    class StalledTransport(GatedTransport):
+        def request(self, method, url, headers=None, params=None, body=None,
+                    timeout=None):
+            self.timeouts.append(timeout)
+            if not self.gate.wait(timeout):
+                raise TimeoutError(url)
+            return MemoryTransport.request(self, method, url, headers,
+                                           params, body)
+
+    transport = StalledTransport()
+    transport.timeouts = []
+    swr = StaleWhileRevalidateCache(transport, ttl=60, stale_ttl=600,
+                                    refresh_timeout=0.05, clock=clock)
+    try:
+        assert trending(swr) == [{'title': 'v1'}]
+        clock.now = 61
+        transport.gate.clear()
+        assert trending(swr) == [{'title': 'v1'}]
+        swr.wait()
+        # the stalled refresh gave up, leaving the next stale hit to retry
+        assert transport.timeouts == [None, 0.05]
+        assert trending(swr) == [{'title': 'v1'}]
+        swr.wait()
+        assert transport.timeouts == [None, 0.05, 0.05]
+    finally:
+        swr.close()
+
+
+def test_swr_prevents_stampedes(swr):
+    swr.transport.gate.clear()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = [executor.submit(trending, swr) for _ in range(8)]
+        swr.transport.gate.set()
+        assert [r.result() for r in results] == [[{'title': 'v1'}]] * 8
+    assert swr.transport.requests == 1
+
+
+def test_swr_only_caches_public_successes(swr):
+    for uri in ('shows/game-of-thrones', 'movies/trending'):
+        swr.request('get', URL + uri)
+        swr.request('get', URL + uri)
+    assert swr.transport.requests == 4
+    assert len(swr) == 0
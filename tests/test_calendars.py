@@ -104,3 +104,14 @@ def test_calendar_magic_methods():
     # test __str__
     cal_str = str(cal)
     assert isinstance(cal_str, str)
+
+
+def test_calendar_movies_are_minimal():
+    """verify that calendar movies, built with the release date of their
+    calendar entry, are upgraded to their full data on first use
+    """
+    movie = MovieCalendar(date='2014-09-01', days=7)[0]
+    assert movie.released == '2014-08-01'
+    assert movie._extended is None
+    assert movie.runtime == 125
+    assert movie._extended == 'full'
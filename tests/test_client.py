@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.client module"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import trakt.core
+from trakt.client import TraktClient, get_active_client
+from trakt.metrics import MetricsCollector
+from trakt.movies import trending_movies
+from trakt.profiling import profile_requests
+from trakt.transport import MemoryTransport
+from trakt.users import User
+
+
+class HeaderTransport(MemoryTransport):
+    """A MemoryTransport remembering the headers of every request"""
+    def __init__(self):
+        super(HeaderTransport, self).__init__()
+        self.headers = []
+        self.add('GET', 'users/sean', {'username': 'sean', 'name': 'Sean'})
+        self.add('GET', 'movies/trending', [])
+
+    def request(self, method, url, headers=None, params=None, body=None):
+        self.headers.append(dict(headers))
+        return super(HeaderTransport, self).request(method, url, headers,
+                                                    params, body)
+
+
+def build_client(client_id, token):
+    return TraktClient(client_id, 'secret', oauth_token=token,
+                       transport=HeaderTransport())
+
+
+def test_requests_use_client_credentials():
+    alice = build_client('app', 'alice-token')
+    with alice:
+        assert get_active_client() is alice
+        user = User('sean')
+        assert user.name == 'Sean'
+    assert get_active_client() is None
+    assert alice.transport.headers == [{
+        'Content-Type': 'application/json', 'trakt-api-version': '2',
+        'trakt-api-key': 'app', 'Authorization': 'Bearer alice-token'}]
+
+    # the global credentials and transport are left alone
+    assert trakt.core.OAUTH_TOKEN != 'alice-token'
+    assert isinstance(User('sean'), User)
+    assert len(alice.transport.headers) == 1
+
+
+def test_nested_clients():
+    alice = build_client('app', 'alice-token')
+    bob = build_client('app', 'bob-token')
+    with alice:
+        with bob.activate():
+            trending_movies()
+        trending_movies()
+    assert len(alice.transport.headers) == len(bob.transport.headers) == 1
+
+
+def test_global_hooks_see_client_calls():
+    alice = build_client('app', 'alice-token')
+    metrics = MetricsCollector()
+    metrics.install()
+    try:
+        with alice:
+            with profile_requests() as profile:
+                trending_movies()
+                assert User('sean').name == 'Sean'
+    finally:
+        metrics.uninstall()
+    assert profile.total == 2
+    assert metrics.as_dict()['GET movies/trending']['statuses'] == {200: 1}
+    assert len(alice.transport.headers) == 2
+
+
+def test_concurrent_clients():
+    clients = [build_client('app', 'token-{}'.format(n)) for n in range(8)]
+
+    def work(client):
+        with client:
+            for _ in range(5):
+                trending_movies()
+                time.sleep(0.001)
+        return client
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for client in executor.map(work, clients):
+            tokens = {h['Authorization'] for h in client.transport.headers}
+            assert tokens == {'Bearer ' + client.oauth_token}
+            assert len(client.transport.headers) == 5
+
+
+def test_call():
+    alice = build_client('app', 'alice-token')
+    assert alice.call(trending_movies) == []
+    assert len(alice.transport.headers) == 1
+
+
+def test_token_refresh():
+    refreshed = []
+    alice = TraktClient('app', 'secret', oauth_token='old', oauth_refresh='r',
+                        oauth_expires_at=int(time.time()) + 60,
+                        transport=HeaderTransport(),
+                        on_token_refresh=refreshed.append)
+    alice.transport.add('POST', 'oauth/token', {
+        'access_token': 'new', 'refresh_token': 'r2',
+        'created_at': int(time.time()), 'expires_in': 7776000})
+    with alice:
+        trending_movies()
+    assert refreshed == [alice]
+    assert (alice.oauth_token, alice.oauth_refresh) == ('new', 'r2')
+    assert alice.transport.headers[-1]['Authorization'] == 'Bearer new'
+
+    # a valid token isn't refreshed again
+    alice.call(trending_movies)
+    assert refreshed == [alice]
+
+
+def test_concurrent_token_refresh():
+    class SlowRefresh(HeaderTransport):
+        def request(self, method, url, headers=None, params=None, body=None):
+            if method.upper() == 'POST':
+                time.sleep(0.05)
+            return super(SlowRefresh, self).request(method, url, headers,
+                                                    params, body)
+
+    refreshed = []
+    alice = TraktClient('app', 'secret', oauth_token='old', oauth_refresh='r',
+                        oauth_expires_at=int(time.time()) + 60,
+                        transport=SlowRefresh(),
+                        on_token_refresh=refreshed.append)
+    alice.transport.add('POST', 'oauth/token', {
+        'access_token': 'new', 'refresh_token': 'r2',
+        'created_at': int(time.time()), 'expires_in': 7776000})
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: alice.call(trending_movies), range(8)))
+    assert refreshed == [alice]
+    tokens = {h['Authorization'] for h in alice.transport.headers}
+    assert tokens == {'Bearer old', 'Bearer new'}
+    assert len(alice.transport.headers) == 9
+
+
+def test_client_shared_by_interleaved_tasks():
+    alice = build_client('app', 'alice-token')
+
+    async def work(entered, leave):
+        with alice:
+            entered.set()
+            await leave.wait()
+            assert get_active_client() is alice
+        assert get_active_client() is None
+
+    async def main():
+        events = [asyncio.Event() for _ in range(4)]
+        first = asyncio.ensure_future(work(events[0], events[1]))
+        second = asyncio.ensure_future(work(events[2], events[3]))
+        await events[0].wait()
+        await events[2].wait()
+        # the first task exits its block while the second is still in its own
+        events[1].set()
+        await first
+        events[3].set()
+        await second
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
+    assert get_active_client() is None
+
+
+def test_from_config(tmpdir):
+    path = tmpdir.join('config.json')
+    path.write('{"CLIENT_ID": "app", "CLIENT_SECRET": "secret", '
+               '"OAUTH_TOKEN": "token", "OAUTH_REFRESH": "refresh", '
+               '"OAUTH_EXPIRES_AT": 1}')
+    client = TraktClient.from_config(str(path))
+    assert client.client_id == 'app'
+    assert client.oauth_expires_at == 1
+    assert client.headers()['Authorization'] == 'Bearer token'
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.comments module"""
+import pytest
+
+from trakt.comments import StreamedComment, UserRef, iter_comments
+from trakt.core import Comment
+from trakt.profiling import profile_requests
+from trakt.tv import TVShow
+from trakt.users import User
+
+
+def test_iter_comments_pages_on_demand():
+    got = TVShow('Game of Thrones')
+    with profile_requests(threshold=1, strict=True) as profile:
+        comments = got.iter_comments(limit=2)
+        assert profile.total == 0
+        first = next(comments)
+        assert profile.total == 1
+    assert isinstance(first, StreamedComment)
+    assert isinstance(first, Comment)
+    assert first.comment == 'Great show!'
+
+    with profile_requests(threshold=2) as profile:
+        rest = list(comments)
+    assert [c.id for c in rest] == [11, 12]
+    assert profile.total == 1
+
+
+def test_sorted_comments():
+    comments = list(iter_comments('shows/game-of-thrones/comments',
+                                  sort='likes'))
+    assert [c.likes for c in comments] == [12]
+    with pytest.raises(ValueError):
+        iter_comments('shows/game-of-thrones/comments', sort='funniest')
+
+
+def test_user_refs():
+    comment = next(iter_comments('shows/game-of-thrones/comments', limit=2))
+    assert comment.user == UserRef(username='sean', name='Sean Rudford',
+                                   private=False, vip=False, vip_ep=False)
+    assert comment.user.slug == 'sean'
+    assert isinstance(comment.user.resolve(), User)
+
+
+def test_reply_tree_is_lazy():
+    comments = list(iter_comments('shows/game-of-thrones/comments', limit=2))
+    with profile_requests() as profile:
+        assert list(comments[1].iter_replies()) == []
+    assert profile.total == 0
+
+    with profile_requests() as profile:
+        tree = [(depth, c.id) for depth, c in comments[0].walk()]
+    assert tree == [(1, 9), (2, 10)]
+    assert profile.total == 2
+
+    assert [(d, c.id) for d, c in comments[0].walk(max_depth=1)] == [(1, 9)]
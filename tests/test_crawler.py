@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.crawler module"""
+import json
+import os
+import threading
+import time
+
+import pytest
+
+import trakt.core
+from tests.conftest import load_mock_data
+from trakt.client import TraktClient
+from trakt.crawler import Crawler, JSONLinesSink
+from trakt.transport import MemoryTransport
+from trakt.tv import TVEpisode, TVSeason, TVShow
+
+GRAPH = {
+    ('show', 'a'): [('person', 'x'), ('person', 'y')],
+    ('person', 'x'): [('show', 'a'), ('movie', 'b')],
+    ('person', 'y'): [('movie', 'b'), ('movie', 'c')],
+    ('movie', 'b'): [('person', 'x')],
+    ('movie', 'c'): [('person', 'z')],
+    ('person', 'z'): [],
+}
+
+
+class Record(object):
+    def __init__(self, slug):
+        self.slug = slug
+
+
+class GraphCrawler(Crawler):
+    def __init__(self, *args, **kwargs):
+        super(GraphCrawler, self).__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+        self.calls = []
+
+    def _expand(self, kind, slug):
+        with self.lock:
+            self.calls.append((kind, slug))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        if slug == 'c' and getattr(self, 'broken', False):
+            raise ValueError(slug)
+        return [(kind, Record(slug))], GRAPH[(kind, slug)]
+
+
+def test_crawl_deduplicates():
+    records = []
+    crawler = GraphCrawler(lambda kind, obj: records.append(obj.slug),
+                           max_workers=2)
+    crawler.add('show', 'a')
+    assert crawler.run() == 6
+    assert sorted(records) == ['a', 'b', 'c', 'x', 'y', 'z']
+    assert len(crawler.calls) == len(set(crawler.calls)) == 6
+    assert crawler.peak <= 2
+
+
+def test_max_depth_and_kinds():
+    crawler = GraphCrawler(lambda kind, obj: None, max_depth=1)
+    crawler.add('show', 'a')
+    crawler.run()
+    assert sorted(crawler.calls) == [('person', 'x'), ('person', 'y'),
+                                     ('show', 'a')]
+
+    crawler = GraphCrawler(lambda kind, obj: None, kinds=('show', 'person'))
+    crawler.add('show', 'a')
+    crawler.run()
+    assert ('movie', 'b') not in crawler.calls
+
+
+def test_resume_from_checkpoint(tmpdir):
+    path = os.path.join(str(tmpdir), 'crawl.json')
+    first = GraphCrawler(lambda kind, obj: None, checkpoint=path,
+                         max_workers=1)
+    first.add('show', 'a')
+    assert first.run(limit=2) == 2
+    with open(path) as checkpoint_file:
+        assert len(json.load(checkpoint_file)['frontier']) == 2
+
+    second = GraphCrawler(lambda kind, obj: None, checkpoint=path)
+    assert second.run() == 4
+    assert set(first.calls).isdisjoint(second.calls)
+    assert second.fetched == 6
+
+
+def test_failed_nodes_are_retried(tmpdir):
+    path = os.path.join(str(tmpdir), 'crawl.json')
+    crawler = GraphCrawler(lambda kind, obj: None, checkpoint=path)
+    crawler.broken = True
+    crawler.add('show', 'a')
+    crawler.run()
+    assert list(crawler.failed) == [('movie', 'c', 2)]
+    assert ('person', 'z') not in crawler.seen
+
+    resumed = GraphCrawler(lambda kind, obj: None, checkpoint=path)
+    resumed.run()
+    assert resumed.calls == [('movie', 'c'), ('person', 'z')]
+    assert resumed.failed == {}
+
+
+def test_failing_sink_keeps_progress(tmpdir):
+    path = os.path.join(str(tmpdir), 'crawl.json')
+
+    def sink(kind, obj):
+        if obj.slug == 'y':
+            raise IOError(obj.slug)
+    crawler = GraphCrawler(sink, checkpoint=path, max_workers=1)
+    crawler.add('show', 'a')
+    with pytest.raises(IOError):
+        crawler.run()
+    with open(path) as checkpoint_file:
+        state = json.load(checkpoint_file)
+    assert state['fetched'] == 2
+    assert ['person', 'y', 1] in state['frontier']
+
+    resumed = GraphCrawler(lambda kind, obj: None, checkpoint=path)
+    assert resumed.run() == 4
+    assert ('person', 'y') in resumed.calls
+
+
+def test_crawl_show(tmpdir):
+    path = os.path.join(str(tmpdir), 'catalog.jsonl')
+    records = []
+
+    def sink(kind, obj):
+        records.append((kind, obj))
+        JSONLinesSink(path)(kind, obj)
+
+    crawler = Crawler(sink, max_depth=0)
+    crawler.add('show', 'game-of-thrones')
+    assert crawler.run() == 1
+    kinds = [kind for kind, _ in records]
+    assert kinds.count('show') == 1
+    assert kinds.count('season') == 2
+    assert kinds.count('episode') == 20
+    assert isinstance(records[0][1], TVShow)
+    assert all(isinstance(obj, TVSeason) for kind, obj in records
+               if kind == 'season')
+    assert all(isinstance(obj, TVEpisode) for kind, obj in records
+               if kind == 'episode')
+    assert crawler.seen == {('show', 'game-of-thrones')}
+
+    with open(path) as sink_file:
+        lines = [json.loads(line) for line in sink_file]
+    assert lines[0]['kind'] == 'show'
+    assert lines[0]['data']['title'] == 'Game of Thrones'
+
+
+def test_crawl_person():
+    records = []
+    crawler = Crawler(lambda kind, obj: records.append(obj), max_depth=0)
+    crawler.add('person', 'bryan-cranston')
+    crawler.run()
+    assert records[0].name == 'Bryan Cranston'
+    assert crawler.seen == {('person', 'bryan-cranston')}
+
+
+class CountingTransport(MemoryTransport):
+    """A MemoryTransport counting the requests it answers"""
+    def __init__(self, *args, **kwargs):
+        super(CountingTransport, self).__init__(*args, **kwargs)
+        self.requests = 0
+
+    def request(self, *args, **kwargs):
+        self.requests += 1
+        return super(CountingTransport, self).request(*args, **kwargs)
+
+
+def test_crawl_with_active_client(monkeypatch):
+    transport = CountingTransport.from_mock_data(load_mock_data())
+    client = TraktClient('app', 'secret', oauth_token='token',
+                         transport=transport)
+    monkeypatch.setattr(trakt.core.CORE, 'transport', CountingTransport())
+    records = []
+    with client:
+        crawler = Crawler(lambda kind, obj: records.append(obj), max_depth=0)
+        crawler.add('show', 'game-of-thrones')
+        assert crawler.run() == 1
+    assert len(records) == 23 and crawler.failed == {}
+    assert transport.requests > 0
+    assert trakt.core.CORE.transport.requests == 0
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.deadline module"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import trakt.core
+from tests.conftest import FakeClock
+from trakt import deadline
+from trakt.client import TraktClient
+from trakt.comments import iter_comments
+from trakt.deadline import Cancelled, Deadline, DeadlineExceeded
+from trakt.extended import hydrate
+from trakt.transport import MemoryTransport
+from trakt.tv import TVShow
+
+
+class SlowTransport(MemoryTransport):
+    """A MemoryTransport answering after *latency* seconds, or timing out"""
+    def __init__(self, latency=0.0):
+        super(SlowTransport, self).__init__()
+        self.latency = latency
+        self.timeouts = []
+        for i in range(20):
+            self.add('GET', 'shows/show-{}?extended=full'.format(i), {
+                'title': 'Show {}'.format(i), 'network': 'HBO',
+                'ids': {'trakt': i, 'slug': 'show-{}'.format(i)}})
+
+    def request(self, method, url, headers=None, params=None, body=None,
+                timeout=None):
+        self.timeouts.append(timeout)
+        if timeout is not None and self.latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(url)
+        time.sleep(self.latency)
+        return super(SlowTransport, self).request(method, url, headers,
+                                                  params, body)
+
+
+@trakt.core.get
+def show(slug):
+    data = yield 'shows/{}?extended=full'.format(slug)
+    yield data
+
+
+def minimal_shows(count):
+    return [TVShow('Show {}'.format(i), slug='show-{}'.format(i), trakt=i)
+            for i in range(count)]
+
+
+def test_request_timeouts(monkeypatch):
+    transport = SlowTransport()
+    with TraktClient('app', transport=transport):
+        show('show-1')
+        monkeypatch.setattr(trakt.core, 'TIMEOUT', 10)
+        show('show-1')
+        with Deadline(2):
+            show('show-1')
+    with TraktClient('app', transport=transport, timeout=5):
+        show('show-1')
+        with Deadline(60):
+            show('show-1')
+    assert transport.timeouts[:2] == [None, 10]
+    assert 1.9 < transport.timeouts[2] <= 2
+    assert transport.timeouts[3:] == [5, 5]
+
+
+def test_transports_without_timeouts():
+    # custom transports only accepting the original arguments keep working
+    # as long as no timeout applies
+    class LegacyTransport(MemoryTransport):
+        def request(self, method, url, headers=None, params=None,
+                    body=None):
+            return super(LegacyTransport, self).request(method, url)
+
+    transport = LegacyTransport()
+    transport.add('GET', 'shows/show-1?extended=full', {'title': 'Show 1'})
+    with TraktClient('app', transport=transport):
+        assert show('show-1') == {'title': 'Show 1'}
+
+
+def test_deadline_budget():
+    clock = FakeClock()
+    outer = Deadline(10, clock=clock)
+    assert outer.remaining() == 10
+    with outer:
+        with Deadline(20, clock=clock) as inner:
+            assert deadline.current() is inner
+            assert inner.remaining() == 10
+            clock.now = 4
+            assert deadline.request_timeout(30) == 6
+            assert deadline.request_timeout(2) == 2
+        assert deadline.current() is outer
+        clock.now = 10
+        assert outer.expired and deadline.interrupted()
+        with pytest.raises(DeadlineExceeded):
+            deadline.check()
+    assert deadline.current() is None
+    assert deadline.request_timeout(3) == 3
+    assert Deadline().remaining() is None
+
+
+def test_deadline_shared_by_interleaved_tasks():
+    budget = Deadline(60)
+
+    async def work(entered, leave):
+        with budget:
+            entered.set()
+            await leave.wait()
+            assert deadline.current() is budget
+        assert deadline.current() is None
+
+    async def main():
+        events = [asyncio.Event() for _ in range(4)]
+        first = asyncio.ensure_future(work(events[0], events[1]))
+        second = asyncio.ensure_future(work(events[2], events[3]))
+        await events[0].wait()
+        await events[2].wait()
+        # the first task exits its block while the second is still in its own
+        events[1].set()
+        await first
+        events[3].set()
+        await second
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
+    assert deadline.current() is None
+
+
+def test_expired_deadlines_send_nothing():
+    transport = SlowTransport()
+    clock = FakeClock()
+    with TraktClient('app', transport=transport):
+        with Deadline(1, clock=clock):
+            show('show-1')
+            clock.now = 1
+            with pytest.raises(DeadlineExceeded):
+                show('show-2')
+    assert len(transport.timeouts) == 1
+
+
+def test_timeouts_within_a_deadline_raise_promptly():
+    errors = []
+    with TraktClient('app', transport=SlowTransport(latency=5)) as client:
+        client.core.register_hook('on_error',
+                                  lambda **kw: errors.append(kw['error']))
+        start = time.monotonic()
+        with Deadline(0.05):
+            with pytest.raises(DeadlineExceeded) as error:
+                show('show-1')
+    assert time.monotonic() - start < 1
+    assert isinstance(error.value.__cause__, TimeoutError)
+    assert errors == [error.value]
+
+
+def test_cancellation():
+    transport = SlowTransport()
+    with TraktClient('app', transport=transport):
+        with Deadline() as budget:
+            with Deadline(60) as inner:
+                budget.cancel()
+                assert inner.cancelled and inner.expired
+                with pytest.raises(Cancelled):
+                    show('show-1')
+    assert transport.timeouts == []
+
+
+def test_bound_carries_the_deadline_into_threads():
+    seen = []
+
+    def worker():
+        seen.append(deadline.current())
+    with Deadline(5) as budget:
+        thread = threading.Thread(target=deadline.bound(worker))
+        thread.start()
+        thread.join()
+    assert seen == [budget]
+
+
+def test_hydrate_within_a_deadline():
+    with TraktClient('app', transport=SlowTransport(latency=0.02)):
+        with Deadline(0.05):
+            with pytest.raises(DeadlineExceeded):
+                hydrate(minimal_shows(20), max_workers=2)
+
+        shows = minimal_shows(20)
+        with Deadline(0.1, partial=True):
+            assert hydrate(shows, max_workers=2) == shows
+    upgraded = [s for s in shows if s._extended == 'full']
+    assert 0 < len(upgraded) < 20
+    assert upgraded == shows[:len(upgraded)]
+
+
+def test_paginated_iterators_return_partial_results():
+    transport = MemoryTransport()
+    transport.add('GET', 'shows/show-1/comments?page=1&limit=1',
+                  [{'id': 1, 'comment': 'First', 'user': {'username': 'a'}}])
+    transport.add('GET', 'shows/show-1/comments?page=2&limit=1',
+                  [{'id': 2, 'comment': 'Second', 'user': {'username': 'b'}}])
+    with TraktClient('app', transport=transport):
+        with Deadline(partial=True) as budget:
+            comments = iter_comments('shows/show-1/comments', limit=1)
+            first = next(comments)
+            budget.cancel()
+            assert list(comments) == []
+    assert first.id == 1
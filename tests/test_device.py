@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.device module"""
+import json
+from concurrent.futures import CancelledError
+
+import pytest
+
+import trakt.core
+from tests.conftest import FakeClock
+from trakt.device import DeviceAuthError, DeviceAuthManager
+from trakt.transport import Response
+
+TOKEN = {'access_token': 'token', 'refresh_token': 'refresh',
+         'created_at': 1519329051, 'expires_in': 7776000}
+
+
+class DeviceTransport(object):
+    """Answers device token polls with a scripted status code per code"""
+    def __init__(self, **scripts):
+        self.scripts = scripts
+        self.polls = []
+        self.timeouts = []
+
+    def request(self, method, url, headers=None, params=None, body=None,
+                timeout=None):
+        self.timeouts.append(timeout)
+        if url.endswith('/oauth/device/code'):
+            return Response(200, content=json.dumps({
+                'device_code': 'new', 'user_code': 'ABC123',
+                'verification_url': 'https://trakt.tv/activate',
+                'expires_in': 600, 'interval': 5}).encode('UTF-8'))
+        code = body['code']
+        self.polls.append(code)
+        status = self.scripts[code].pop(0)
+        if isinstance(status, Exception):
+            raise status
+        if callable(status):  # ie cancels the future while in flight
+            status = status()
+        content = json.dumps(TOKEN).encode('UTF-8') if status == 200 else b''
+        return Response(status, content=content)
+
+
+def code(device_code, interval=5, expires_in=600):
+    return {'device_code': device_code, 'interval': interval,
+            'expires_in': expires_in}
+
+
+def test_many_codes_one_scheduler():
+    clock = FakeClock()
+    transport = DeviceTransport(a=[400, 200], b=[429, 400, 200],
+                                c=[418])
+    manager = DeviceAuthManager('id', 'secret', transport, clock=clock)
+    done = []
+    futures = {name: manager.add(code(name), callback=done.append)
+               for name in 'abc'}
+    assert manager.poll() == 5
+    assert transport.polls == []
+
+    for now in range(5, 60):
+        clock.now = float(now)
+        manager.poll()
+    assert futures['a'].result(0) == TOKEN
+    assert futures['b'].result(0) == TOKEN
+    with pytest.raises(DeviceAuthError) as error:
+        futures['c'].result(0)
+    assert error.value.http_code == 418
+    assert str(error.value) == 'You explicitly denied this code'
+    assert len(done) == 3
+    assert len(manager) == 0
+
+    # a polls at 5 and 10, b slows down from 5 to 10 seconds after a 429
+    assert transport.polls == ['a', 'b', 'c', 'a', 'b', 'b']
+    assert trakt.core.OAUTH_TOKEN != 'token'
+
+
+def test_expired_code():
+    clock = FakeClock()
+    transport = DeviceTransport(a=[400] * 10)
+    manager = DeviceAuthManager('id', 'secret', transport, clock=clock)
+    future = manager.add(code('a', expires_in=12))
+    for now in range(0, 20):
+        clock.now = float(now)
+        manager.poll()
+    with pytest.raises(DeviceAuthError) as error:
+        future.result(0)
+    assert error.value.http_code == 410
+    assert transport.polls == ['a', 'a']
+
+
+def test_authorize():
+    transport = DeviceTransport(new=[200])
+    manager = DeviceAuthManager('id', 'secret', transport)
+    device_code, future = manager.authorize()
+    assert device_code['user_code'] == 'ABC123'
+    assert not future.done()
+
+
+def test_background_thread():
+    transport = DeviceTransport(a=[400, 200], b=[400] * 100)
+    manager = DeviceAuthManager('id', 'secret', transport).start()
+    first = manager.add(code('a', interval=0.01))
+    second = manager.add(code('b', interval=0.01))
+    assert first.result(timeout=5) == TOKEN
+    manager.stop(cancel=True)
+    with pytest.raises(CancelledError):
+        second.result(0)
+
+
+def test_poll_timeout(monkeypatch):
+    clock = FakeClock()
+    transport = DeviceTransport(a=[400, 200])
+    manager = DeviceAuthManager('id', 'secret', transport, clock=clock,
+                                timeout=3)
+    future = manager.add(code('a'))
+    clock.now = 5.0
+    manager.poll()
+    monkeypatch.setattr(trakt.core, 'TIMEOUT', 30)
+    manager.timeout = None
+    clock.now = 10.0
+    manager.poll()
+    assert future.result(0) == TOKEN
+    assert transport.timeouts == [3, 30]
+
+
+def test_transient_failures_are_retried():
+    clock = FakeClock()
+    transport = DeviceTransport(a=[IOError('timed out'), IOError('reset'),
+                                   400, 200])
+    manager = DeviceAuthManager('id', 'secret', transport, clock=clock)
+    future = manager.add(code('a'))
+    for now in range(5, 60):
+        clock.now = float(now)
+        manager.poll()
+    assert future.result(0) == TOKEN
+    # retried 10 then 20 seconds after each failure, then every 5 seconds
+    assert len(transport.polls) == 4 and len(manager) == 0
+
+
+def test_cancelled_while_polling():
+    clock = FakeClock()
+    futures = {}
+    transport = DeviceTransport(a=[lambda: futures['a'].cancel() and 200],
+                                b=[200])
+    manager = DeviceAuthManager('id', 'secret', transport, clock=clock)
+    futures = {name: manager.add(code(name)) for name in 'ab'}
+    clock.now = 5.0
+    manager.poll()
+    assert futures['a'].cancelled()
+    assert futures['b'].result(0) == TOKEN
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.diff module"""
+import pytest
+
+from trakt.diff import (Entry, diff_library, entries, fetch_remote, payload,
+                        reconcile)
+from trakt.movies import Movie
+from trakt.people import Person
+from trakt.profiling import profile_requests
+from trakt.tv import TVEpisode, TVSeason, TVShow
+
+LOCAL = [
+    # matched on another id type, with a tvdb id given as a string
+    {'movie': {'ids': {'imdb': 'tt1104001'}}},
+    {'movie': {'ids': {'tmdb': 155}}},
+    {'movie': {'ids': {'imdb': 'tt0372784'}},
+     'collected_at': '2020-01-01T00:00:00.000Z',
+     'metadata': {'resolution': 'uhd_4k'}},
+    {'show': {'ids': {'tvdb': '81189'}},
+     'seasons': [{'number': 1, 'episodes': [{'number': 1}, {'number': 2},
+                                            {'number': 3}]},
+                 {'number': 2, 'episodes': [{'number': 1}, {'number': 2}]}]},
+]
+
+
+def test_entries():
+    flat = list(entries(LOCAL))
+    assert len(flat) == 8
+    assert flat[2] == Entry('movie', {'imdb': 'tt0372784'}, None, None, {
+        'collected_at': '2020-01-01T00:00:00.000Z', 'resolution': 'uhd_4k'})
+    assert flat[-1] == Entry('episode', {'tvdb': '81189'}, 2, 2, {})
+
+    season, = entries([{'show': {'ids': {'trakt': 1}},
+                        'season': {'number': 3}}])
+    assert (season.kind, season.season) == ('season', 3)
+    episode, = entries([Movie('TRON: Legacy', year=2010)])
+    assert episode.kind == 'movie'
+
+
+def test_diff_library():
+    remote = fetch_remote('collection')
+    changes = diff_library(LOCAL, remote)
+    assert [(e.kind, e.season, e.number) for e in changes.added] == [
+        ('movie', None, None), ('episode', 1, 3)]
+    # The Walking Dead isn't in the local library
+    assert {e.ids['trakt'] for e in changes.removed} == {2}
+    assert changes.unchanged == 6
+
+    assert changes.add_payload() == {
+        'movies': [{'ids': {'imdb': 'tt0372784'}, 'resolution': 'uhd_4k',
+                    'collected_at': '2020-01-01T00:00:00.000Z'}],
+        'shows': [{'ids': {'tvdb': '81189'}, 'seasons': [
+            {'number': 1, 'episodes': [{'number': 3}]}]}]}
+    removed, = changes.remove_payload()['shows']
+    assert removed['ids']['slug'] == 'the-walking-dead'
+
+    assert not diff_library(LOCAL + LOCAL[:1], LOCAL)
+
+
+def test_model_objects():
+    local = [Movie('TRON: Legacy', year=2010),
+             TVShow('Breaking Bad', ids={'trakt': 1, 'slug': 'breaking-bad'}),
+             TVEpisode('The Walking Dead', 1, 1, ids={'trakt': 999}),
+             TVSeason('The Walking Dead', 2, ids={'trakt': 3}),
+             TVEpisode('Game of Thrones', 1, 1, ids={'trakt': 73640})]
+    flat = list(entries(local))
+    assert flat[1] == Entry('show', {'trakt': 1, 'slug': 'breaking-bad'},
+                            None, None, {})
+    assert flat[2] == Entry('episode', {'slug': 'the-walking-dead'}, 1, 1, {})
+    assert flat[3] == Entry('season', {'slug': 'the-walking-dead'}, 2, None,
+                            {})
+
+    changes = reconcile('collection', local, remove=True, dry_run=True)
+    # the whole of Breaking Bad and The Walking Dead's second season are
+    # listed locally, so none of their episodes are removed
+    assert [(e.ids, e.season, e.number) for e in changes.removed] == [
+        ({'trakt': 6, 'slug': 'the-dark-knight-2008', 'imdb': 'tt0468569',
+          'tmdb': 155}, None, None),
+        ({'trakt': 2, 'slug': 'the-walking-dead', 'tvdb': 153021,
+          'imdb': 'tt1520211', 'tmdb': 1402, 'tvrage': None}, 1, 2)]
+    assert changes.added == [flat[4]]
+    assert changes.unchanged == 8
+
+    with pytest.raises(TypeError):
+        list(entries([Person('Garrett Hedlund', ids={'trakt': 1})]))
+
+
+def test_payload_groups_shows():
+    ids = {'trakt': 1}
+    data = payload([Entry('episode', ids, 1, 1, {}),
+                    Entry('season', ids, 2, None, {}),
+                    Entry('episode', ids, 1, 2, {}),
+                    Entry('show', {'trakt': 2}, None, None, {}),
+                    Entry('episode', {'trakt': 9}, None, None, {})])
+    assert data == {
+        'shows': [{'ids': ids, 'seasons': [
+            {'number': 1, 'episodes': [{'number': 1}, {'number': 2}]},
+            {'number': 2}]}, {'ids': {'trakt': 2}}],
+        'episodes': [{'ids': {'trakt': 9}}]}
+
+
+def test_reconcile():
+    with profile_requests() as profile:
+        changes = reconcile('collection', LOCAL, remove=True)
+    assert profile.counts == {'GET sync/collection/movies': 1,
+                              'GET sync/collection/shows': 1,
+                              'POST sync/collection': 1,
+                              'POST sync/collection/remove': 1}
+    assert changes.responses['added']['added']['movies'] == 1
+
+    with profile_requests() as profile:
+        changes = reconcile('collection', LOCAL, remote=LOCAL, remove=True)
+    assert profile.total == 0
+    assert not changes
+
+    changes = reconcile('watchlist', LOCAL, dry_run=True)
+    assert changes.added and not changes.removed and not changes.responses
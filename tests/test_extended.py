@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.extended module"""
+import pytest
+
+from trakt.client import TraktClient
+from trakt.core import Airs
+from trakt.errors import NotFoundException
+from trakt.extended import (FULL, HydrationError, extended_fields, hydrate,
+                            upgrade)
+from trakt.movies import Movie, trending_movies, updated_movies
+from trakt.people import Person
+from trakt.profiling import profile_requests
+from trakt.transport import MemoryTransport
+from trakt.tv import TVEpisode, TVShow, updated_shows
+
+
+def minimal_show():
+    return TVShow('Game of Thrones', year=2011,
+                  ids={'trakt': 353, 'slug': 'game-of-thrones'})
+
+
+def test_extended_fields():
+    assert {'overview', 'runtime', 'network'} <= extended_fields(TVShow)
+    assert 'title' not in extended_fields(TVShow)
+    assert 'tagline' in extended_fields(Movie)
+
+
+def test_minimal_objects_upgrade_on_first_access():
+    with profile_requests() as profile:
+        show = minimal_show()
+        assert show.title == 'Game of Thrones'
+        assert show._extended is None
+        assert profile.total == 0
+
+        assert show.network == 'HBO'
+        assert profile.total == 1
+        assert show._extended == FULL
+        assert show.runtime == 60
+        assert show.genres == ['drama', 'fantasy']
+        # missing from the full data too, so it isn't fetched again
+        assert show.comment_count is None
+    assert profile.total == 1
+
+
+def test_full_objects_are_not_upgraded():
+    show = TVShow('Game of Thrones')
+    assert show._extended == FULL
+    with profile_requests() as profile:
+        assert show.overview.startswith('Game of Thrones is')
+    assert profile.total == 0
+
+    person = Person('Garrett Hedlund', biography='An actor.')
+    assert person._extended == FULL
+    assert person.birthplace is None
+
+
+def test_listing_fields_dont_imply_full_data():
+    shows = updated_shows('2014-09-22')
+    movies = updated_movies('2014-09-22')
+    assert shows[0]._extended is None and movies[0]._extended is None
+    assert shows[0].updated_at == '2014-09-22T21:56:03.000Z'
+
+    show = TVShow('Game of Thrones', year=2011, rating=10, votes=1,
+                  ids={'trakt': 353, 'slug': 'game-of-thrones'},
+                  updated_at='2014-09-22T21:56:03.000Z')
+    assert show._extended is None
+    with profile_requests() as profile:
+        assert show.network == 'HBO'
+    assert profile.total == 1
+
+
+def test_upgrade_result_list():
+    movies = trending_movies()
+    assert movies[0]._extended is None
+    with profile_requests() as profile:
+        upgrade(movies[:1])
+        assert movies[0].tagline == 'The Game Has Changed.'
+        upgrade(movies[:1])
+    assert profile.total == 1
+
+
+def test_person_upgrade():
+    person = Person('Garrett Hedlund', ids={'slug': 'garrett-hedlund'})
+    assert person.birthday == '1984-09-03'
+    assert person.death is None
+
+
+def test_hydrate_deduplicates_uris():
+    first, second = minimal_show(), minimal_show()
+    movie = trending_movies()[0]
+    person = Person('Garrett Hedlund', ids={'slug': 'garrett-hedlund'})
+    with profile_requests() as profile:
+        objects = hydrate([first, movie, second, person, first])
+        assert first.network == second.network == 'HBO'
+        assert isinstance(second.airs, Airs)
+        assert movie.tagline == 'The Game Has Changed.'
+        assert person.birthday == '1984-09-03'
+    assert objects == [first, movie, second, person, first]
+    assert profile.total == 3
+    assert all(obj._extended == FULL for obj in objects)
+
+    with profile_requests() as profile:
+        hydrate(objects)
+    assert profile.total == 0
+
+
+def test_hydrate_uses_active_client():
+    transport = MemoryTransport()
+    transport.add('GET', 'shows/game-of-thrones?extended=full', {
+        'title': 'Game of Thrones', 'network': 'Client HBO',
+        'ids': {'trakt': 353, 'slug': 'game-of-thrones'}})
+    with TraktClient('app', transport=transport):
+        show, = hydrate([minimal_show()])
+    assert show.network == 'Client HBO'
+
+
+def test_hydrate_failures():
+    transport = MemoryTransport()
+    transport.add('GET', 'shows/game-of-thrones?extended=full', {
+        'title': 'Game of Thrones', 'network': 'HBO',
+        'ids': {'trakt': 353, 'slug': 'game-of-thrones'}})
+    missing = TVShow('Unknown', ids={'trakt': 1, 'slug': 'unknown'})
+    show = minimal_show()
+    with TraktClient('app', transport=transport):
+        with pytest.raises(HydrationError) as error:
+            hydrate([missing, show])
+    assert show._extended == FULL and show.network == 'HBO'
+    assert missing._extended is None
+    assert error.value.objects == [missing]
+    uri, = error.value.errors
+    assert uri == 'shows/unknown?extended=full'
+    assert isinstance(error.value.errors[uri], NotFoundException)
+
+    episode = TVEpisode('Game of Thrones', 1, 1, title='Winter Is Coming',
+                        ids={'trakt': 73640})
+    with pytest.raises(TypeError):
+        hydrate([show, episode])
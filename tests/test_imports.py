@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""tests ensuring that importing trakt stays cheap"""
+import subprocess
+import sys
+
+import trakt
+import trakt.core
+
+
+def run_python(code):
+    """Run *code* in a fresh interpreter, returning its stripped stdout"""
+    output = subprocess.check_output([sys.executable, '-c', code])
+    return output.decode('utf-8').strip()
+
+
+def test_import_defers_requests():
+    code = ('import sys, trakt, trakt.tv, trakt.users; '
+            'print(any(m in sys.modules for m in '
+            '("requests", "requests_oauthlib", "oauthlib")))')
+    assert run_python(code) == 'False'
+
+
+def test_session_created_on_first_use():
+    code = ('import sys, trakt.core; trakt.core.session.headers; '
+            'print("requests" in sys.modules)')
+    assert run_python(code) == 'True'
+
+
+def test_lazy_submodules():
+    assert trakt.tv.TVShow.__name__ == 'TVShow'
+    assert trakt.core.Core.__name__ == 'Core'
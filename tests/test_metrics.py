@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""tests for request hooks and the trakt.metrics module"""
+from urllib.request import urlopen
+
+import pytest
+
+from trakt.core import Core
+from trakt.errors import NotFoundException
+from trakt.metrics import Histogram, MetricsCollector
+from trakt.transport import MemoryTransport
+from trakt.utils import endpoint_template
+
+
+@pytest.fixture
+def core():
+    transport = MemoryTransport()
+    transport.add('GET', 'shows/game-of-thrones', {'title': 'Game of Thrones'})
+    transport.add('GET', 'shows/breaking-bad', {'title': 'Breaking Bad'})
+    return Core(transport=transport)
+
+
+def get_show(core, slug):
+    @core.get
+    def show():
+        data = yield 'shows/' + slug
+        yield data
+    return show()
+
+
+def test_endpoint_template():
+    urls = {
+        'https://api.trakt.tv/shows/game-of-thrones/seasons/1?extended=full':
+            'shows/{id}/seasons/{id}',
+        'https://api.trakt.tv//movies/trending': 'movies/trending',
+        'shows/updates/2014-09-22?page=1&limit=10': 'shows/updates/{date}',
+        'users/sean/lists/star-wars-in-machete-order/items':
+            'users/{id}/lists/{id}/items',
+        'search/imdb/tt0372784': 'search/imdb/{id}',
+        'shows/game-of-thrones/comments/newest':
+            'shows/{id}/comments/newest',
+        'comments/recent/all/all?page=1': 'comments/recent/all/all',
+        'movies/tron-legacy-2010/lists/personal/popular':
+            'movies/{id}/lists/personal/popular',
+        'users/sean/lists/collaborations': 'users/{id}/lists/collaborations',
+    }
+    for url, template in urls.items():
+        assert endpoint_template(url) == template
+
+
+def test_hooks(core):
+    events = []
+    core.register_hook('before_request',
+                       lambda **kw: events.append(('before', kw['url'])))
+    core.register_hook('after_response',
+                       lambda **kw: events.append(('after', kw['elapsed'])))
+    core.register_hook('on_error',
+                       lambda **kw: events.append(('error', kw['error'])))
+    get_show(core, 'game-of-thrones')
+    with pytest.raises(NotFoundException):
+        get_show(core, 'missing')
+
+    assert [e[0] for e in events] == ['before', 'after', 'before', 'after',
+                                      'error']
+    assert events[0][1].endswith('shows/game-of-thrones')
+    assert isinstance(events[4][1], NotFoundException)
+
+    with pytest.raises(ValueError):
+        core.register_hook('on_sneeze', print)
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+    assert histogram.as_dict() == {
+        'buckets': {'0.1': 1, '1.0': 2, '+Inf': 3}, 'count': 3, 'sum': 5.55}
+
+
+def test_collector(core):
+    collector = MetricsCollector().install(core)
+    get_show(core, 'game-of-thrones')
+    get_show(core, 'breaking-bad')
+    with pytest.raises(NotFoundException):
+        get_show(core, 'missing')
+    core._fire('on_cache_hit', method='get', url='shows/game-of-thrones')
+    collector.uninstall(core)
+    get_show(core, 'game-of-thrones')
+
+    metrics = collector.as_dict()['GET shows/{id}']
+    assert metrics['latency']['count'] == 3
+    assert metrics['statuses'] == {200: 2, 404: 1}
+    assert metrics['errors'] == {'NotFoundException': 1}
+    assert metrics['bytes'] == len(b'{"title": "Game of Thrones"}') + \
+        len(b'{"title": "Breaking Bad"}')
+    assert metrics['cache_hits'] == 1
+    assert metrics['retries'] == 0
+
+    text = collector.to_prometheus()
+    assert 'trakt_request_duration_seconds_count{endpoint="shows/{id}",' \
+           'method="GET"} 3' in text
+    assert 'trakt_responses_total{endpoint="shows/{id}",method="GET",' \
+           'status="404"} 1' in text
+
+    collector.reset()
+    assert collector.as_dict() == {}
+
+
+def test_serve(core):
+    collector = MetricsCollector().install(core)
+    get_show(core, 'game-of-thrones')
+    server = collector.serve(0, host='127.0.0.1')
+    try:
+        url = 'http://127.0.0.1:{}/metrics'.format(server.server_address[1])
+        body = urlopen(url).read().decode('utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert body == collector.to_prometheus()
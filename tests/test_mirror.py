@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.mirror module"""
+import os
+
+from trakt.mirror import CatalogMirror
+from trakt.movies import Movie
+from trakt.tv import TVShow
+
+
+def test_track():
+    mirror = CatalogMirror()
+    twd = mirror.track_show('the-walking-dead')
+    tron = mirror.track_movie('tron-legacy-2010')
+    assert isinstance(twd, TVShow)
+    assert isinstance(tron, Movie)
+    assert len(mirror) == 2
+    assert twd in mirror
+    assert tron in mirror
+    assert mirror.get('shows', twd.trakt).title == twd.title
+    assert mirror.get('movies', 1) is None
+    assert [s.title for s in mirror.shows] == [twd.title]
+    assert [m.title for m in mirror.movies] == [tron.title]
+
+
+def test_first_sync_records_watermark():
+    mirror = CatalogMirror()
+    mirror.track_show('the-walking-dead')
+    refreshed = mirror.sync()
+    assert refreshed == {'shows': [], 'movies': []}
+    assert mirror.watermark is not None
+
+
+def test_sync_refreshes_tracked_titles():
+    mirror = CatalogMirror(page_size=10)
+    mirror.track_show('the-walking-dead')
+    mirror.track_movie('tron-legacy-2010')
+    refreshed = mirror.sync('2014-09-22')
+    # breaking bad and the dark knight were updated, but aren't tracked
+    assert refreshed == {'shows': ['1393'], 'movies': ['343']}
+    assert len(mirror) == 2
+
+
+def test_persistence(tmpdir):
+    path = os.path.join(str(tmpdir), 'mirror.json')
+    mirror = CatalogMirror(path, page_size=10)
+    mirror.track_movie('tron-legacy-2010')
+    mirror.sync('2014-09-22')
+
+    restored = CatalogMirror(path)
+    assert restored.watermark == mirror.watermark
+    assert len(restored) == 1
+    assert restored.get('movies', 343).title == 'TRON: Legacy'
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.profiling module"""
+import warnings
+
+import pytest
+
+from trakt.core import Core
+from trakt.profiling import NPlusOneError, NPlusOneWarning, profile_requests
+from trakt.transport import MemoryTransport
+
+
+@pytest.fixture
+def core():
+    transport = MemoryTransport()
+    transport.add('GET', 'shows/game-of-thrones/seasons/1',
+                  [{'number': n} for n in range(1, 4)])
+    for number in range(1, 4):
+        transport.add('GET', 'shows/game-of-thrones/seasons/1/episodes/{}'
+                      .format(number), {'number': number})
+    return Core(transport=transport)
+
+
+def load_season(core):
+    @core.get
+    def episode(number):
+        data = yield 'shows/game-of-thrones/seasons/1/episodes/{}'.format(
+            number)
+        yield data
+
+    @core.get
+    def season():
+        data = yield 'shows/game-of-thrones/seasons/1'
+        yield [episode(item['number']) for item in data]
+
+    return season()
+
+
+def test_counts(core):
+    with profile_requests(core=core) as profile:
+        load_season(core)
+    assert profile.total == 4
+    assert profile.counts == {
+        'GET shows/{id}/seasons/{id}': 1,
+        'GET shows/{id}/seasons/{id}/episodes/{id}': 3}
+    assert profile.offenders() == {}
+    assert profile.report().splitlines()[:2] == [
+        '4 requests', '     3  GET shows/{id}/seasons/{id}/episodes/{id}']
+
+
+def test_warning(core):
+    with pytest.warns(NPlusOneWarning) as record:
+        with profile_requests(threshold=2, core=core):
+            load_season(core)
+    assert 'episodes/{id} x3' in str(record[0].message)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        with profile_requests(threshold=3, core=core):
+            load_season(core)
+
+
+def test_strict(core):
+    with pytest.raises(NPlusOneError) as error:
+        with profile_requests(threshold=1, strict=True, core=core):
+            load_season(core)
+    assert error.value.profile.total == 4
+
+
+def test_uninstalled_after_block(core):
+    with profile_requests(core=core) as profile:
+        pass
+    load_season(core)
+    assert profile.total == 0
+    assert core.hooks['before_request'] == []
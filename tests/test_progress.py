@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.progress module"""
+import pytest
+
+from trakt.profiling import profile_requests
+from trakt.progress import (clear_structures, compute_progress,
+                            watched_progress)
+from trakt.tv import TVShow
+
+
+@pytest.fixture(autouse=True)
+def structures():
+    clear_structures()
+    yield
+    clear_structures()
+
+
+def test_compute_progress():
+    seasons = [{'number': 1, 'episodes': [
+        {'number': 1, 'last_watched_at': '2020-01-01T00:00:00.000Z'},
+        {'number': 3, 'last_watched_at': '2020-01-03T00:00:00.000Z'},
+        {'number': 2, 'last_watched_at': '2020-01-02T00:00:00.000Z'}]},
+        {'number': 0, 'episodes': [{'number': 1}]}]
+    progress = compute_progress({0: 1, 1: 4, 2: 2}, seasons)
+    assert (progress['aired'], progress['completed']) == (6, 3)
+    assert [s['number'] for s in progress['seasons']] == [1, 2]
+    assert progress['seasons'][0]['episodes'][3] == {
+        'number': 4, 'completed': False, 'last_watched_at': None}
+    assert progress['last_episode'] == {'season': 1, 'number': 3}
+    assert progress['last_watched_at'] == '2020-01-03T00:00:00.000Z'
+    assert progress['next_episode'] == {'season': 1, 'number': 4}
+
+    # the next episode follows the most recently watched one
+    del seasons[0]['episodes'][2]
+    seasons[0]['episodes'][1]['last_watched_at'] = '2019-01-01T00:00:00.000Z'
+    progress = compute_progress({0: 1, 1: 4, 2: 2}, seasons, specials=True)
+    assert progress['completed'] == 3
+    assert progress['next_episode'] == {'season': 1, 'number': 2}
+
+    progress = compute_progress({1: 2}, [])
+    assert progress['last_episode'] is None
+    assert progress['next_episode'] == {'season': 1, 'number': 1}
+    assert compute_progress({1: 1}, seasons)['next_episode'] is None
+
+
+def test_compute_progress_after_reset():
+    seasons = [{'number': 1, 'episodes': [
+        {'number': 1, 'last_watched_at': '2020-01-01T00:00:00.000Z'},
+        {'number': 2, 'last_watched_at': '2020-01-02T00:00:00.000Z'},
+        {'number': 3, 'last_watched_at': '2021-01-03T00:00:00.000Z'}]}]
+    reset_at = '2021-01-01T00:00:00.000Z'
+    progress = compute_progress({1: 4}, seasons, reset_at=reset_at)
+    assert progress['reset_at'] == reset_at
+    assert progress['completed'] == 1
+    assert progress['last_episode'] == {'season': 1, 'number': 3}
+    assert progress['next_episode'] == {'season': 1, 'number': 4}
+
+    progress = compute_progress({1: 2}, seasons[:1], reset_at=reset_at)
+    assert progress['completed'] == 0 and progress['last_episode'] is None
+    assert progress['next_episode'] == {'season': 1, 'number': 1}
+
+
+def test_watched_progress():
+    with profile_requests() as profile:
+        results = watched_progress('sean')
+    assert profile.counts == {'GET users/{id}/watched/shows': 1,
+                              'GET shows/{id}/seasons': 2}
+    (breaking_bad, bb_progress), (parks, parks_progress) = results
+    assert isinstance(breaking_bad, TVShow) and breaking_bad.trakt == 1
+    assert (bb_progress['aired'], bb_progress['completed']) == (20, 4)
+    assert bb_progress['next_episode'] == {'season': 2, 'number': 3}
+    # episodes which haven't aired yet aren't counted
+    assert (parks_progress['aired'], parks_progress['completed']) == (2, 2)
+    assert parks_progress['next_episode'] is None
+
+    # season structures are cached between calls
+    with profile_requests() as profile:
+        again = watched_progress('sean')
+    assert [p.progress for p in again] == [p.progress for p in results]
+    assert profile.total == 1
+
+
+def test_watched_progress_of_loaded_shows():
+    show = TVShow('Breaking Bad', slug='breaking-bad', trakt=1)
+    show.seasons
+    with profile_requests() as profile:
+        (got, progress), = watched_progress('sean', shows=[show])
+    assert got is show
+    assert profile.total == 1
+    assert progress['aired'] == 20
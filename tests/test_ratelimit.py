@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.ratelimit module"""
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from trakt.core import Core
+from trakt.errors import RateLimitException
+from trakt.ratelimit import FileTokenBucket, TokenBucket, retry_after
+from trakt.transport import MemoryTransport, Response
+
+
+def drain(path, count):
+    bucket = FileTokenBucket(path, rate=50, capacity=5)
+    for _ in range(count):
+        bucket.acquire()
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=100, capacity=2)
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0)
+    start = time.time()
+    assert bucket.acquire(timeout=1)
+    assert time.time() - start >= 0.005
+
+
+def test_backoff():
+    bucket = TokenBucket(rate=1000, capacity=10)
+    bucket.backoff(0.05)
+    assert not bucket.acquire(timeout=0.01)
+    assert bucket.acquire(timeout=1)
+
+
+def test_retry_after():
+    assert retry_after(Response(429, {'Retry-After': '3'})) == 3.0
+    assert retry_after(Response(429)) == 1.0
+    assert retry_after(Response(429, {'Retry-After': 'soon'})) == 1.0
+    assert retry_after(Response(429, {'retry-after': '2'})) == 2.0
+
+    class PlainResponse(object):
+        headers = {'retry-after': '4'}
+    assert retry_after(PlainResponse()) == 4.0
+
+
+def test_file_bucket_is_shared(tmpdir):
+    path = os.path.join(str(tmpdir), 'budget')
+    first = FileTokenBucket(path, rate=1, capacity=3)
+    second = FileTokenBucket(path, rate=1, capacity=3)
+    assert first.acquire(timeout=0)
+    assert second.acquire(timeout=0)
+    assert first.acquire(timeout=0)
+    assert not second.acquire(timeout=0)
+
+
+def test_file_bucket_across_processes(tmpdir):
+    path = os.path.join(str(tmpdir), 'budget')
+    processes = [multiprocessing.Process(target=drain, args=(path, 10))
+                 for _ in range(3)]
+    start = time.time()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    # 30 tokens from a bucket of 5 refilling at 50 per second
+    assert time.time() - start >= 0.45
+    assert all(process.exitcode == 0 for process in processes)
+
+
+class FlakyTransport(MemoryTransport):
+    def __init__(self, failures):
+        super(FlakyTransport, self).__init__()
+        self.failures = failures
+        self.add('GET', 'shows/trending', [])
+
+    def request(self, method, url, headers=None, params=None, body=None):
+        if self.failures:
+            self.failures -= 1
+            return Response(429, {'Retry-After': '0.01'})
+        return super(FlakyTransport, self).request(method, url)
+
+
+def trending(core):
+    @core.get
+    def shows():
+        data = yield 'shows/trending'
+        yield data
+    return shows()
+
+
+def test_core_retries_rate_limited_requests():
+    bucket = TokenBucket(rate=1000, max_retries=2)
+    core = Core(transport=FlakyTransport(failures=2), rate_limiter=bucket)
+    retries = []
+    core.register_hook('on_retry', lambda **kw: retries.append(kw['attempt']))
+    assert trending(core) == []
+    assert retries == [1, 2]
+
+    core.transport = FlakyTransport(failures=3)
+    with pytest.raises(RateLimitException):
+        trending(core)
+
+
+def test_core_without_rate_limiter():
+    core = Core(transport=FlakyTransport(failures=1))
+    with pytest.raises(RateLimitException):
+        trending(core)
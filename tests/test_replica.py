@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.replica module"""
+import os
+
+from trakt.movies import Movie
+from trakt.replica import LibraryReplica
+from trakt.sync import get_last_activities
+from trakt.tv import TVShow
+
+
+def test_last_activities():
+    activities = get_last_activities()
+    assert isinstance(activities, dict)
+    assert activities['movies']['watched_at'] == '2014-11-19T21:42:41.823Z'
+
+
+def test_initial_refresh():
+    replica = LibraryReplica('sean')
+    refreshed = replica.refresh()
+    assert sorted(refreshed) == sorted(LibraryReplica.SECTIONS)
+    assert all(isinstance(m, Movie) for m in replica.watched_movies)
+    assert all(isinstance(s, TVShow) for s in replica.watched_shows)
+    assert all(isinstance(m, Movie) for m in replica.movie_collection)
+    assert all(isinstance(s, TVShow) for s in replica.show_collection)
+    assert all(isinstance(m, Movie) for m in replica.watchlist_movies)
+    assert all(isinstance(s, TVShow) for s in replica.watchlist_shows)
+    assert len(replica.watched_movies) == 2
+
+
+def test_refresh_only_stale_sections():
+    replica = LibraryReplica('sean')
+    replica.refresh()
+    assert replica.refresh() == []
+
+    replica.activities['movies']['collected_at'] = '2014-01-01T00:00:00.000Z'
+    assert replica.refresh() == ['movie_collection']
+
+
+def test_find():
+    replica = LibraryReplica('sean')
+    replica.refresh()
+    movie = replica.find('watched_movies', imdb='tt0372784')
+    assert movie.title == 'Batman Begins'
+    assert movie.plays == 4
+    assert replica.find('watched_movies', imdb='tt0000000') is None
+
+
+def test_persistence(tmpdir):
+    path = os.path.join(str(tmpdir), 'replica.json')
+    replica = LibraryReplica('sean', path)
+    replica.refresh()
+
+    restored = LibraryReplica('sean', path)
+    assert restored.activities == replica.activities
+    assert len(restored.watched_shows) == len(replica.watched_shows)
+    assert restored.refresh() == []
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
+import time
+
+import pytest
+
+from tests.conftest import FakeClock
 from trakt.movies import Movie
-from trakt.sync import Scrobbler
+from trakt.profiling import profile_requests
+from trakt.sync import DebouncedScrobbler, ScrobbleScheduler, Scrobbler
 
 
 def test_scrobble():
@@ -22,3 +28,112 @@ def test_scrobbler_context_manager():
     with Scrobbler(guardians, 0.0, '1.0.0', '2015-02-01') as scrob:
         for i in range(10):
             scrob.update(i*10)
+
+
+def test_debounced_scrobbler():
+    """test that progress updates are coalesced but state changes are not"""
+    clock = FakeClock()
+    guardians = Movie('Guardians of the Galaxy', year=2014)
+    with profile_requests(threshold=100) as profile:
+        scrobbler = DebouncedScrobbler(guardians, 1.0, '1.0.0', '2015-02-01',
+                                       interval=900, clock=clock)
+        for second in range(1, 1800):
+            clock.now = float(second)
+            scrobbler.update(second / 18.0)
+        scrobbler.pause()
+        scrobbler.update(99.0)
+        scrobbler.finish()
+    # started at 0s, progress sent at 900s, then resumed after the pause
+    assert profile.counts == {'POST scrobble/start': 3,
+                              'POST scrobble/pause': 1,
+                              'POST scrobble/stop': 1}
+    assert scrobbler.progress == 99.0
+
+
+def test_debounced_scrobbler_retries_failed_updates():
+    """test that progress which failed to reach trakt is still pending"""
+    clock = FakeClock()
+    guardians = Movie('Guardians of the Galaxy', year=2014)
+    scrobbler = DebouncedScrobbler(guardians, 1.0, '1.0.0', '2015-02-01',
+                                   interval=900, clock=clock)
+    post = scrobbler._post
+
+    def unreachable(uri):
+        raise IOError(uri)
+    scrobbler._post = unreachable
+    clock.now = 900.0
+    with pytest.raises(IOError):
+        scrobbler.update(50.0)
+    assert scrobbler.pending and scrobbler.last_sent == 0.0
+
+    scrobbler._post = post
+    assert scrobbler.flush()
+    assert not scrobbler.pending and scrobbler.last_sent == 900.0
+
+
+def test_scrobble_scheduler():
+    """test that the scheduler sends trailing progress once it is due"""
+    clock = FakeClock()
+    guardians = Movie('Guardians of the Galaxy', year=2014)
+    scheduler = ScrobbleScheduler(interval=60, clock=clock)
+    with profile_requests(threshold=100) as profile:
+        first = scheduler.scrobbler(guardians, 1.0, '1.0.0', '2015-02-01')
+        second = scheduler.scrobbler(guardians, 0.0, '1.0.0', '2015-02-01')
+        first.update(2.0)
+        assert scheduler.tick() == 0
+        clock.now = 60.0
+        assert scheduler.tick() == 1
+        assert scheduler.tick() == 0
+        second.update(5.0)
+        second.stop()
+        assert scheduler.tick() == 0
+        assert scheduler.sessions == [first]
+        first.update(3.0)
+        assert scheduler.flush() == 1
+    assert profile.counts['POST scrobble/start'] == 4
+
+
+def test_scrobble_scheduler_thread():
+    """test the scheduler's background thread flushes when stopped"""
+    guardians = Movie('Guardians of the Galaxy', year=2014)
+    scheduler = ScrobbleScheduler(interval=900, resolution=0.01).start()
+    scrobbler = scheduler.scrobbler(guardians, 1.0, '1.0.0', '2015-02-01')
+    scrobbler.update(10.0)
+    assert scrobbler.pending
+    scheduler.stop()
+    assert not scrobbler.pending
+
+
+def test_scrobble_scheduler_survives_failures(caplog):
+    """test that a failed update is retried on a later tick, without holding
+    back the other sessions or stopping the background thread
+    """
+    clock = FakeClock()
+    guardians = Movie('Guardians of the Galaxy', year=2014)
+    scheduler = ScrobbleScheduler(interval=60, resolution=0.01, clock=clock)
+    first = scheduler.scrobbler(guardians, 1.0, '1.0.0', '2015-02-01')
+    second = scheduler.scrobbler(guardians, 1.0, '1.0.0', '2015-02-01')
+    post = first._post
+
+    def unreachable(uri):
+        raise IOError(uri)
+    first._post = unreachable
+    first.update(2.0)
+    second.update(5.0)
+    clock.now = 60.0
+    assert scheduler.tick() == 1
+    assert first.pending and not second.pending
+    assert 'Sending the progress' in caplog.text
+
+    scheduler.start()
+    try:
+        time.sleep(0.05)
+        assert scheduler._thread.is_alive() and first.pending
+        first._post = post
+        for _ in range(100):
+            if not first.pending:
+                break
+            time.sleep(0.01)
+        assert not first.pending
+    finally:
+        scheduler.stop()
@@ -142,3 +142,10 @@ def test_next_episode():
 def test_last_episode():
     got = TVShow('Game of Thrones')
     assert isinstance(got.last_episode, TVEpisode)
+
+
+def test_watched_progress():
+    got = TVShow('Game of Thrones')
+    progress = got.watched_progress
+    assert (progress['aired'], progress['completed']) == (2, 1)
+    assert progress['next_episode']['title'] == 'The Kingsroad'
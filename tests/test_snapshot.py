@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.snapshot module"""
+import pytest
+
+from trakt import snapshot
+from trakt.comments import iter_comments
+from trakt.core import Airs
+from trakt.movies import Movie
+from trakt.profiling import profile_requests
+from trakt.tv import TVSeason, TVShow
+from trakt.users import User
+
+
+def build_catalog():
+    show = TVShow('Game of Thrones')
+    show.seasons
+    lst = User('sean').get_list('Star Wars in machete order')
+    comments = list(iter_comments('shows/game-of-thrones/comments', limit=2))
+    return {'shows': [show], 'movies': [Movie('TRON: Legacy', year=2010)],
+            'lists': [lst], 'comments': comments}
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    return build_catalog()
+
+
+def check_catalog(loaded):
+    expected = build_catalog()
+    show, = loaded['shows']
+    assert isinstance(show, TVShow)
+    assert isinstance(show.airs, Airs)
+    assert show.first_aired == expected['shows'][0].first_aired
+    with profile_requests() as profile:
+        assert all(isinstance(s, TVSeason) for s in show.seasons)
+        assert show.network == 'HBO'
+        assert loaded['movies'][0].tagline == 'The Game Has Changed.'
+        assert list(loaded['lists'][0]) and \
+            len(list(loaded['lists'][0])) == len(list(expected['lists'][0]))
+    assert profile.total == 0
+    comment = loaded['comments'][0]
+    assert comment.user.slug == 'sean'
+    assert comment == expected['comments'][0]
+
+
+@pytest.mark.parametrize('encoding', [snapshot.MARSHAL, snapshot.MSGPACK])
+def test_round_trip(catalog, encoding):
+    if encoding == snapshot.MSGPACK:
+        pytest.importorskip('msgpack')
+    data = snapshot.dumps(catalog, encoding)
+    assert data.startswith(snapshot.MAGIC)
+    check_catalog(snapshot.loads(data))
+
+
+def test_to_dict_round_trip(catalog):
+    flat = snapshot.to_dict(catalog)
+    assert snapshot.to_dict(snapshot.from_dict(flat)) == flat
+
+
+def test_file_round_trip(catalog, tmpdir):
+    path = str(tmpdir.join('catalog.snapshot'))
+    snapshot.dump(catalog, path)
+    check_catalog(snapshot.load(path))
+
+
+def test_bad_snapshots():
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.loads(b'{"shows": []}')
+    data = snapshot.dumps([], snapshot.MARSHAL)
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.loads(data[:9] + bytes([2, 7]) + data[11:])
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.from_dict({'__type__': 'os.system', 'state': {}})
+    with pytest.raises(TypeError):
+        snapshot.to_dict([object()])
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.tracing module"""
+import json
+import os
+
+import pytest
+
+from trakt.core import Core
+from trakt.errors import NotFoundException
+from trakt.tracing import FileExporter, InMemoryExporter, Tracer
+from trakt.transport import MemoryTransport
+
+
+@pytest.fixture
+def core():
+    transport = MemoryTransport()
+    transport.add('GET', 'shows/game-of-thrones', {'title': 'Game of Thrones'})
+    transport.add('GET', 'shows/game-of-thrones/seasons', [{'number': 1}])
+    return Core(transport=transport, tracer=Tracer())
+
+
+def build_calls(core):
+    @core.get
+    def seasons():
+        data = yield 'shows/game-of-thrones/seasons'
+        yield data
+
+    @core.get
+    def show():
+        data = yield 'shows/game-of-thrones'
+        data['seasons'] = seasons()
+        yield data
+
+    @core.get
+    def missing():
+        yield 'shows/missing'
+
+    return show, missing
+
+
+def test_phases(core):
+    show, _ = build_calls(core)
+    assert show()['seasons'] == [{'number': 1}]
+    spans = core.tracer.exporter.spans
+    by_id = {span.span_id: span for span in spans}
+
+    def path(span):
+        names = []
+        while span is not None:
+            names.insert(0, span.name)
+            span = by_id.get(span.parent_id)
+        return '/'.join(names)
+
+    assert sorted(path(span) for span in spans) == [
+        'call', 'call/build', 'call/build/call', 'call/build/call/build',
+        'call/build/call/decode', 'call/build/call/network', 'call/decode',
+        'call/network']
+    assert len({span.trace_id for span in spans}) == 1
+    assert all(span.duration >= 0 for span in spans)
+
+    network = [span for span in spans if span.name == 'network']
+    assert network[0].attributes['url'].endswith('shows/game-of-thrones')
+    assert network[0].attributes['method'] == 'get'
+
+
+def test_totals(core):
+    show, _ = build_calls(core)
+    show()
+    exporter = core.tracer.exporter
+    totals = exporter.totals()
+    exclusive = exporter.exclusive_totals()
+    assert sorted(totals) == ['build', 'call', 'decode', 'network']
+    assert exclusive['call'] <= totals['call']
+    assert exclusive['build'] <= totals['build']
+    assert sum(exclusive.values()) == pytest.approx(
+        sum(span.duration for span in exporter.spans
+            if span.parent_id is None))
+
+    exporter.clear()
+    assert exporter.spans == []
+
+
+def test_errors_are_recorded(core):
+    _, missing = build_calls(core)
+    with pytest.raises(NotFoundException):
+        missing()
+    call = [s for s in core.tracer.exporter.spans if s.name == 'call'][0]
+    assert call.error == 'NotFoundException'
+
+
+def test_file_exporter(core, tmpdir):
+    path = os.path.join(str(tmpdir), 'trace.jsonl')
+    core.tracer = Tracer(FileExporter(path))
+    show, _ = build_calls(core)
+    show()
+    with open(path) as trace_file:
+        spans = [json.loads(line) for line in trace_file]
+    assert len(spans) == 8
+    assert spans[-1]['name'] == 'call'
+    assert spans[-1]['parent_id'] is None
+
+
+def test_tracing_disabled():
+    core = Core(transport=MemoryTransport())
+    assert core.tracer is None
+    with core._trace('call') as span:
+        assert span is None
+    assert isinstance(Tracer().exporter, InMemoryExporter)
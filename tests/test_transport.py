@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""tests for the trakt.transport module"""
+import json
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import trakt.core
+from trakt.core import Core
+from trakt.errors import NotFoundException
+from trakt.transport import (HTTPXTransport, MemoryTransport,
+                             RecordingTransport, ReplayTransport,
+                             Urllib3Transport, request_key)
+
+URL = 'https://api.trakt.tv/shows/game-of-thrones'
+
+
+def build_memory_transport():
+    transport = MemoryTransport()
+    transport.add('GET', 'shows/game-of-thrones', {'title': 'Game of Thrones'},
+                  headers={'X-Pagination-Page-Count': '1'})
+    transport.add('DELETE', 'checkin', None)
+    return transport
+
+
+def test_request_key():
+    assert request_key('get', URL) == 'GET shows/game-of-thrones'
+    assert request_key('get', URL + '?extended=full', {'page': 2}) == \
+        'GET shows/game-of-thrones?extended=full&page=2'
+    assert request_key('post', 'https://api.trakt.tv//sync/history') == \
+        'POST sync/history'
+
+
+def test_memory_transport():
+    transport = build_memory_transport()
+    response = transport.request('get', URL)
+    assert response.status_code == 200
+    assert response.headers['X-Pagination-Page-Count'] == '1'
+    assert response.json() == {'title': 'Game of Thrones'}
+
+    assert transport.request('delete', 'https://api.trakt.tv/checkin') \
+        .status_code == 204
+    assert transport.request('get', URL + '/people').status_code == 404
+
+
+def test_memory_transport_isolation():
+    transport = build_memory_transport()
+    data = transport.request('get', URL).json()
+    data['title'] = 'changed'
+    assert transport.request('get', URL).json()['title'] == 'Game of Thrones'
+
+
+def test_core_transport():
+    core = Core(transport=build_memory_transport())
+
+    @core.get
+    def show():
+        data = yield 'shows/game-of-thrones'
+        yield data['title']
+
+    @core.get
+    def missing():
+        yield 'shows/game-of-thrones/people'
+
+    assert show() == 'Game of Thrones'
+    with pytest.raises(NotFoundException):
+        missing()
+
+
+def test_record_and_replay(tmpdir):
+    path = os.path.join(str(tmpdir), 'cassette.json')
+    with RecordingTransport(path, build_memory_transport()) as recorder:
+        recorder.request('get', URL)
+        recorder.request('get', URL + '/people')
+    assert len(recorder.interactions) == 2
+
+    replay = ReplayTransport(path)
+    response = replay.request('get', URL)
+    assert response.json() == {'title': 'Game of Thrones'}
+    assert response.headers['X-Pagination-Page-Count'] == '1'
+    assert response.headers['x-pagination-page-count'] == '1'
+    assert replay.request('get', URL + '/people').status_code == 404
+    with pytest.raises(KeyError):
+        replay.request('get', URL + '/aliases')
+
+
+def test_replay_latency(tmpdir):
+    path = os.path.join(str(tmpdir), 'cassette.json')
+    with RecordingTransport(path, build_memory_transport()) as recorder:
+        recorder.request('get', URL)
+
+    calls = []
+
+    def latency():
+        calls.append(1)
+        return 0.0
+
+    replay = ReplayTransport(path, latency=latency)
+    replay.request('get', URL)
+    replay.request('get', URL)
+    assert len(calls) == 2
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    def _respond(self, payload):
+        body = json.dumps(payload).encode('UTF-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond({'path': self.path,
+                       'api_key': self.headers['trakt-api-key']})
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        self._respond({'body': json.loads(self.rfile.read(length))})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = HTTPServer(('127.0.0.1', 0), EchoHandler)
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield 'http://127.0.0.1:{}/'.format(httpd.server_address[1])
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.mark.parametrize('name', ['urllib3', 'httpx'])
+def test_http_transports(server, name):
+    if name == 'httpx':
+        pytest.importorskip('httpx')
+        transport = HTTPXTransport()
+    else:
+        transport = Urllib3Transport()
+    try:
+        headers = {'trakt-api-key': 'FOO', 'Authorization': None}
+        response = transport.request('get', server + 'shows',
+                                     params={'page': 2}, headers=headers)
+        assert response.status_code == 200
+        assert response.json() == {'path': '/shows?page=2', 'api_key': 'FOO'}
+
+        response = transport.request('post', server + 'sync/history',
+                                     body={'movies': []})
+        assert response.json() == {'body': {'movies': []}}
+    finally:
+        getattr(transport, 'close', lambda: None)()
+
+
+def _serve_h2(sock, barrier):
+    """Answer every request of a cleartext HTTP/2 connection once *barrier*
+    has been reached, so that the requests are all in flight together
+    """
+    import h2.config
+    import h2.connection
+    import h2.events
+
+    conn = h2.connection.H2Connection(
+        h2.config.H2Configuration(client_side=False))
+    conn.initiate_connection()
+    sock.sendall(conn.data_to_send())
+    streams = []
+    while True:
+        chunk = sock.recv(65535)
+        if not chunk:
+            break
+        for event in conn.receive_data(chunk):
+            if isinstance(event, h2.events.RequestReceived):
+                streams.append(event.stream_id)
+        if len(streams) == barrier:
+            for stream_id in streams:
+                conn.send_headers(stream_id, [(':status', '200')])
+                conn.send_data(stream_id, b'{}', end_stream=True)
+        sock.sendall(conn.data_to_send())
+    sock.close()
+
+
+def test_httpx_multiplexes_over_one_connection():
+    pytest.importorskip('httpx')
+    pytest.importorskip('h2')
+    requests, connections = 8, []
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(requests)
+
+    def accept():
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except OSError:
+                return
+            connections.append(sock)
+            threading.Thread(target=_serve_h2, args=(sock, requests),
+                             daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    url = 'http://127.0.0.1:{}/shows'.format(listener.getsockname()[1])
+    # prior knowledge HTTP/2, since the stand-in server has no TLS
+    transport = HTTPXTransport(http1=False, timeout=5)
+    try:
+        with ThreadPoolExecutor(max_workers=requests) as executor:
+            responses = list(executor.map(
+                lambda _: transport.request('get', url), range(requests)))
+    finally:
+        transport.close()
+        listener.close()
+    assert [r.json() for r in responses] == [{}] * requests
+    assert len(connections) == 1
+    assert transport._thread is None and transport.client.is_closed
+
+
+def test_auth_requests_use_core_transport(monkeypatch):
+    transport = MemoryTransport()
+    transport.add('POST', 'oauth/device/token', {
+        'access_token': 'token', 'refresh_token': 'refresh',
+        'created_at': 1519329051, 'expires_in': 7776000})
+    monkeypatch.setattr(trakt.core.CORE, 'transport', transport)
+    for name in ('CLIENT_ID', 'CLIENT_SECRET', 'OAUTH_TOKEN',
+                 'OAUTH_REFRESH'):
+        monkeypatch.setattr(trakt.core, name, getattr(trakt.core, name))
+    monkeypatch.setitem(trakt.core.HEADERS, 'trakt-api-key',
+                        trakt.core.HEADERS['trakt-api-key'])
+
+    response = trakt.core.get_device_token('code', 'id', 'secret')
+    assert response.status_code == 200
+    assert trakt.core.OAUTH_TOKEN == 'token'
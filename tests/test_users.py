@@ -4,6 +4,7 @@ from trakt.tv import TVShow, TVEpisode, TVSeason
 from trakt.users import (User, UserList, Request, get_all_requests,
                          get_user_settings)
 from trakt.people import Person
+from trakt.profiling import profile_requests
 
 
 def test_user_settings():
@@ -128,3 +129,29 @@ def test_watched():
 def test_stats():
     sean = User('sean')
     assert isinstance(sean.get_stats(), dict)
+
+
+def test_user_list_items_from_embedded_data():
+    with profile_requests(threshold=1, strict=True) as profile:
+        ulist = UserList.get('Star Wars in machete order', 'sean')
+    assert profile.total == 2
+
+    movie, show, season, episode, person = list(ulist)
+    assert movie.title == 'Star Wars: Episode IV - A New Hope'
+    assert movie.year == 1977
+    assert movie.imdb == 'tt0076759'
+    assert show.slug == 'the-walking-dead'
+    assert show.tvdb == 153021
+    assert (season.show, season.season) == ('Breaking Bad', 1)
+    assert (episode.title, episode.season, episode.number) == \
+        ('Wedding Day', 0, 2)
+    assert person.slug == 'garrett-hedlund'
+
+
+def test_user_list_iter_items():
+    ulist = UserList.get('Star Wars in machete order', 'sean')
+    with profile_requests(threshold=2, strict=True) as profile:
+        items = list(ulist.iter_items(limit=3))
+    assert profile.total == 2
+    assert [type(item) for item in items] == \
+        [Movie, TVShow, TVSeason, TVEpisode, Person]
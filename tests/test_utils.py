@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 """unit tests for the trakt.utils module"""
 from datetime import datetime
-from trakt.utils import (slugify, airs_date, now, timestamp, extract_ids)
+from trakt.utils import (slugify, airs_date, now, timestamp, extract_ids,
+                         paginate)
 
 
 def test_slugify():
@@ -58,3 +59,16 @@ def test_extract_ids():
     input_dict = {'ids': ids}
     result = extract_ids(input_dict)
     assert result == ids
+
+
+def test_paginate():
+    """verify that paginate requests pages until a short page is returned"""
+    pages = {1: [1, 2], 2: [3, 4], 3: [5]}
+    requested = []
+
+    def fetch(page, limit):
+        requested.append(page)
+        return pages.get(page)
+
+    assert list(paginate(fetch, limit=2)) == [1, 2, 3, 4, 5]
+    assert requested == [1, 2, 3]
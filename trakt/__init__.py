@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 """A wrapper for the Trakt.tv REST API"""
+import importlib
+
 try:
     from trakt.core import *  # NOQA
 except ImportError:
@@ -8,3 +10,18 @@ except ImportError:
 version_info = (3, 4, 0)
 __author__ = 'Jon Nappi'
 __version__ = '.'.join([str(i) for i in version_info])
+
+#: Submodules which are only imported the first time they're accessed as an
+#: attribute of this package, ie ``trakt.tv.TVShow``
+_LAZY_SUBMODULES = ('cache', 'calendar', 'client', 'comments', 'crawler',
+                    'deadline', 'device', 'diff', 'errors', 'extended',
+                    'metrics', 'mirror', 'movies', 'people', 'profiling',
+                    'progress', 'ratelimit', 'replica', 'snapshot', 'sync',
+                    'tracing', 'transport', 'tv', 'users', 'utils')
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module('trakt.' + name)
+    msg = 'module {!r} has no attribute {!r}'.format(__name__, name)
+    raise AttributeError(msg)
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""Caching layers, implemented as transports wrapping another transport so
+that they can be stacked in front of any of the transports in
+:mod:`trakt.transport`::
+
+    trakt.core.CORE.transport = StaleWhileRevalidateCache(NegativeCache())
+
+Responses served from a cache are flagged with ``from_cache``, which fires
+the *on_cache_hit* hook of the :class:`trakt.core.Core` sending them.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from trakt.transport import Response, SessionTransport, request_key
+
+__author__ = 'Jon Nappi'
+__all__ = ['CHART_URIS', 'NegativeCache', 'StaleWhileRevalidateCache']
+
+#: Response bodies which hold no data, ie an empty listing
+EMPTY_BODIES = (b'', b'[]', b'{}', b'null')
+
+#: The public chart endpoints, whose responses are the same for every user
+CHART_URIS = frozenset(
+    '{}/{}'.format(media, chart) for media in ('shows', 'movies')
+    for chart in ('trending', 'popular', 'anticipated', 'boxoffice',
+                  'played/weekly', 'watched/weekly', 'collected/weekly'))
+
+
+def _freeze(response):
+    """The parts of *response* stored by a cache"""
+    return (response.status_code, dict(response.headers), response.content,
+            getattr(response, 'reason', '') or '')
+
+
+def _cached_response(entry):
+    status_code, headers, content, reason = entry
+    response = Response(status_code, headers, content, reason)
+    response.from_cache = True
+    return response
+
+
+class NegativeCache(object):
+    """A transport remembering which resources are known to be missing. GET
+    requests answered with a 404, a 204 No Content or an empty body, ie a
+    show without a next episode or a search for an unknown id, are answered
+    from memory until *ttl* seconds have passed. Entries are keyed on the
+    endpoint and the credentials it was requested with, and every request
+    other than a GET clears the cache, since it may have created a resource
+    which was missing until then.
+    """
+    def __init__(self, transport=None, ttl=3600, max_entries=10000,
+                 statuses=(404,), cache_empty=True, clock=time.monotonic):
+        """Create a new :class:`NegativeCache`
+
+        :param transport: The transport to pass requests through to. Defaults
+            to a :class:`trakt.transport.SessionTransport`
+        :param ttl: The number of seconds a missing resource is remembered for
+        :param max_entries: The maximum number of entries, the least recently
+            used entry being evicted beyond it
+        :param statuses: The status codes meaning a resource is missing
+        :param cache_empty: Whether to also cache 204 and empty 200 responses
+        :param clock: The function returning the current time in seconds
+        """
+        self.transport = transport
+        if transport is None:
+            self.transport = SessionTransport()
+        self.ttl, self.max_entries = ttl, max_entries
+        self.statuses, self.cache_empty = tuple(statuses), cache_empty
+        self.clock = clock
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _is_negative(self, response):
+        if response.status_code in self.statuses:
+            return True
+        if not self.cache_empty:
+            return False
+        if response.status_code == 204:
+            return True
+        return response.status_code == 200 and \
+            response.content.strip() in EMPTY_BODIES
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, cached = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return cached
+
+    def _store(self, key, response):
+        cached = _freeze(response)
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, cached)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, uri=None):
+        """Forget every cached entry, or only those of *uri*
+
+        :param uri: Optional uri relative to the API host, including its query
+            string, ie ``shows/game-of-thrones/next_episode``
+        """
+        with self._lock:
+            if uri is None:
+                self._entries.clear()
+                return
+            target = request_key('get', uri)
+            for key in [k for k in self._entries if k[0] == target]:
+                del self._entries[key]
+
+    def request(self, method, url, headers=None, params=None, body=None,
+                timeout=None):
+        extra = {} if timeout is None else {'timeout': timeout}
+        if method != 'get':
+            self.invalidate()
+            return self.transport.request(method, url, headers=headers,
+                                          params=params, body=body, **extra)
+        key = (request_key(method, url, params),
+               (headers or {}).get('Authorization'))
+        cached = self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            return _cached_response(cached)
+        self.misses += 1
+        response = self.transport.request(method, url, headers=headers,
+                                          params=params, **extra)
+        if self._is_negative(response):
+            self._store(key, response)
+        return response
+
+
+class StaleWhileRevalidateCache(object):
+    """A transport serving hot, public endpoints such as the charts from
+    memory. Responses are fresh for *ttl* seconds. For *stale_ttl* seconds
+    after that they're still served immediately, while a single background
+    refresh per endpoint fetches a new response. Concurrent requests for an
+    endpoint which isn't cached at all share a single request, so an expired
+    entry never causes a stampede. Only successful responses are cached, keyed
+    on the endpoint alone, so *uris* must only hold endpoints whose responses
+    are the same for every user.
+    """
+    def __init__(self, transport=None, ttl=300, stale_ttl=3600,
+                 uris=CHART_URIS, max_entries=1000, max_workers=2,
+                 refresh_timeout=30, clock=time.monotonic):
+        """Create a new :class:`StaleWhileRevalidateCache`
+
+        :param transport: The transport to pass requests through to. Defaults
+            to a :class:`trakt.transport.SessionTransport`
+        :param ttl: The number of seconds a response is fresh for
+        :param stale_ttl: The number of seconds a response may be served for
+            after turning stale, while it's refreshed in the background
+        :param uris: The uris to cache, relative to the API host and without
+            their query string, or `None` to cache every GET request
+        :param max_entries: The maximum number of entries, the least recently
+            used entry being evicted beyond it
+        :param max_workers: The maximum number of concurrent refreshes
+        :param refresh_timeout: The number of seconds to wait for the
+            response to a background refresh, after which the entry is
+            refreshed again by the next stale hit. `None` waits forever, for
+            transports which don't accept a timeout
+        :param clock: The function returning the current time in seconds
+        """
+        self.transport = transport
+        if transport is None:
+            self.transport = SessionTransport()
+        self.ttl, self.stale_ttl = ttl, stale_ttl
+        self.uris = None if uris is None else frozenset(uris)
+        self.max_entries, self.max_workers = max_entries, max_workers
+        self.refresh_timeout = refresh_timeout
+        self.clock = clock
+        self.hits = self.stale_hits = self.misses = 0
+        self.logger = logging.getLogger('trakt.cache')
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _cacheable(self, method, url):
+        if method != 'get':
+            return False
+        return self.uris is None or \
+            urlsplit(url).path.lstrip('/') in self.uris
+
+    def _fetch(self, key, url, headers, params, timeout=None):
+        """Request *url* and store the response if it was successful"""
+        extra = {} if timeout is None else {'timeout': timeout}
+        response = self.transport.request('get', url, headers=headers,
+                                          params=params, **extra)
+        if response.status_code == 200:
+            with self._lock:
+                self._entries[key] = (self.clock(), _freeze(response))
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return response
+
+    def _refresh(self, key, url, headers, params):
+        try:
+            return _freeze(self._fetch(key, url, headers, params,
+                                       self.refresh_timeout))
+        except Exception:
+            self.logger.warning('Refreshing %s failed, serving it stale',
+                                key, exc_info=True)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _schedule_refresh(self, key, url, headers, params):
+        """Refresh *key* in the background, unless it's already in flight.
+        Must be called with the lock held
+        """
+        if key in self._inflight:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers)
+        self._inflight[key] = self._executor.submit(
+            self._refresh, key, url, headers, params)
+
+    def request(self, method, url, headers=None, params=None, body=None,
+                timeout=None):
+        if not self._cacheable(method, url):
+            extra = {} if timeout is None else {'timeout': timeout}
+            return self.transport.request(method, url, headers=headers,
+                                          params=params, body=body, **extra)
+        key = request_key(method, url, params)
+        headers = dict(headers or {})
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = self.clock() - entry[0]
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    if age < self.ttl:
+                        self.hits += 1
+                    else:
+                        self.stale_hits += 1
+                        self._schedule_refresh(key, url, headers, params)
+                    return _cached_response(entry[1])
+                del self._entries[key]
+            self.misses += 1
+            flight = self._inflight.get(key)
+            if flight is None:
+                flight = self._inflight[key] = Future()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            # another request for the same key is in flight, share its result
+            return _cached_response(flight.result(timeout))
+        try:
+            response = self._fetch(key, url, headers, params, timeout)
+        except Exception as error:
+            flight.set_exception(error)
+            raise
+        else:
+            flight.set_result(_freeze(response))
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return response
+
+    def invalidate(self, uri=None):
+        """Forget every cached entry, or only those of *uri*, including any
+        query string
+        """
+        with self._lock:
+            if uri is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(request_key('get', uri), None)
+
+    def wait(self):
+        """Block until every background refresh in flight has finished"""
+        with self._lock:
+            flights = list(self._inflight.values())
+        for flight in flights:
+            try:
+                flight.result()
+            except Exception:
+                pass
+
+    def close(self):
+        """Wait for in flight refreshes and stop the refresh threads. The
+        interpreter waits for them too when it exits, for at most
+        *refresh_timeout* seconds, unless :meth:`close` was called first
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
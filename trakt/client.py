@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""Client objects owning their own Trakt.tv credentials, session, transport
+and rate limiting state, so that a single process may act on behalf of many
+Trakt.tv users at once. Every endpoint function and model class can be used
+against a client by calling it while that client is active::
+
+    alice = TraktClient(CLIENT_ID, CLIENT_SECRET, oauth_token=alice_token)
+    with alice:
+        shows = trakt.users.User('alice').watched_shows
+
+Clients are active per context, so concurrent threads or asyncio tasks may
+each use a different client. Note that lazily loaded attributes of model
+objects are requested with whichever client is active when they are first
+accessed.
+"""
+import json
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from trakt import core
+from trakt.core import ACTIVE_CLIENT, Core, _LazySession
+from trakt.transport import SessionTransport
+
+__author__ = 'Jon Nappi'
+__all__ = ['TraktClient', 'get_active_client']
+
+
+def get_active_client():
+    """The :class:`TraktClient` active in the current context, or `None` if
+    calls are being made with the global credentials
+    """
+    return ACTIVE_CLIENT.get()
+
+
+class ClientCore(Core):
+    """A :class:`Core` which sends requests with the credentials of its
+    :class:`TraktClient` rather than the module level globals
+    """
+    def __init__(self, client, **kwargs):
+        super(ClientCore, self).__init__(**kwargs)
+        self.client = client
+
+    def _bootstrap(self):
+        self.client.validate_token()
+
+    def _request_headers(self):
+        return self.client.headers()
+
+    def _fire(self, event, **kwargs):
+        # calls made through the global CORE are routed here while the client
+        # is active, so hooks registered on it, ie by profile_requests or
+        # MetricsCollector.install, see them too
+        super(ClientCore, self)._fire(event, **kwargs)
+        core.CORE._fire(event, **kwargs)
+
+
+class TraktClient(object):
+    """A Trakt.tv API client acting on behalf of a single user"""
+    def __init__(self, client_id, client_secret=None, oauth_token=None,
+                 oauth_refresh=None, oauth_expires_at=None, transport=None,
+                 rate_limiter=None, tracer=None, on_token_refresh=None,
+                 redirect_uri=core.REDIRECT_URI, timeout=None):
+        """Create a new :class:`TraktClient`
+
+        :param client_id: The Client ID of your OAuth Application
+        :param client_secret: The Client Secret of your OAuth Application,
+            needed to refresh expired tokens
+        :param oauth_token: The OAuth token of the user to act on behalf of
+        :param oauth_refresh: The OAuth refresh token of that user
+        :param oauth_expires_at: The timestamp at which *oauth_token* expires
+        :param transport: The transport used to send requests. Defaults to a
+            :class:`SessionTransport` with a session owned by this client
+        :param rate_limiter: Optional :class:`trakt.ratelimit.TokenBucket`
+            for this client's requests. May be shared between clients
+        :param tracer: Optional :class:`trakt.tracing.Tracer`
+        :param on_token_refresh: Optional callable called with this client
+            after its token was refreshed, ie to persist the new token
+        :param redirect_uri: The OAuth2 Redirect URI of your application
+        :param timeout: Optional number of seconds to wait for a response to
+            each of this client's requests. Defaults to
+            :data:`trakt.core.TIMEOUT`
+        """
+        self.client_id, self.client_secret = client_id, client_secret
+        self.oauth_token, self.oauth_refresh = oauth_token, oauth_refresh
+        self.oauth_expires_at = oauth_expires_at
+        self.redirect_uri = redirect_uri
+        self.on_token_refresh = on_token_refresh
+        self.session = _LazySession()
+        if transport is None:
+            transport = SessionTransport(self.session)
+        self.core = ClientCore(self, transport=transport, tracer=tracer,
+                               rate_limiter=rate_limiter, timeout=timeout)
+        self._token_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, path, **kwargs):
+        """Create a :class:`TraktClient` from a config file in the format
+        written to :data:`trakt.core.CONFIG_PATH`
+        """
+        with open(path) as config_file:
+            config = json.load(config_file)
+        return cls(config.get('CLIENT_ID'),
+                   client_secret=config.get('CLIENT_SECRET'),
+                   oauth_token=config.get('OAUTH_TOKEN'),
+                   oauth_refresh=config.get('OAUTH_REFRESH'),
+                   oauth_expires_at=config.get('OAUTH_EXPIRES_AT'), **kwargs)
+
+    @property
+    def transport(self):
+        return self.core.transport
+
+    def headers(self):
+        """The headers sent with every request made by this client"""
+        headers = {'Content-Type': 'application/json',
+                   'trakt-api-version': '2',
+                   'trakt-api-key': self.client_id}
+        if self.oauth_token is not None:
+            headers['Authorization'] = 'Bearer {0}'.format(self.oauth_token)
+        return headers
+
+    def validate_token(self):
+        """Refresh this client's OAuth token if it expires within two days"""
+        if self.oauth_expires_at is None or self.oauth_refresh is None:
+            return
+        expires_at = datetime.fromtimestamp(self.oauth_expires_at,
+                                            tz=timezone.utc)
+        if expires_at - datetime.now(tz=timezone.utc) <= timedelta(days=2):
+            self.refresh_token()
+
+    def refresh_token(self):
+        """Request a new OAuth token using this client's refresh token"""
+        refresh = self.oauth_refresh
+        with self._token_lock:
+            if self.oauth_refresh != refresh:
+                # refreshed by another thread while this one was waiting
+                return
+            data = {'client_id': self.client_id,
+                    'client_secret': self.client_secret,
+                    'refresh_token': self.oauth_refresh,
+                    'redirect_uri': self.redirect_uri,
+                    'grant_type': 'refresh_token'}
+            response = core._auth_post('/oauth/token', data,
+                                       headers=self.headers(),
+                                       transport=self.transport,
+                                       timeout=self.core.timeout)
+            if response.status_code in self.core.error_map:
+                raise self.core.error_map[response.status_code](response)
+            data = json.loads(response.content.decode('UTF-8', 'ignore'))
+            self.oauth_token = data.get('access_token')
+            self.oauth_refresh = data.get('refresh_token')
+            self.oauth_expires_at = data.get('created_at') + \
+                data.get('expires_in')
+        if self.on_token_refresh is not None:
+            self.on_token_refresh(self)
+
+    @contextmanager
+    def activate(self):
+        """Route calls made in the current context through this client for
+        the duration of a ``with`` block
+        """
+        token = ACTIVE_CLIENT.set(self)
+        try:
+            yield self
+        finally:
+            ACTIVE_CLIENT.reset(token)
+
+    def call(self, func, *args, **kwargs):
+        """Call *func* with *args* and *kwargs* while this client is active"""
+        with self.activate():
+            return func(*args, **kwargs)
+
+    def __enter__(self):
+        ACTIVE_CLIENT.enter(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        ACTIVE_CLIENT.exit()
+
+    def __str__(self):
+        return '<TraktClient {}>'.format(self.client_id)
+    __repr__ = __str__
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Streaming access to the comments posted on Trakt.tv media. Comments are
+requested a page at a time as they are iterated over, replies are only
+requested for the comments whose replies are walked, and commenters are kept
+as lightweight :class:`UserRef` references rather than full
+:class:`trakt.users.User` objects.
+"""
+from collections import namedtuple
+
+from trakt.core import Comment, get
+from trakt.utils import paginate, slugify
+
+__author__ = 'Jon Nappi'
+__all__ = ['UserRef', 'StreamedComment', 'iter_comments', 'iter_replies']
+
+#: The orders trakt can sort comments in
+SORT_ORDERS = ('newest', 'oldest', 'likes', 'replies', 'highest', 'lowest',
+               'plays')
+
+
+class UserRef(namedtuple('UserRef', ['username', 'name', 'private', 'vip',
+                                     'vip_ep'])):
+    """A lightweight reference to the :class:`trakt.users.User` who posted a
+    comment, holding only the profile fields embedded in the comment
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_data(cls, data):
+        return cls(**{field: data.get(field) for field in cls._fields})
+
+    @property
+    def slug(self):
+        return slugify(self.username)
+
+    def resolve(self):
+        """Request and return the full :class:`trakt.users.User`"""
+        from trakt.users import User
+        return User(self.username)
+
+
+class StreamedComment(Comment):
+    """A :class:`trakt.core.Comment` whose *user* is a :class:`UserRef`, and
+    whose replies can be streamed on demand
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_data(cls, data):
+        values = {field: data.get(field) for field in cls._fields}
+        values['user'] = UserRef.from_data(data.get('user') or {})
+        return cls(**values)
+
+    def iter_replies(self, limit=100):
+        """Iterate over the direct replies to this comment, requesting them a
+        page at a time. No request is sent if the comment has no replies
+        """
+        if not self.replies:
+            return iter(())
+        return iter_replies(self.id, limit=limit)
+
+    def walk(self, max_depth=None, limit=100):
+        """Iterate depth first over the whole tree of replies to this comment,
+        yielding ``(depth, comment)`` tuples, where direct replies have a depth
+        of 1. Replies are requested lazily, for one comment at a time
+
+        :param max_depth: Optional depth beyond which replies are not fetched
+        :param limit: The number of replies to request per page
+        """
+        if max_depth is not None and max_depth < 1:
+            return
+        for reply in self.iter_replies(limit=limit):
+            yield 1, reply
+            remaining = None if max_depth is None else max_depth - 1
+            for depth, nested in reply.walk(remaining, limit):
+                yield depth + 1, nested
+
+
+@get
+def _comments_page(uri, page, limit):
+    data = yield '{uri}?page={page}&limit={limit}'.format(uri=uri, page=page,
+                                                          limit=limit)
+    yield [StreamedComment.from_data(com) for com in data or []]
+
+
+def iter_comments(uri, sort=None, limit=100):
+    """Iterate over the comments of the resource at *uri*, ie
+    ``shows/game-of-thrones/comments``, requesting them a page at a time as
+    iteration progresses
+
+    :param uri: The uri of the comments endpoint
+    :param sort: Optional order to sort comments in, one of
+        :data:`SORT_ORDERS`. Defaults to trakt's own order, newest first
+    :param limit: The number of comments to request per page
+    """
+    if sort is not None:
+        if sort not in SORT_ORDERS:
+            raise ValueError('sort must be one of {}'.format(SORT_ORDERS))
+        uri = '{uri}/{sort}'.format(uri=uri, sort=sort)
+
+    def fetch(page, limit):
+        return _comments_page(uri, page, limit)
+    return paginate(fetch, limit=limit)
+
+
+def iter_replies(comment_id, limit=100):
+    """Iterate over the direct replies to the comment with *comment_id*,
+    requesting them a page at a time
+    """
+    uri = 'comments/{id}/replies'.format(id=comment_id)
+    return iter_comments(uri, limit=limit)
@@ -7,21 +7,29 @@ import logging
 import os
 from urllib.parse import urljoin
 
-import requests
 import sys
+import threading
 import time
 from collections import namedtuple
 from functools import wraps
-from requests_oauthlib import OAuth2Session
 from datetime import datetime, timedelta, timezone
-from trakt import errors
+from trakt import deadline, errors
+try:
+    from contextvars import ContextVar
+except ImportError:  # pragma: no cover
+    # Python 3.6, where the active client is tracked per thread instead
+    ContextVar = None
+from trakt.ratelimit import retry_after
+from trakt.tracing import NULL_SPAN
+from trakt.transport import SessionTransport
 
 __author__ = 'Jon Nappi'
 __all__ = ['Airs', 'Alias', 'Comment', 'Genre', 'get', 'delete', 'post', 'put',
            'init', 'BASE_URL', 'CLIENT_ID', 'CLIENT_SECRET', 'DEVICE_AUTH',
            'REDIRECT_URI', 'HEADERS', 'CONFIG_PATH', 'OAUTH_TOKEN',
            'OAUTH_REFRESH', 'PIN_AUTH', 'OAUTH_AUTH', 'AUTH_METHOD',
-           'APPLICATION_ID', 'get_device_code', 'get_device_token']
+           'APPLICATION_ID', 'TIMEOUT', 'DEVICE_AUTH_ERRORS', 'fetch',
+           'get_device_code', 'get_device_token']
 
 #: The base url for the Trakt API. Can be modified to run against different
 #: Trakt.tv environments
@@ -36,6 +44,12 @@ CLIENT_SECRET = None
 #: The OAuth2 Redirect URI for your OAuth Application
 REDIRECT_URI = 'urn:ietf:wg:oauth:2.0:oob'
 
+#: The default number of seconds to wait for a response to each request,
+#: `None` waiting forever. Overridden by the *timeout* of a :class:`Core`.
+#: Transports are only passed a timeout when one applies, so that custom
+#: transports written before timeouts existed keep working by default
+TIMEOUT = None
+
 #: Default request HEADERS
 HEADERS = {'Content-Type': 'application/json', 'trakt-api-version': '2'}
 
@@ -69,8 +83,30 @@ AUTH_METHOD = PIN_AUTH
 #: The ID of the application to register with, when using PIN authentication
 APPLICATION_ID = None
 
+
+class _LazySession(object):
+    """Stand-in for the global :class:`requests.Session` which defers
+    importing requests until the session is first used, keeping
+    ``import trakt`` cheap for short lived processes
+    """
+    def __init__(self):
+        object.__setattr__(self, '_session', None)
+
+    def _get_session(self):
+        if self._session is None:
+            import requests
+            object.__setattr__(self, '_session', requests.Session())
+        return self._session
+
+    def __getattr__(self, name):
+        return getattr(self._get_session(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get_session(), name, value)
+
+
 #: Global session to make requests with
-session = requests.Session()
+session = _LazySession()
 
 
 def _store(**kwargs):
@@ -82,6 +118,29 @@ def _store(**kwargs):
         json.dump(kwargs, config_file)
 
 
+def _auth_post(uri, data, headers=None, transport=None, timeout=None):
+    """Helper function used to POST the JSON encoded *data* of an
+    authentication request through a transport
+
+    :param uri: The uri of the authentication endpoint, ie ``/oauth/token``
+    :param data: The dict sent as the JSON body of the request
+    :param headers: Optional dict of headers to send with the request
+    :param transport: The transport to send the request with. Defaults to
+        the transport of the global :data:`CORE`
+    :param timeout: Optional number of seconds to wait for the response.
+        Defaults to :data:`TIMEOUT`
+    """
+    if transport is None:
+        transport = CORE.transport
+    if headers is None:
+        headers = {'Content-Type': 'application/json'}
+    timeout = deadline.request_timeout(TIMEOUT if timeout is None
+                                       else timeout)
+    extra = {} if timeout is None else {'timeout': timeout}
+    return transport.request('post', urljoin(BASE_URL, uri), headers=headers,
+                             body=data, **extra)
+
+
 def _get_client_info(app_id=False):
     """Helper function to poll the user for Client ID and Client Secret
     strings
@@ -138,7 +197,7 @@ def pin_auth(pin=None, client_id=None, client_secret=None, store=False):
             'client_id': CLIENT_ID,
             'client_secret': CLIENT_SECRET}
 
-    response = session.post(''.join([BASE_URL, '/oauth/token']), data=args)
+    response = _auth_post('/oauth/token', args)
     OAUTH_TOKEN = response.json().get('access_token', None)
 
     if store:
@@ -182,6 +241,9 @@ def oauth_auth(username, client_id=None, client_secret=None, store=False,
     CLIENT_ID, CLIENT_SECRET = client_id, client_secret
     HEADERS['trakt-api-key'] = CLIENT_ID
 
+    # requests_oauthlib is only needed here, so avoid paying for it on import
+    from requests_oauthlib import OAuth2Session
+
     authorization_base_url = urljoin(BASE_URL, '/oauth/authorize')
     token_url = urljoin(BASE_URL, '/oauth/token')
 
@@ -223,12 +285,9 @@ def get_device_code(client_id=None, client_secret=None):
     CLIENT_ID, CLIENT_SECRET = client_id, client_secret
     HEADERS['trakt-api-key'] = CLIENT_ID
 
-    device_code_url = urljoin(BASE_URL, '/oauth/device/code')
-    headers = {'Content-Type': 'application/json'}
     data = {"client_id": CLIENT_ID}
 
-    device_response = session.post(device_code_url,
-                                   json=data, headers=headers).json()
+    device_response = _auth_post('/oauth/device/code', data).json()
     print('Your user code is: {user_code}, please navigate to '
           '{verification_url} to authenticate'.format(
             user_code=device_response.get('user_code'),
@@ -268,9 +327,7 @@ def get_device_token(device_code, client_id=None, client_secret=None,
         "client_secret": CLIENT_SECRET
     }
 
-    response = session.post(
-        urljoin(BASE_URL, '/oauth/device/token'), json=data
-    )
+    response = _auth_post('/oauth/device/token', data)
 
     # We only get json on success.
     if response.status_code == 200:
@@ -289,6 +346,17 @@ def get_device_token(device_code, client_id=None, client_secret=None,
     return response
 
 
+#: Why polling for a device token stopped, by the status code trakt answered
+#: with. Any other status than 400, which means the code is still pending,
+#: stops polling too
+DEVICE_AUTH_ERRORS = {
+    404: 'Invalid device_code',
+    409: 'You already approved this code',
+    410: 'The tokens have expired, restart the process',
+    418: 'You explicitly denied this code',
+}
+
+
 def device_auth(client_id=None, client_secret=None, store=False):
     """Process for authenticating using device authentication.
 
@@ -311,13 +379,6 @@ def device_auth(client_id=None, client_secret=None, store=False):
     :return: A dict with the authentication result.
     Or False of authentication failed.
     """
-    error_messages = {
-        404: 'Invalid device_code',
-        409: 'You already approved this code',
-        410: 'The tokens have expired, restart the process',
-        418: 'You explicitly denied this code',
-    }
-
     success_message = (
         "You've been successfully authenticated. "
         "With access_token {access_token} and refresh_token {refresh_token}"
@@ -341,7 +402,8 @@ def device_auth(client_id=None, client_secret=None, store=False):
             interval *= 2
 
         elif response.status_code != 400:  # not pending
-            print(error_messages.get(response.status_code, response.reason))
+            print(DEVICE_AUTH_ERRORS.get(response.status_code,
+                                         response.reason))
             break
 
         time.sleep(interval)
@@ -390,7 +452,7 @@ def _refresh_token(s):
                 'redirect_uri': REDIRECT_URI,
                 'grant_type': 'refresh_token'
             }
-    response = session.post(url, json=data, headers=HEADERS)
+    response = _auth_post(url, data, headers=HEADERS, transport=s.transport)
     s.logger.debug('RESPONSE [post] (%s): %s', url, str(response))
     if response.status_code == 200:
         data = response.json()
@@ -441,14 +503,124 @@ def load_config():
             APPLICATION_ID = config_data.get('APPLICATION_ID', None)
 
 
+class _ActiveClient(object):
+    """Tracks the :class:`trakt.client.TraktClient` which calls made through
+    the global :data:`CORE` are currently routed to. The active client is
+    local to each context, or to each thread on Pythons without contextvars
+    """
+    def __init__(self):
+        if ContextVar is not None:
+            self._var = ContextVar('trakt_active_client', default=None)
+            self._entered = ContextVar('trakt_entered_clients', default=())
+        else:
+            self._local = threading.local()
+
+    def get(self):
+        if ContextVar is not None:
+            return self._var.get()
+        return getattr(self._local, 'client', None)
+
+    def set(self, client):
+        """Make *client* the active client, returning a token which restores
+        the previously active client when passed to :meth:`reset`
+        """
+        if ContextVar is not None:
+            return self._var.set(client)
+        token, self._local.client = self.get(), client
+        return token
+
+    def reset(self, token):
+        if ContextVar is not None:
+            self._var.reset(token)
+        else:
+            self._local.client = token
+
+    def _tokens(self):
+        if ContextVar is not None:
+            return self._entered.get()
+        return getattr(self._local, 'entered', ())
+
+    def _set_tokens(self, tokens):
+        if ContextVar is not None:
+            self._entered.set(tokens)
+        else:
+            self._local.entered = tokens
+
+    def enter(self, client):
+        """Make *client* the active client until the matching :meth:`exit`.
+        The tokens are kept per context, so that asyncio tasks entering and
+        exiting clients in turns each restore their own
+        """
+        self._set_tokens(self._tokens() + (self.set(client),))
+
+    def exit(self):
+        """Restore the client active before the last :meth:`enter` made in
+        this context
+        """
+        tokens = self._tokens()
+        self._set_tokens(tokens[:-1])
+        self.reset(tokens[-1])
+
+    def bound(self, fn):
+        """Wrap *fn* to run with the client active in the calling context,
+        ie in the worker threads of a
+        :class:`concurrent.futures.ThreadPoolExecutor`
+        """
+        client = self.get()
+
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            token = self.set(client)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.reset(token)
+        return inner
+
+
+#: The client calls made through the global :data:`CORE` are routed to
+ACTIVE_CLIENT = _ActiveClient()
+
+
+#: The events which hooks may be registered for on a :class:`Core`. Hooks are
+#: always called with keyword arguments: *before_request* hooks receive the
+#: *method* and *url* of a request, *after_response* hooks additionally
+#: receive the *response* and the *elapsed* seconds, and *on_error* hooks
+#: receive the *error* raised and the *elapsed* seconds in its place. The
+#: *on_retry* and *on_cache_hit* events receive the *method* and *url* of a
+#: request which was retried or answered from a cache, and are fired by the
+#: retrying and caching layers rather than by every request.
+HOOK_EVENTS = ('before_request', 'after_response', 'on_error', 'on_retry',
+               'on_cache_hit')
+
+
 class Core(object):
     """This class contains all of the functionality required for interfacing
     with the Trakt.tv API
     """
 
-    def __init__(self):
-        """Create a :class:`Core` instance and give it a logger attribute"""
+    def __init__(self, transport=None, tracer=None, rate_limiter=None,
+                 timeout=None):
+        """Create a :class:`Core` instance and give it a logger attribute
+
+        :param transport: The transport used to send requests. Defaults to a
+            :class:`SessionTransport` using the global `session`
+        :param tracer: Optional :class:`trakt.tracing.Tracer` recording the
+            network, decode and build phases of every call
+        :param rate_limiter: Optional :class:`trakt.ratelimit.TokenBucket`
+            every request must take a token from before being sent. Rate
+            limited requests are retried after backing the bucket off
+        :param timeout: Optional number of seconds to wait for a response to
+            each request. Defaults to :data:`TIMEOUT`. Requests made under a
+            :class:`trakt.deadline.Deadline` wait no longer than its time left
+        """
         self.logger = logging.getLogger('trakt.core')
+        self.transport = transport
+        if transport is None:
+            self.transport = SessionTransport()
+        self.tracer = tracer
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
 
         # Get all of our exceptions except the base exception
         errs = [getattr(errors, att) for att in errors.__all__
@@ -457,6 +629,45 @@ class Core(object):
         # Map HTTP response codes to exception types
         self.error_map = {err.http_code: err for err in errs}
         self._bootstrapped = False
+        self.hooks = {event: [] for event in HOOK_EVENTS}
+
+    def register_hook(self, event, hook):
+        """Register *hook* to be called whenever *event* occurs
+
+        :param event: One of the :data:`HOOK_EVENTS`
+        :param hook: A callable accepting the keyword arguments of *event*
+        """
+        if event not in self.hooks:
+            raise ValueError('event must be one of {}'.format(HOOK_EVENTS))
+        self.hooks[event].append(hook)
+
+    def unregister_hook(self, event, hook):
+        """Stop calling *hook* whenever *event* occurs"""
+        if hook in self.hooks.get(event, []):
+            self.hooks[event].remove(hook)
+
+    def _fire(self, event, **kwargs):
+        """Call every hook registered for *event* with *kwargs*"""
+        for hook in self.hooks[event]:
+            hook(**kwargs)
+
+    def _trace(self, name, **attributes):
+        """A span called *name* from :attr:`tracer`, or a no-op context
+        manager when tracing is disabled
+        """
+        if self.tracer is None:
+            return NULL_SPAN
+        return self.tracer.span(name, **attributes)
+
+    def _send(self, generator, json_data):
+        """Send *json_data* back to the *generator* co-routine for
+        post-processing, returning its results
+        """
+        with self._trace('build'):
+            try:
+                return generator.send(json_data)
+            except StopIteration:
+                return None
 
     def _bootstrap(self):
         """Bootstrap your authentication environment when authentication is
@@ -501,6 +712,73 @@ class Core(object):
         else:
             return BASE_URL + uri, generator, None
 
+    def _routed(self):
+        """The :class:`Core` a decorated call should be made with: the core of
+        the active :class:`trakt.client.TraktClient` for calls made through
+        the global :data:`CORE` while a client is active, or else this one
+        """
+        if self is CORE:
+            client = ACTIVE_CLIENT.get()
+            if client is not None:
+                return client.core
+        return self
+
+    def _request_headers(self):
+        """The headers to send with every request, including credentials"""
+        HEADERS['trakt-api-key'] = CLIENT_ID
+        HEADERS['Authorization'] = 'Bearer {0}'.format(OAUTH_TOKEN)
+        return HEADERS
+
+    def _send_request(self, method, url, data=None, headers=None):
+        """Send a single request through :attr:`transport`, once a token is
+        available from :attr:`rate_limiter`, firing the request hooks. The
+        request is sent with :attr:`timeout`, cut down to the time left by
+        the active :class:`trakt.deadline.Deadline`, if any
+
+        :return: The response and the seconds it took to arrive
+        :raises trakt.deadline.DeadlineExceeded: If the deadline has passed,
+            before or while the request was sent
+        """
+        scope = deadline.current()
+        if scope is not None:
+            scope.check()
+        if self.rate_limiter is not None:
+            wait = None if scope is None else scope.remaining()
+            if not self.rate_limiter.acquire(timeout=wait):
+                raise deadline.DeadlineExceeded()
+        timeout = deadline.request_timeout(
+            TIMEOUT if self.timeout is None else self.timeout)
+        # custom transports may not accept a timeout, so only pass one set
+        extra = {} if timeout is None else {'timeout': timeout}
+        self._fire('before_request', method=method, url=url)
+        start = time.perf_counter()
+        try:
+            with self._trace('network', method=method, url=url):
+                if method == 'get':  # GETs pass data as params, not body
+                    response = self.transport.request(
+                        method, url, headers=headers, params=data, **extra)
+                else:
+                    response = self.transport.request(
+                        method, url, headers=headers, body=data, **extra)
+        except Exception as error:
+            if (scope is not None and scope.expired and
+                    not isinstance(error, deadline.DeadlineExceeded)):
+                # the request was cut short by the deadline, not by trakt
+                cause = error
+                error = deadline.Cancelled() if scope.cancelled else \
+                    deadline.DeadlineExceeded()
+                error.__cause__ = cause
+            self._fire('on_error', method=method, url=url, error=error,
+                       elapsed=time.perf_counter() - start)
+            raise error
+        elapsed = time.perf_counter() - start
+        self.logger.debug('RESPONSE [%s] (%s): %s', method, url, str(response))
+        self._fire('after_response', method=method, url=url,
+                   response=response, elapsed=elapsed)
+        if getattr(response, 'from_cache', False):
+            self._fire('on_cache_hit', method=method, url=url)
+        return response, elapsed
+
     def _handle_request(self, method, url, data=None):
         """Handle actually talking out to the trakt API, logging out debug
         information, raising any relevant `TraktException` Exception types,
@@ -514,22 +792,33 @@ class Core(object):
         :raises TraktException: If any non-200 return code is encountered
         """
         self.logger.debug('%s: %s', method, url)
-        HEADERS['trakt-api-key'] = CLIENT_ID
-        HEADERS['Authorization'] = 'Bearer {0}'.format(OAUTH_TOKEN)
-        self.logger.debug('headers: %s', str(HEADERS))
+        headers = self._request_headers()
+        self.logger.debug('headers: %s', str(headers))
         self.logger.debug('method, url :: %s, %s', method, url)
-        if method == 'get':  # GETs need to pass data as params, not body
-            response = session.request(method, url, headers=HEADERS,
-                                       params=data)
-        else:
-            response = session.request(method, url, headers=HEADERS,
-                                       data=json.dumps(data))
-        self.logger.debug('RESPONSE [%s] (%s): %s', method, url, str(response))
+        attempt = 0
+        while True:
+            response, elapsed = self._send_request(method, url, data,
+                                                   headers)
+            if (response.status_code == 429 and self.rate_limiter is not None
+                    and attempt < self.rate_limiter.max_retries):
+                # Rate limited despite the bucket: pause everything drawing
+                # from it, then try again
+                attempt += 1
+                self.rate_limiter.backoff(retry_after(response))
+                self._fire('on_retry', method=method, url=url,
+                           attempt=attempt, response=response)
+                continue
+            break
         if response.status_code in self.error_map:
-            raise self.error_map[response.status_code](response)
+            error = self.error_map[response.status_code](response)
+            self._fire('on_error', method=method, url=url, error=error,
+                       elapsed=elapsed)
+            raise error
         elif response.status_code == 204:  # HTTP no content
             return None
-        json_data = json.loads(response.content.decode('UTF-8', 'ignore'))
+        with self._trace('decode', size=len(response.content)):
+            json_data = json.loads(response.content.decode('UTF-8',
+                                                           'ignore'))
         return json_data
 
     def get(self, f):
@@ -543,17 +832,16 @@ class Core(object):
         """
         @wraps(f)
         def inner(*args, **kwargs):
-            self._bootstrap()
-            resp = self._get_first(f, *args, **kwargs)
-            if not isinstance(resp, tuple):
-                # Handle cached property responses
-                return resp
-            url, generator, _ = resp
-            json_data = self._handle_request('get', url)
-            try:
-                return generator.send(json_data)
-            except StopIteration:
-                return None
+            core = self._routed()
+            core._bootstrap()
+            with core._trace('call', function=f.__qualname__):
+                resp = core._get_first(f, *args, **kwargs)
+                if not isinstance(resp, tuple):
+                    # Handle cached property responses
+                    return resp
+                url, generator, _ = resp
+                json_data = core._handle_request('get', url)
+                return core._send(generator, json_data)
         return inner
 
     def delete(self, f):
@@ -563,11 +851,13 @@ class Core(object):
         """
         @wraps(f)
         def inner(*args, **kwargs):
-            self._bootstrap()
-            generator = f(*args, **kwargs)
-            uri = next(generator)
-            url = BASE_URL + uri
-            self._handle_request('delete', url)
+            core = self._routed()
+            core._bootstrap()
+            with core._trace('call', function=f.__qualname__):
+                generator = f(*args, **kwargs)
+                uri = next(generator)
+                url = BASE_URL + uri
+                core._handle_request('delete', url)
         return inner
 
     def post(self, f):
@@ -582,13 +872,12 @@ class Core(object):
         """
         @wraps(f)
         def inner(*args, **kwargs):
-            self._bootstrap()
-            url, generator, args = self._get_first(f, *args, **kwargs)
-            json_data = self._handle_request('post', url, data=args)
-            try:
-                return generator.send(json_data)
-            except StopIteration:
-                return None
+            core = self._routed()
+            core._bootstrap()
+            with core._trace('call', function=f.__qualname__):
+                url, generator, args = core._get_first(f, *args, **kwargs)
+                json_data = core._handle_request('post', url, data=args)
+                return core._send(generator, json_data)
         return inner
 
     def put(self, f):
@@ -603,13 +892,12 @@ class Core(object):
         """
         @wraps(f)
         def inner(*args, **kwargs):
-            self._bootstrap()
-            url, generator, args = self._get_first(f, *args, **kwargs)
-            json_data = self._handle_request('put', url, data=args)
-            try:
-                return generator.send(json_data)
-            except StopIteration:
-                return None
+            core = self._routed()
+            core._bootstrap()
+            with core._trace('call', function=f.__qualname__):
+                url, generator, args = core._get_first(f, *args, **kwargs)
+                json_data = core._handle_request('put', url, data=args)
+                return core._send(generator, json_data)
         return inner
 
 
@@ -620,3 +908,14 @@ get = CORE.get
 post = CORE.post
 delete = CORE.delete
 put = CORE.put
+
+
+@get
+def fetch(uri):
+    """Fetch the raw JSON data found at *uri*, for the modules which keep it
+    as is instead of building objects from it
+
+    :param uri: The uri to request, relative to :data:`BASE_URL`
+    """
+    data = yield uri
+    yield data
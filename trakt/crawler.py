@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""A resumable crawler walking the graph of Trakt.tv shows, seasons, episodes,
+people and movies, built on top of the existing model classes
+"""
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from trakt import deadline
+from trakt.core import ACTIVE_CLIENT, get
+from trakt.movies import Movie
+from trakt.people import Person
+from trakt.tv import TVEpisode, TVSeason, TVShow
+from trakt.utils import extract_ids
+
+__author__ = 'Jon Nappi'
+__all__ = ['Crawler', 'JSONLinesSink', 'expand_show', 'expand_movie',
+           'expand_person']
+
+
+@get
+def _seasons_with_episodes(show):
+    """Every :class:`TVSeason` of *show*, with its episodes already built,
+    using a single request rather than one per episode
+    """
+    data = yield show.ext + '/seasons?extended=episodes'
+    seasons = []
+    for season_data in data:
+        episodes = season_data.pop('episodes', [])
+        extract_ids(season_data)
+        season = TVSeason(show.title, season_data['number'], show.slug,
+                          **season_data)
+        season._episodes = [TVEpisode(show.title, **extract_ids(episode))
+                            for episode in episodes]
+        seasons.append(season)
+    yield seasons
+
+
+def _people_nodes(people):
+    return [('person', person.slug) for person in people]
+
+
+def expand_show(slug):
+    """Fetch the show identified by *slug*, its seasons and episodes
+
+    :return: The records found, as ``(kind, object)`` tuples, and the nodes
+        linked from the show, its cast and crew
+    """
+    show = TVShow(slug=slug)
+    records = [('show', show)]
+    for season in _seasons_with_episodes(show):
+        records.append(('season', season))
+        records.extend(('episode', episode) for episode in season._episodes)
+    return records, _people_nodes(show.people)
+
+
+def expand_movie(slug):
+    """Fetch the movie identified by *slug*
+
+    :return: The movie record, and the nodes of its cast and crew
+    """
+    movie = Movie('', slug=slug)
+    return [('movie', movie)], _people_nodes(movie.people)
+
+
+def expand_person(slug):
+    """Fetch the person identified by *slug*
+
+    :return: The person record, and the nodes of every show and movie they
+        have a cast or crew credit on
+    """
+    person = Person('', slug=slug)
+    nodes = []
+    for kind, credits in (('movie', person.movie_credits),
+                          ('show', person.tv_credits)):
+        credited = list(credits.cast)
+        for jobs in credits.crew.values():
+            credited.extend(jobs)
+        nodes.extend((kind, credit.media.slug) for credit in credited)
+    return [('person', person)], nodes
+
+
+class JSONLinesSink(object):
+    """A sink appending every crawled record to a file as a JSON object per
+    line, holding the record's *kind* and its public attributes
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, kind, obj):
+        data = {key: val for key, val in vars(obj).items()
+                if not key.startswith('_')}
+        line = json.dumps({'kind': kind, 'data': data}, default=str)
+        with self._lock:
+            with open(self.path, 'a') as sink_file:
+                sink_file.write(line + '\n')
+
+
+class Crawler(object):
+    """Walks the graph of shows, people and movies outwards from a set of
+    seeds, fetching up to *max_workers* nodes at a time. Each node, a
+    ``(kind, slug)`` tuple, is fetched once. Every record found is handed to
+    the *sink*, and the frontier of nodes still to fetch is checkpointed so
+    that an interrupted crawl resumes where it left off::
+
+        crawler = Crawler(JSONLinesSink('catalog.jsonl'),
+                          checkpoint='crawl.json', max_depth=2)
+        crawler.add('show', 'game-of-thrones')
+        crawler.run()
+    """
+    #: The functions fetching each kind of node. They accept a slug and
+    #: return a list of ``(kind, object)`` records and a list of linked nodes
+    EXPANDERS = {'show': expand_show, 'movie': expand_movie,
+                 'person': expand_person}
+
+    def __init__(self, sink, checkpoint=None, max_workers=4, max_depth=None,
+                 kinds=None, checkpoint_every=50):
+        """Create a new :class:`Crawler`, resuming from *checkpoint* if it
+        exists
+
+        :param sink: A callable accepting the *kind* and object of each record
+        :param checkpoint: Optional path of the JSON file the crawl state is
+            saved to
+        :param max_workers: The number of nodes fetched concurrently
+        :param max_depth: Optional number of links to follow from the seeds
+        :param kinds: Optional collection of the node kinds to follow.
+            Defaults to every kind in :attr:`EXPANDERS`
+        :param checkpoint_every: The number of nodes fetched between
+            checkpoints
+        """
+        self.sink = sink
+        self.checkpoint = checkpoint
+        self.max_workers = max_workers
+        self.max_depth = max_depth
+        self.kinds = set(kinds or self.EXPANDERS)
+        self.checkpoint_every = checkpoint_every
+        self.seen = set()
+        self.frontier = deque()
+        self.failed = {}
+        self.fetched = 0
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self.load()
+
+    def load(self):
+        """Restore the crawl state from :attr:`checkpoint`. Nodes which had
+        failed are queued to be tried again
+        """
+        with open(self.checkpoint) as checkpoint_file:
+            state = json.load(checkpoint_file)
+        self.seen = {tuple(node) for node in state['seen']}
+        self.frontier = deque((kind, slug, depth)
+                              for kind, slug, depth in state['frontier'])
+        self.frontier.extend((kind, slug, depth)
+                             for kind, slug, depth in state['failed'])
+        self.fetched = state['fetched']
+
+    def save(self, in_flight=()):
+        """Save the crawl state to :attr:`checkpoint`. Nodes currently being
+        fetched are saved as part of the frontier
+        """
+        if self.checkpoint is None:
+            return
+        state = {'seen': sorted(self.seen),
+                 'frontier': list(in_flight) + list(self.frontier),
+                 'failed': list(self.failed),
+                 'fetched': self.fetched}
+        tmp_path = self.checkpoint + '.tmp'
+        with open(tmp_path, 'w') as checkpoint_file:
+            json.dump(state, checkpoint_file)
+        os.replace(tmp_path, self.checkpoint)
+
+    def add(self, kind, slug, depth=0):
+        """Queue the node identified by *kind* and *slug*, unless it was
+        already seen or is filtered out by :attr:`kinds` or :attr:`max_depth`
+        """
+        node = (kind, slug)
+        if (node in self.seen or kind not in self.kinds or
+                (self.max_depth is not None and depth > self.max_depth)):
+            return False
+        self.seen.add(node)
+        self.frontier.append((kind, slug, depth))
+        return True
+
+    def _expand(self, kind, slug):
+        return self.EXPANDERS[kind](slug)
+
+    def run(self, limit=None):
+        """Crawl until the frontier is exhausted, *limit* nodes have been
+        fetched by this call, or the active :class:`trakt.deadline.Deadline`
+        runs out. Nodes cut short by the deadline are put back on the
+        frontier, to be fetched by the next run. Nodes are fetched with the
+        :class:`trakt.client.TraktClient` active in the calling context
+
+        :return: The number of nodes fetched
+        """
+        fetched = 0
+        in_flight = {}
+        expand = deadline.bound(ACTIVE_CLIENT.bound(self._expand))
+        checkpoints = self.fetched // self.checkpoint_every
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while self.frontier or in_flight:
+                    while (self.frontier and
+                           len(in_flight) < self.max_workers and
+                           (limit is None or
+                            fetched + len(in_flight) < limit) and
+                           not deadline.interrupted()):
+                        kind, slug, depth = self.frontier.popleft()
+                        future = executor.submit(expand, kind, slug)
+                        in_flight[future] = (kind, slug, depth)
+                    if not in_flight:
+                        break
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        # a node stays in flight until its records reached the
+                        # sink, so that it's fetched again if the sink fails
+                        kind, slug, depth = node = in_flight[future]
+                        try:
+                            records, links = future.result()
+                        except deadline.DeadlineExceeded:
+                            del in_flight[future]
+                            self.frontier.appendleft(node)
+                            continue
+                        except Exception as error:
+                            self.failed[node] = repr(error)
+                        else:
+                            for record_kind, obj in records:
+                                self.sink(record_kind, obj)
+                            for link_kind, link_slug in links:
+                                self.add(link_kind, link_slug, depth + 1)
+                            self.failed.pop(node, None)
+                        del in_flight[future]
+                        fetched += 1
+                        self.fetched += 1
+                        if self.fetched // self.checkpoint_every > checkpoints:
+                            checkpoints = self.fetched // self.checkpoint_every
+                            self.save(in_flight.values())
+        finally:
+            self.save(in_flight.values())
+        return fetched
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Deadlines and cooperative cancellation for calls to the Trakt.tv API. A
+:class:`Deadline` gives every request made while it's active a share of one
+overall time budget, so that composite operations such as building a show
+with its seasons and people either finish in time or fail promptly::
+
+    with Deadline(2.0) as budget:
+        show = TVShow('Game of Thrones')
+        seasons, people = show.seasons, show.people
+
+Each request is sent with a timeout no longer than the time left, and none is
+sent once the deadline has passed or :meth:`Deadline.cancel` was called, from
+any thread, raising :class:`DeadlineExceeded` or :class:`Cancelled` instead.
+Nested deadlines can only shorten the budget of the deadline they're nested
+in. Deadlines are local to each context, or to each thread on Pythons without
+contextvars, and are carried into the worker threads of bulk operations such
+as :func:`trakt.extended.hydrate`. Those operations, and paginated iterators,
+stop early and return what they have so far instead of raising when their
+deadline was created with *partial* set.
+
+Timeouts for single requests are set per client, with the *timeout* of a
+:class:`trakt.client.TraktClient`, or globally with
+:data:`trakt.core.TIMEOUT`.
+"""
+import threading
+import time
+from functools import wraps
+
+from trakt.errors import TraktException
+
+try:
+    from contextvars import ContextVar
+except ImportError:  # Python 3.6, deadlines are thread local
+    ContextVar = None
+
+__author__ = 'Jon Nappi'
+__all__ = ['DeadlineExceeded', 'Cancelled', 'Deadline', 'current', 'check',
+           'interrupted', 'allows_partial', 'request_timeout', 'bound']
+
+
+class DeadlineExceeded(TraktException):
+    """TraktException type to be raised when a call runs out of time"""
+    message = 'Deadline Exceeded - the call ran out of time'
+
+
+class Cancelled(DeadlineExceeded):
+    """TraktException type to be raised when a call was cancelled, leaving it
+    no time at all
+    """
+    message = 'Cancelled - the call was cancelled'
+
+
+if ContextVar is not None:
+    _active = ContextVar('trakt_deadline', default=None)
+    # the tokens of the deadlines entered in this context, innermost last
+    _entered = ContextVar('trakt_entered_deadlines', default=())
+else:
+    _local = threading.local()
+
+
+def current():
+    """The :class:`Deadline` active in this context, if any"""
+    if ContextVar is not None:
+        return _active.get()
+    return getattr(_local, 'deadline', None)
+
+
+def _activate(deadline):
+    """Make *deadline* the active deadline, returning a token which restores
+    the previously active one when passed to :func:`_restore`
+    """
+    if ContextVar is not None:
+        return _active.set(deadline)
+    token, _local.deadline = current(), deadline
+    return token
+
+
+def _restore(token):
+    if ContextVar is not None:
+        _active.reset(token)
+    else:
+        _local.deadline = token
+
+
+def _tokens():
+    if ContextVar is not None:
+        return _entered.get()
+    return getattr(_local, 'entered', ())
+
+
+def _set_tokens(tokens):
+    if ContextVar is not None:
+        _entered.set(tokens)
+    else:
+        _local.entered = tokens
+
+
+class Deadline(object):
+    """An overall time budget for every request made while it's active, used
+    as a context manager
+    """
+    def __init__(self, timeout=None, partial=False, clock=time.monotonic):
+        """Create a new :class:`Deadline`, whose time starts running now
+
+        :param timeout: The number of seconds in the budget, or `None` for a
+            deadline which only ends when cancelled
+        :param partial: Whether bulk operations and paginated iterators
+            running out of time return their partial results rather than
+            raising
+        :param clock: The function returning the current time in seconds
+        """
+        self.timeout, self.partial, self.clock = timeout, partial, clock
+        self.expires_at = None if timeout is None else clock() + timeout
+        self.parent = None
+        self._cancelled = threading.Event()
+
+    def remaining(self):
+        """The number of seconds left, or `None` if there's no time limit"""
+        remaining = None
+        if self.expires_at is not None:
+            remaining = max(self.expires_at - self.clock(), 0.0)
+        if self.parent is not None:
+            inherited = self.parent.remaining()
+            if remaining is None or (inherited is not None and
+                                     inherited < remaining):
+                remaining = inherited
+        return remaining
+
+    @property
+    def cancelled(self):
+        """Whether this deadline, or one it's nested in, was cancelled"""
+        return self._cancelled.is_set() or (self.parent is not None and
+                                            self.parent.cancelled)
+
+    @property
+    def expired(self):
+        """Whether there's no time left, or this deadline was cancelled"""
+        return self.cancelled or self.remaining() == 0
+
+    def cancel(self):
+        """Cancel every call made under this deadline. Requests in flight
+        finish, but no further request is sent
+        """
+        self._cancelled.set()
+
+    def check(self):
+        """Raise :class:`Cancelled` or :class:`DeadlineExceeded` if there's
+        no time left
+        """
+        if self.cancelled:
+            raise Cancelled()
+        if self.remaining() == 0:
+            raise DeadlineExceeded()
+
+    def __enter__(self):
+        active = current()
+        if active is not None and active is not self:
+            self.parent = active
+        # tokens are kept per context rather than on the deadline, so that
+        # asyncio tasks entering it in turns each restore their own
+        _set_tokens(_tokens() + (_activate(self),))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        tokens = _tokens()
+        _set_tokens(tokens[:-1])
+        _restore(tokens[-1])
+
+    def __str__(self):
+        return '<Deadline remaining={}>'.format(self.remaining())
+    __repr__ = __str__
+
+
+def check():
+    """Raise :class:`Cancelled` or :class:`DeadlineExceeded` if the active
+    deadline has no time left. A cancellation point for long running code
+    """
+    deadline = current()
+    if deadline is not None:
+        deadline.check()
+
+
+def interrupted():
+    """Whether the active deadline has no time left"""
+    deadline = current()
+    return deadline is not None and deadline.expired
+
+
+def allows_partial():
+    """Whether the active deadline lets operations which run out of time
+    return their partial results
+    """
+    deadline = current()
+    return deadline is not None and deadline.partial
+
+
+def request_timeout(timeout=None):
+    """The timeout to send a request with, after checking the active deadline
+
+    :param timeout: The timeout of the request alone, if any
+    :return: The smaller of *timeout* and the time left, or `None` when
+        there's no limit to either
+    """
+    deadline = current()
+    if deadline is None:
+        return timeout
+    deadline.check()
+    remaining = deadline.remaining()
+    if remaining is None or (timeout is not None and timeout < remaining):
+        return timeout
+    return remaining
+
+
+def bound(fn):
+    """Wrap *fn* to run with the deadline active in the calling context, ie
+    in the worker threads of a :class:`concurrent.futures.ThreadPoolExecutor`
+    """
+    deadline = current()
+
+    @wraps(fn)
+    def inner(*args, **kwargs):
+        token = _activate(deadline)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _restore(token)
+    return inner
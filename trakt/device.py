@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""Non-blocking device authentication for many devices at once. Rather than
+blocking a thread per device like :func:`trakt.core.device_auth`, a
+:class:`DeviceAuthManager` polls every pending device code from a single
+scheduler thread and delivers each token through a
+:class:`concurrent.futures.Future`, and optionally a callback. Wrap those
+futures with :func:`asyncio.wrap_future` to await them from asyncio code.
+"""
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    from concurrent.futures import InvalidStateError
+except ImportError:  # Python < 3.8 doesn't check the state of a future
+    InvalidStateError = RuntimeError
+
+from trakt import core
+from trakt.errors import TraktException
+from trakt.transport import SessionTransport
+
+__author__ = 'Jon Nappi'
+__all__ = ['DeviceAuthError', 'DeviceAuthManager']
+
+
+class DeviceAuthError(TraktException):
+    """Raised through the future of a device code which can no longer be
+    approved
+    """
+    #: Why trakt stopped polling, by status code
+    MESSAGES = core.DEVICE_AUTH_ERRORS
+
+    def __init__(self, response=None, status_code=None):
+        super(DeviceAuthError, self).__init__(response)
+        if status_code is None and response is not None:
+            status_code = response.status_code
+        self.http_code = status_code
+        self.message = self.MESSAGES.get(status_code,
+                                         'Device authentication failed')
+
+
+class _PendingCode(object):
+    def __init__(self, code, future, now):
+        self.device_code = code['device_code']
+        self.user_code = code.get('user_code')
+        self.interval = code.get('interval', 5)
+        self.expires_at = now + code.get('expires_in', 600)
+        self.future = future
+        self.failures = 0
+
+    def resolve(self, result=None, error=None):
+        """Resolve :attr:`future` with *result* or *error*, unless it was
+        cancelled while its last poll was in flight
+        """
+        try:
+            if error is not None:
+                self.future.set_exception(error)
+            else:
+                self.future.set_result(result)
+        except InvalidStateError:
+            pass
+
+
+class DeviceAuthManager(object):
+    """Polls trakt for the tokens of any number of pending device codes from
+    a single scheduler thread, honouring each code's polling *interval* and
+    doubling it whenever trakt asks us to slow down. Tokens are delivered as
+    the decoded token response, ie ``{'access_token': ..., 'refresh_token':
+    ..., ...}``, and never stored in the global credentials.
+    """
+    def __init__(self, client_id, client_secret, transport=None,
+                 clock=time.monotonic, timeout=None):
+        """Create a new :class:`DeviceAuthManager`
+
+        :param client_id: Your Trakt OAuth Application's Client ID
+        :param client_secret: Your Trakt OAuth Application's Client Secret
+        :param transport: The transport used to send requests. Defaults to a
+            :class:`trakt.transport.SessionTransport`
+        :param clock: The function returning the current time in seconds
+        :param timeout: Optional number of seconds to wait for the response
+            to each request, so that a stalled poll doesn't hold up every
+            other pending code. Defaults to :data:`trakt.core.TIMEOUT`
+        """
+        self.client_id, self.client_secret = client_id, client_secret
+        self.transport = transport
+        if transport is None:
+            self.transport = SessionTransport()
+        self.clock = clock
+        self.timeout = timeout
+        self.logger = logging.getLogger('trakt.device')
+        self._queue = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def __len__(self):
+        with self._condition:
+            return len(self._queue)
+
+    def _post(self, uri, data):
+        return core._auth_post(uri, data, transport=self.transport,
+                               timeout=self.timeout)
+
+    def request_code(self):
+        """Request a new device code from trakt
+
+        :return: The decoded device code response, holding the *user_code*
+            and *verification_url* to show the user
+        """
+        response = self._post('/oauth/device/code',
+                              {'client_id': self.client_id})
+        if response.status_code != 200:
+            raise DeviceAuthError(response)
+        return json.loads(response.content.decode('UTF-8', 'ignore'))
+
+    def add(self, code, callback=None):
+        """Start polling for the token of a device *code*
+
+        :param code: A device code response, as returned by
+            :meth:`request_code` or :func:`trakt.core.get_device_code`
+        :param callback: Optional callable called with the future once the
+            code was approved or rejected
+        :return: A :class:`concurrent.futures.Future` resolving to the token
+            response, or failing with a :class:`DeviceAuthError`
+        """
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        now = self.clock()
+        pending = _PendingCode(code, future, now)
+        self._schedule(pending, now + pending.interval)
+        return future
+
+    def authorize(self, callback=None):
+        """Request a new device code and start polling for its token
+
+        :return: The device code response and the future of its token
+        """
+        code = self.request_code()
+        return code, self.add(code, callback)
+
+    def _schedule(self, pending, when):
+        with self._condition:
+            heapq.heappush(self._queue, (when, next(self._counter), pending))
+            self._condition.notify()
+
+    def _poll(self, pending, now):
+        """Poll for the token of a single *pending* code, rescheduling it if
+        it is still waiting for approval, or if trakt couldn't be reached, in
+        which case its interval is doubled for every failure in a row
+        """
+        if pending.future.done():
+            return
+        if now >= pending.expires_at:
+            pending.resolve(error=DeviceAuthError(status_code=410))
+            return
+        try:
+            response = self._post('/oauth/device/token', {
+                'code': pending.device_code, 'client_id': self.client_id,
+                'client_secret': self.client_secret})
+        except Exception:
+            self.logger.warning('Polling for device code %s failed',
+                                pending.user_code, exc_info=True)
+            pending.failures += 1
+            self._schedule(pending,
+                           now + pending.interval * 2 ** pending.failures)
+            return
+        pending.failures = 0
+        if response.status_code == 200:
+            pending.resolve(json.loads(
+                response.content.decode('UTF-8', 'ignore')))
+        elif response.status_code in (400, 429):
+            if response.status_code == 429:  # slow down
+                pending.interval *= 2
+            self._schedule(pending, now + pending.interval)
+        else:
+            pending.resolve(error=DeviceAuthError(response))
+
+    def poll(self):
+        """Poll every code which is due, without blocking
+
+        :return: The number of seconds until the next code is due, or `None`
+            if there are no pending codes
+        """
+        now = self.clock()
+        due = []
+        with self._condition:
+            while self._queue and self._queue[0][0] <= now:
+                due.append(heapq.heappop(self._queue)[2])
+        for pending in due:
+            self._poll(pending, now)
+        with self._condition:
+            if not self._queue:
+                return None
+            return max(self._queue[0][0] - self.clock(), 0.0)
+
+    def _run(self):
+        while True:
+            self.poll()
+            with self._condition:
+                if self._stopped:
+                    return
+                wait = None
+                if self._queue:
+                    wait = self._queue[0][0] - self.clock()
+                # woken early whenever a new code is added
+                if wait is None or wait > 0:
+                    self._condition.wait(wait)
+                if self._stopped:
+                    return
+
+    def start(self):
+        """Start polling from a background thread"""
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run,
+                                        name='DeviceAuthManager')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self, cancel=False):
+        """Stop the background thread, optionally cancelling every pending
+        code
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+            pending = [item[2] for item in self._queue] if cancel else []
+            if cancel:
+                del self._queue[:]
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for item in pending:
+            item.future.cancel()
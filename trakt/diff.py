@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""Reconcile a local media library with a Trakt.tv collection, history or
+watchlist. Both sides are flattened into entries, a movie, show, season or
+episode each, and matched on any of their trakt, tmdb, imdb, tvdb ids or
+slugs, so that only the real differences are sent to trakt::
+
+    changes = reconcile('collection', local_inventory, remove=True)
+
+Items on either side are given in the format used by the sync endpoints, ie
+``{'movie': {'ids': {'imdb': 'tt1104001'}}, 'collected_at': ...}`` or
+``{'show': {'ids': {'tvdb': 81189}}, 'seasons': [{'number': 1, 'episodes':
+[{'number': 1}]}]}``, or as :class:`trakt.movies.Movie`,
+:class:`trakt.tv.TVShow`, :class:`trakt.tv.TVSeason` or
+:class:`trakt.tv.TVEpisode` objects. Episodes are matched on their show's ids
+and their season and episode numbers, those of episode and season objects
+being the slug of their show. A whole show or season matches every season
+and episode of it on the other side, so that listing a show locally never
+removes its episodes from trakt.
+"""
+from collections import OrderedDict, namedtuple
+
+from trakt.core import fetch, post
+from trakt.utils import slugify
+
+__author__ = 'Jon Nappi'
+__all__ = ['ID_TYPES', 'SECTIONS', 'Entry', 'LibraryDiff', 'entries',
+           'payload', 'diff_library', 'fetch_remote', 'reconcile']
+
+#: The ids items are matched on, in order of preference
+ID_TYPES = ('trakt', 'tmdb', 'imdb', 'tvdb', 'slug')
+
+#: Each section maps to its sync uri and the uris listing its current items
+SECTIONS = {
+    'collection': ('sync/collection', ('sync/collection/movies',
+                                       'sync/collection/shows')),
+    'history': ('sync/history', ('sync/watched/movies',
+                                 'sync/watched/shows')),
+    'watchlist': ('sync/watchlist', ('sync/watchlist/movies',
+                                     'sync/watchlist/shows',
+                                     'sync/watchlist/seasons',
+                                     'sync/watchlist/episodes')),
+}
+
+#: Item fields which are sent along with an item when it's added, the fields
+#: of the metadata of a collected item included
+PAYLOAD_FIELDS = ('collected_at', 'watched_at', 'media_type', 'resolution',
+                  'hdr', 'audio', 'audio_channels', '3d')
+
+#: A single movie, show, season or episode. The *ids* of seasons and
+#: episodes are their show's ids, except for episodes listed without a show
+#: which are identified by their own ids alone
+Entry = namedtuple('Entry', ['kind', 'ids', 'season', 'number', 'extra'])
+
+
+def _extra(item):
+    """The fields of *item* sent along with it when it's added"""
+    fields = dict(item.get('metadata') or {})
+    fields.update(item)
+    return {key: fields[key] for key in PAYLOAD_FIELDS if key in fields}
+
+
+def _known(ids):
+    return {key: value for key, value in ids.items() if value is not None}
+
+
+def _show_ids(show):
+    """The ids of the *show* of a season or episode object, which may be a
+    :class:`trakt.tv.TVShow` or only its title
+    """
+    if hasattr(show, 'ids'):
+        return _known(show.ids['ids'])
+    return {'slug': slugify(show)}
+
+
+def _model_entry(obj):
+    """The :class:`Entry` of a model object"""
+    media_type = getattr(obj, 'media_type', None)
+    if media_type == 'movies':
+        return Entry('movie', _known(obj.ids['ids']), None, None, {})
+    if media_type == 'shows':
+        return Entry('show', _known(obj.ids['ids']), None, None, {})
+    if media_type == 'episodes':
+        if obj.show and obj.season is not None and obj.number >= 0:
+            return Entry('episode', _show_ids(obj.show), obj.season,
+                         obj.number, {})
+        return Entry('episode', _known(obj.ids['ids']), None, None, {})
+    if hasattr(obj, 'season') and hasattr(obj, 'slug'):
+        return Entry('season', {'slug': obj.slug}, obj.season, None, {})
+    raise TypeError('{} objects have no place in a library'.format(
+        type(obj).__name__))
+
+
+def entries(items):
+    """Flatten *items* into :class:`Entry` tuples, expanding shows listed
+    with their seasons into an entry per episode
+
+    :param items: An iterable of sync formatted items or model objects
+    """
+    for item in items:
+        if not isinstance(item, dict):
+            yield _model_entry(item)
+            continue
+        if 'movie' in item:
+            yield Entry('movie', item['movie']['ids'], None, None,
+                        _extra(item))
+        elif 'show' not in item:
+            yield Entry('episode', item['episode']['ids'], None, None,
+                        _extra(item))
+        elif 'episode' in item:
+            episode = item['episode']
+            yield Entry('episode', item['show']['ids'], episode['season'],
+                        episode['number'], _extra(item))
+        elif 'season' in item:
+            yield Entry('season', item['show']['ids'],
+                        item['season']['number'], None, _extra(item))
+        elif item.get('seasons'):
+            ids = item['show']['ids']
+            for season in item['seasons']:
+                episodes = season.get('episodes')
+                if not episodes:
+                    yield Entry('season', ids, season['number'], None,
+                                _extra(season))
+                for episode in episodes or ():
+                    yield Entry('episode', ids, season['number'],
+                                episode['number'], _extra(episode))
+        else:
+            yield Entry('show', item['show']['ids'], None, None,
+                        _extra(item))
+
+
+def _keys(entry):
+    """Every key *entry* may be matched on, in order of preference"""
+    for id_type in ID_TYPES:
+        value = entry.ids.get(id_type)
+        if value is not None:
+            yield (entry.kind, id_type, str(value), entry.season,
+                   entry.number)
+
+
+class LibraryDiff(object):
+    """The differences between a local library and a trakt section"""
+    def __init__(self, added, removed, unchanged=0):
+        """Create a new :class:`LibraryDiff`
+
+        :param added: The :class:`Entry`'s missing from trakt
+        :param removed: The :class:`Entry`'s missing from the local library
+        :param unchanged: The number of entries found on both sides
+        """
+        self.added, self.removed = added, removed
+        self.unchanged = unchanged
+        #: The responses to the requests sent by :func:`reconcile`
+        self.responses = {}
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+    def add_payload(self):
+        """The sync payload adding every entry missing from trakt"""
+        return payload(self.added)
+
+    def remove_payload(self):
+        """The sync payload removing every entry missing locally"""
+        return payload(self.removed)
+
+    def __str__(self):
+        return '<LibraryDiff +{} -{} ={}>'.format(
+            len(self.added), len(self.removed), self.unchanged)
+    __repr__ = __str__
+
+
+def _containers(entry):
+    """The keys of the show and season *entry* is part of, if any"""
+    if entry.season is None or entry.kind not in ('season', 'episode'):
+        return
+    for id_type in ID_TYPES:
+        value = entry.ids.get(id_type)
+        if value is not None:
+            yield ('show', id_type, str(value), None, None)
+            if entry.kind == 'episode':
+                yield ('season', id_type, str(value), entry.season, None)
+
+
+def diff_library(local, remote):
+    """Compute the differences between *local* and *remote* items. A show or
+    season on either side matches every season and episode of it on the
+    other side
+
+    :param local: The items of the local library
+    :param remote: The items of the trakt section, ie from
+        :func:`fetch_remote`
+    :return: A :class:`LibraryDiff`
+    """
+    index, parts, remote_entries = {}, {}, []
+    for entry in entries(remote):
+        remote_entries.append(entry)
+        for key in _keys(entry):
+            index.setdefault(key, entry)
+        for key in _containers(entry):
+            parts.setdefault(key, []).append(entry)
+
+    matched, seen, added, local_parts = set(), {}, [], set()
+    for entry in entries(local):
+        keys = list(_keys(entry))
+        local_parts.update(_containers(entry))
+        if any(key in seen for key in keys):
+            continue  # listed more than once locally
+        for key in keys:
+            seen[key] = entry
+        match = next((index[key] for key in keys if key in index), None)
+        if match is not None:
+            matched.add(id(match))
+            continue
+        # a whole show or season matches its seasons and episodes
+        contents = next((parts[key] for key in keys if key in parts), None)
+        if contents is None:
+            added.append(entry)
+        else:
+            matched.update(id(part) for part in contents)
+    # and a whole show or season on trakt matches those listed locally
+    removed = [entry for entry in remote_entries
+               if id(entry) not in matched and
+               not local_parts.intersection(_keys(entry))]
+    return LibraryDiff(added, removed, len(matched))
+
+
+def payload(entries):
+    """Group *entries* into a payload for the sync endpoints, nesting the
+    seasons and episodes of each show under it
+    """
+    data, shows = {}, OrderedDict()
+    for entry in entries:
+        if entry.kind == 'movie' or (entry.kind == 'episode' and
+                                     entry.season is None):
+            data.setdefault(entry.kind + 's', []).append(
+                dict(entry.extra, ids=entry.ids))
+            continue
+        key = tuple(sorted((k, str(v)) for k, v in entry.ids.items()))
+        show = shows.get(key)
+        if show is None:
+            show = shows[key] = {'ids': entry.ids, 'seasons': OrderedDict()}
+        if entry.kind == 'show':
+            show.update(entry.extra)
+            continue
+        season = show['seasons'].setdefault(entry.season,
+                                            {'number': entry.season})
+        if entry.kind == 'season':
+            season.update(entry.extra)
+        else:
+            season.setdefault('episodes', []).append(
+                dict(entry.extra, number=entry.number))
+    for show in shows.values():
+        seasons = show.pop('seasons')
+        if seasons:
+            show['seasons'] = list(seasons.values())
+        data.setdefault('shows', []).append(show)
+    return data
+
+
+@post
+def _sync(uri, data):
+    result = yield uri, data
+    yield result
+
+
+def fetch_remote(section):
+    """Fetch every item currently in a *section* of the authenticated user's
+    library
+
+    :param section: One of the :data:`SECTIONS`, ie ``'collection'``
+    """
+    items = []
+    for uri in SECTIONS[section][1]:
+        items.extend(fetch(uri) or [])
+    return items
+
+
+def reconcile(section, local, remote=None, remove=False, dry_run=False):
+    """Bring a *section* of the authenticated user's library in line with
+    the *local* library, sending only the items which differ
+
+    :param section: One of the :data:`SECTIONS`, ie ``'collection'``
+    :param local: The items of the local library
+    :param remote: Optional items currently in *section*. Fetched with
+        :func:`fetch_remote` if not given
+    :param remove: Whether to also remove the items missing locally
+    :param dry_run: Compute the differences without sending them
+    :return: The :class:`LibraryDiff`, with the responses to the add and
+        remove requests sent, if any, in its *responses* dict
+    """
+    uri = SECTIONS[section][0]
+    if remote is None:
+        remote = fetch_remote(section)
+    changes = diff_library(local, remote)
+    if not remove:
+        changes.removed = []
+    if not dry_run:
+        if changes.added:
+            changes.responses['added'] = _sync(uri, changes.add_payload())
+        if changes.removed:
+            changes.responses['removed'] = _sync(uri + '/remove',
+                                                 changes.remove_payload())
+    return changes
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Lazily upgraded model fields. Listings such as :func:`trakt.tv.
+trending_shows` return minimal objects by default, holding little more than
+a title and ids, unless they're asked for heavy ``extended=full`` payloads for
+every item. Model attributes which the API only returns at the ``full`` level
+are declared as :class:`ExtendedField` descriptors, so that reading one from a
+minimal object fetches that object's full data once, on demand::
+
+    shows = trakt.tv.trending_shows()   # one request, titles and ids only
+    print(shows[0].overview)            # one more request, for this show
+
+Use :func:`hydrate` to upgrade a whole result list up front instead, fetching
+every object's data concurrently.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from functools import lru_cache
+
+from trakt import deadline
+from trakt.core import ACTIVE_CLIENT, fetch
+from trakt.errors import TraktException
+
+__author__ = 'Jon Nappi'
+__all__ = ['FULL', 'ExtendedField', 'HydrationError', 'extended_fields',
+           'extended_level', 'hydrate', 'upgrade']
+
+#: The extended level holding every field of a model
+FULL = 'full'
+
+
+class ExtendedField(object):
+    """A model attribute only returned by the API at the *level* extended
+    level. Reading it from an object built from a lower level upgrades the
+    object by calling its ``_get(level)`` method, at most once
+    """
+    def __init__(self, level=FULL, infer=True):
+        """Create a new :class:`ExtendedField`
+
+        :param level: The extended level the field is returned at
+        :param infer: Whether data holding the field was necessarily fetched
+            at *level*. Fields which listings also return alongside minimal
+            items, like the ``updated_at`` of ``shows/updates``, aren't
+        """
+        self.level = level
+        self.infer = infer
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if self.name not in instance.__dict__ and \
+                instance._extended != self.level:
+            instance._get(self.level)
+        return instance.__dict__.get(self.name)
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+
+
+@lru_cache(maxsize=None)
+def extended_fields(cls):
+    """The names of all of the :class:`ExtendedField` attributes of *cls*"""
+    return frozenset(name for klass in cls.__mro__
+                     for name, attr in vars(klass).items()
+                     if isinstance(attr, ExtendedField))
+
+
+@lru_cache(maxsize=None)
+def _inferring_fields(cls):
+    return frozenset(name for name in extended_fields(cls)
+                     if getattr(cls, name).infer)
+
+
+def extended_level(cls, data):
+    """The extended level a model of type *cls* built from *data* was
+    fetched at, inferred from whether *data* holds any extended field which
+    minimal data never does
+
+    :return: :data:`FULL`, or `None` for minimal data
+    """
+    return FULL if _inferring_fields(cls).intersection(data) else None
+
+
+def _fetch_as(client, uri):
+    """Fetch *uri* from a worker thread with *client* active, as it was in
+    the thread which called :func:`hydrate`
+    """
+    token = ACTIVE_CLIENT.set(client)
+    try:
+        return fetch(uri)
+    finally:
+        ACTIVE_CLIENT.reset(token)
+
+
+class HydrationError(TraktException):
+    """TraktException type raised by :func:`hydrate` once every object it
+    could upgrade was, when the data of some others couldn't be fetched
+    """
+    message = 'Hydration Failed - some objects could not be upgraded'
+
+    def __init__(self, errors, objects):
+        super(HydrationError, self).__init__()
+        #: The exception raised by the request for each uri which failed
+        self.errors = errors
+        #: The objects which were left as they were
+        self.objects = objects
+
+
+def _build_all(group, data, extended):
+    """Build every object of *group* from its own copy of *data*"""
+    for index, obj in enumerate(group, 1):
+        obj_data = data if index == len(group) else deepcopy(data)
+        parse = getattr(obj, '_parse_fetched', None)
+        if parse is not None:
+            obj_data = parse(obj_data)
+        obj._build(obj_data)
+        obj._extended = extended
+
+
+def hydrate(objects, extended=FULL, max_workers=8):
+    """Upgrade every object of *objects* built from a lower extended level in
+    one concurrent pass. Objects sharing a uri, ie the same show appearing in
+    several listings, are fetched once and each built from its own copy of
+    the data with their class's ``_build``, exactly as if they were fetched
+    by their own ``_get``. Objects not upgraded yet when a
+    :class:`trakt.deadline.Deadline` created with *partial* runs out are left
+    as they were
+
+    :param objects: An iterable of models, ie :class:`trakt.tv.TVShow`,
+        :class:`trakt.movies.Movie` or :class:`trakt.people.Person`
+    :param extended: The extended level to upgrade to
+    :param max_workers: The maximum number of concurrent requests
+    :return: The list of *objects*
+    :raises TypeError: If some objects have no extended levels, before
+        anything is fetched
+    :raises HydrationError: If the data of some objects couldn't be fetched,
+        after every other object was upgraded
+    """
+    objects = list(objects)
+    pending = {}
+    for obj in objects:
+        if not hasattr(obj, '_extended'):
+            raise TypeError('{} objects have no extended levels to upgrade '
+                            'to'.format(type(obj).__name__))
+        if obj._extended != extended:
+            uri = obj.ext + '?extended={}'.format(extended)
+            group = pending.setdefault(uri, [])
+            if not any(obj is other for other in group):
+                group.append(obj)
+    if not pending:
+        return objects
+
+    client = ACTIVE_CLIENT.get()
+    fetch_as = deadline.bound(_fetch_as)
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(uri, executor.submit(fetch_as, client, uri))
+                   for uri in pending]
+        for uri, future in futures:
+            try:
+                data = future.result()
+            except deadline.DeadlineExceeded:
+                if not deadline.allows_partial():
+                    raise
+                continue
+            except Exception as error:
+                errors[uri] = error
+                continue
+            _build_all(pending[uri], data, extended)
+    if errors:
+        raise HydrationError(errors, [obj for uri in errors
+                                      for obj in pending[uri]])
+    return objects
+
+
+def upgrade(objects, extended=FULL):
+    """Upgrade every object of *objects* built from a lower extended level,
+    fetching the data of each at most once. An alias of :func:`hydrate`
+    """
+    return hydrate(objects, extended)
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""Request metrics for the Trakt.tv API, collected from :class:`Core` hooks
+and exported as a Python dict or in the Prometheus text exposition format
+"""
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+from trakt.utils import endpoint_template
+
+__author__ = 'Jon Nappi'
+__all__ = ['DEFAULT_BUCKETS', 'Histogram', 'MetricsCollector']
+
+#: The default upper bounds, in seconds, of latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+
+
+class Histogram(object):
+    """A cumulative histogram of observed values, in the style of a
+    Prometheus histogram
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Record a single observed *value*"""
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    def as_dict(self):
+        buckets = {str(bound): count
+                   for bound, count in zip(self.buckets, self.counts)}
+        buckets['+Inf'] = self.count
+        return {'buckets': buckets, 'count': self.count, 'sum': self.sum}
+
+
+def _labels(**labels):
+    """Format *labels* as a Prometheus label set"""
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"') \
+            .replace('\n', '\\n')
+    return '{' + ','.join('{}="{}"'.format(k, escape(v))
+                          for k, v in sorted(labels.items())) + '}'
+
+
+class MetricsCollector(object):
+    """Collects per endpoint request metrics from one or more :class:`Core`
+    instances: latency histograms, bytes received, response status codes,
+    errors, retries and cache hits. Endpoints are identified by their method
+    and :func:`trakt.utils.endpoint_template`, so that requests for different
+    shows are counted together.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Create a new :class:`MetricsCollector`
+
+        :param buckets: The upper bounds, in seconds, of the latency buckets
+        """
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Discard all collected metrics"""
+        with self._lock:
+            self.latency = defaultdict(lambda: Histogram(self.buckets))
+            self.bytes = defaultdict(int)
+            self.statuses = defaultdict(int)
+            self.errors = defaultdict(int)
+            self.retries = defaultdict(int)
+            self.cache_hits = defaultdict(int)
+
+    def _hooks(self):
+        return {'after_response': self.after_response,
+                'on_error': self.on_error,
+                'on_retry': self.on_retry,
+                'on_cache_hit': self.on_cache_hit}
+
+    def install(self, core=None):
+        """Start collecting metrics from *core*, which defaults to the global
+        :data:`trakt.core.CORE`, including the calls routed to an active
+        :class:`trakt.client.TraktClient`
+        """
+        if core is None:
+            from trakt.core import CORE as core
+        for event, hook in self._hooks().items():
+            core.register_hook(event, hook)
+        return self
+
+    def uninstall(self, core=None):
+        """Stop collecting metrics from *core*"""
+        if core is None:
+            from trakt.core import CORE as core
+        for event, hook in self._hooks().items():
+            core.unregister_hook(event, hook)
+
+    @staticmethod
+    def _key(method, url):
+        return method.upper(), endpoint_template(url)
+
+    def after_response(self, method, url, response, elapsed, **kwargs):
+        key = self._key(method, url)
+        with self._lock:
+            self.latency[key].observe(elapsed)
+            self.bytes[key] += len(response.content or b'')
+            self.statuses[key + (response.status_code,)] += 1
+
+    def on_error(self, method, url, error, **kwargs):
+        key = self._key(method, url)
+        with self._lock:
+            self.errors[key + (error.__class__.__name__,)] += 1
+
+    def on_retry(self, method, url, **kwargs):
+        with self._lock:
+            self.retries[self._key(method, url)] += 1
+
+    def on_cache_hit(self, method, url, **kwargs):
+        with self._lock:
+            self.cache_hits[self._key(method, url)] += 1
+
+    def as_dict(self):
+        """All collected metrics, as a dict keyed by ``'METHOD endpoint'``"""
+        endpoints = defaultdict(lambda: {
+            'latency': Histogram(self.buckets).as_dict(), 'bytes': 0,
+            'statuses': {}, 'errors': {}, 'retries': 0, 'cache_hits': 0})
+
+        def endpoint(key):
+            return endpoints[' '.join(key[:2])]
+
+        with self._lock:
+            for key, histogram in self.latency.items():
+                endpoint(key)['latency'] = histogram.as_dict()
+            for key, count in self.bytes.items():
+                endpoint(key)['bytes'] = count
+            for key, count in self.statuses.items():
+                endpoint(key)['statuses'][key[2]] = count
+            for key, count in self.errors.items():
+                endpoint(key)['errors'][key[2]] = count
+            for key, count in self.retries.items():
+                endpoint(key)['retries'] = count
+            for key, count in self.cache_hits.items():
+                endpoint(key)['cache_hits'] = count
+        return dict(endpoints)
+
+    def to_prometheus(self):
+        """All collected metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines.append('# HELP trakt_request_duration_seconds Trakt API '
+                         'request latency')
+            lines.append('# TYPE trakt_request_duration_seconds histogram')
+            for (method, endpoint), hist in sorted(self.latency.items()):
+                labels = dict(method=method, endpoint=endpoint)
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append('trakt_request_duration_seconds_bucket{} {}'
+                                 .format(_labels(le=bound, **labels), count))
+                lines.append('trakt_request_duration_seconds_bucket{} {}'
+                             .format(_labels(le='+Inf', **labels),
+                                     hist.count))
+                lines.append('trakt_request_duration_seconds_sum{} {}'
+                             .format(_labels(**labels), hist.sum))
+                lines.append('trakt_request_duration_seconds_count{} {}'
+                             .format(_labels(**labels), hist.count))
+
+            counters = (
+                ('trakt_response_bytes_total', 'Bytes received',
+                 self.bytes, None),
+                ('trakt_responses_total', 'Responses by status code',
+                 self.statuses, 'status'),
+                ('trakt_errors_total', 'Errors by exception type',
+                 self.errors, 'error'),
+                ('trakt_retries_total', 'Retried requests',
+                 self.retries, None),
+                ('trakt_cache_hits_total', 'Requests answered from a cache',
+                 self.cache_hits, None),
+            )
+            for name, doc, values, extra in counters:
+                lines.append('# HELP {} {}'.format(name, doc))
+                lines.append('# TYPE {} counter'.format(name))
+                for key, count in sorted(values.items()):
+                    labels = dict(method=key[0], endpoint=key[1])
+                    if extra is not None:
+                        labels[extra] = key[2]
+                    lines.append('{}{} {}'.format(name, _labels(**labels),
+                                                  count))
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port, host=''):
+        """Serve :meth:`to_prometheus` over HTTP from a daemon thread, for
+        scraping by a Prometheus server
+
+        :param port: The port to listen on
+        :param host: The host to bind to. Defaults to all interfaces
+        :return: The running :class:`http.server.HTTPServer`
+        """
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = collector.to_prometheus().encode('UTF-8')
+                self.send_response(200)
+                self.send_header('Content-Type',
+                                 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingMixIn, HTTPServer):
+            daemon_threads = True
+
+        server = Server((host, port), Handler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return server
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""A local mirror of Trakt.tv catalog data, kept fresh incrementally using the
+shows/updates and movies/updates endpoints
+"""
+import json
+import os
+from copy import deepcopy
+from datetime import datetime, timezone
+
+from trakt.core import fetch
+from trakt.movies import Movie, updated_movies
+from trakt.tv import TVShow, updated_shows
+from trakt.utils import paginate
+
+__author__ = 'Jon Nappi'
+__all__ = ['CatalogMirror']
+
+
+def _watermark():
+    """Generate a trakt formatted UTC timestamp for the current moment"""
+    meow = datetime.now(tz=timezone.utc)
+    return meow.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+class CatalogMirror(object):
+    """A local store of :class:`TVShow` and :class:`Movie` data. Each call to
+    :meth:`sync` pulls every page of updates since the last recorded sync
+    (the watermark) and re-fetches only the tracked titles that changed.
+    """
+    #: Sections of the catalog, mapped to the model class used to build them
+    SECTIONS = {'shows': TVShow, 'movies': Movie}
+
+    def __init__(self, path=None, page_size=100):
+        """Create a new :class:`CatalogMirror`
+
+        :param path: Optional path to a JSON file used to persist the mirror
+            between runs. If the file exists it is loaded immediately
+        :param page_size: The number of updates to request per page
+        """
+        super(CatalogMirror, self).__init__()
+        self.path = path
+        self.page_size = page_size
+        self.watermark = None
+        self._store = {section: {} for section in self.SECTIONS}
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        """The total number of titles held in this mirror"""
+        return sum(len(items) for items in self._store.values())
+
+    def __contains__(self, media):
+        """Check whether *media*, a :class:`TVShow` or :class:`Movie`, is
+        tracked by this mirror
+        """
+        return str(media.trakt) in self._store.get(media.media_type, {})
+
+    def load(self):
+        """Load the mirror contents and watermark from *path*"""
+        with open(self.path) as mirror_file:
+            data = json.load(mirror_file)
+        self.watermark = data.get('watermark')
+        for section in self.SECTIONS:
+            self._store[section] = data.get(section, {})
+
+    def save(self):
+        """Persist the mirror contents and watermark to *path*"""
+        if self.path is None:
+            return
+        data = dict(self._store, watermark=self.watermark)
+        with open(self.path, 'w') as mirror_file:
+            json.dump(data, mirror_file)
+
+    def track_show(self, slug):
+        """Start mirroring the show identified by *slug*, fetching its full
+        data immediately
+
+        :param slug: The trakt slug or id of the show to mirror
+        """
+        return self._track('shows', slug)
+
+    def track_movie(self, slug):
+        """Start mirroring the movie identified by *slug*, fetching its full
+        data immediately
+
+        :param slug: The trakt slug or id of the movie to mirror
+        """
+        return self._track('movies', slug)
+
+    def _track(self, section, slug):
+        uri = '{section}/{slug}?extended=full'
+        data = fetch(uri.format(section=section, slug=slug))
+        self._store[section][str(data['ids']['trakt'])] = data
+        return self._build(section, data)
+
+    def _build(self, section, data):
+        """Build a model instance from a copy of the stored *data*, leaving
+        the stored data untouched by the model's own processing
+        """
+        return self.SECTIONS[section](**deepcopy(data))
+
+    def get(self, section, trakt_id):
+        """Return the mirrored :class:`TVShow` or :class:`Movie` with the
+        provided trakt id, or `None` if it isn't tracked
+
+        :param section: One of 'shows' or 'movies'
+        :param trakt_id: The trakt id of the title
+        """
+        data = self._store[section].get(str(trakt_id))
+        if data is None:
+            return None
+        return self._build(section, data)
+
+    @property
+    def shows(self):
+        """All of the mirrored :class:`TVShow`'s"""
+        return [self._build('shows', d) for d in self._store['shows'].values()]
+
+    @property
+    def movies(self):
+        """All of the mirrored :class:`Movie`'s"""
+        return [self._build('movies', d)
+                for d in self._store['movies'].values()]
+
+    def updates(self, since):
+        """Iterate over every (section, media) pair updated since *since*,
+        across all pages of the updates endpoints
+
+        :param since: A trakt formatted timestamp
+        """
+        for section, updated in (('shows', updated_shows),
+                                 ('movies', updated_movies)):
+            def page_of(page, limit):
+                return updated(since, page=page, limit=limit)
+            for media in paginate(page_of, limit=self.page_size):
+                yield section, media
+
+    def sync(self, since=None):
+        """Bring this mirror up to date. Only tracked titles reported as
+        updated since the watermark are re-fetched. The first sync of a new
+        mirror has no watermark to diff against, so it only records one.
+
+        :param since: Optional timestamp overriding the stored watermark
+        :return: A dict mapping each section to a list of the trakt ids that
+            were refreshed
+        """
+        since = since or self.watermark
+        # the new watermark is taken up front so that updates made while this
+        # sync is running will be picked up by the next one
+        watermark = _watermark()
+        refreshed = {section: set() for section in self.SECTIONS}
+        if since is not None:
+            for section, media in self.updates(since):
+                key = str(media.trakt)
+                if key in self._store[section] and \
+                        key not in refreshed[section]:
+                    self._track(section, media.slug)
+                    refreshed[section].add(key)
+        self.watermark = watermark
+        self.save()
+        return {section: sorted(ids) for section, ids in refreshed.items()}
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 """Interfaces to all of the Movie objects offered by the Trakt.tv API"""
 from collections import namedtuple
+from trakt.comments import iter_comments
 from trakt.core import Alias, Comment, Genre, get, delete
+from trakt.extended import FULL, ExtendedField, extended_level
 from trakt.sync import (Scrobbler, comment, rate, add_to_history,
                         remove_from_history, add_to_watchlist,
                         remove_from_watchlist, add_to_collection,
@@ -60,14 +62,20 @@ def trending_movies():
 
 
 @get
-def updated_movies(timestamp=None):
+def updated_movies(timestamp=None, page=1, limit=10, extended=None):
     """Returns all movies updated since a timestamp. The server time is in PST.
     To establish a baseline timestamp, you can use the server/time method. It's
     recommended to store the timestamp so you can be efficient in using this
     method.
     """
     ts = timestamp or now()
-    data = yield 'movies/updates/{start_date}'.format(start_date=ts)
+    uri = 'movies/updates/{start_date}?page={page}&limit={limit}'.format(
+        start_date=ts, page=page, limit=limit
+    )
+    if extended:
+        uri += '&extended={extended}'.format(extended=extended)
+
+    data = yield uri
     to_ret = []
     for movie in data:
         mov = movie.pop('movie')
@@ -82,9 +90,30 @@ Release = namedtuple('Release', ['country', 'certification', 'release_date',
 
 
 class Movie(object):
-    """A Class representing a Movie object"""
+    """A Class representing a Movie object. Fields only returned at the
+    ``full`` extended level are fetched on first access if this movie was
+    built from minimal data, see :mod:`trakt.extended`
+    """
+    tagline = ExtendedField()
+    overview = ExtendedField()
+    released = ExtendedField(infer=False)
+    runtime = ExtendedField()
+    country = ExtendedField()
+    updated_at = ExtendedField(infer=False)
+    trailer = ExtendedField()
+    homepage = ExtendedField()
+    status = ExtendedField()
+    rating = ExtendedField(infer=False)
+    votes = ExtendedField(infer=False)
+    comment_count = ExtendedField()
+    language = ExtendedField()
+    available_translations = ExtendedField()
+    genres = ExtendedField()
+    certification = ExtendedField()
+
     def __init__(self, title, year=None, slug=None, **kwargs):
         super(Movie, self).__init__()
+        self._extended = None
         self.media_type = 'movies'
         self.title = title
         self.year = int(year) if year is not None else year
@@ -93,11 +122,7 @@ class Movie(object):
         else:
             self.slug = slug or slugify(self.title)
 
-        self.released = self.tmdb_id = self.imdb_id = self.duration = None
-        self.trakt_id = self.tagline = self.overview = self.runtime = None
-        self.updated_at = self.trailer = self.homepage = self.rating = None
-        self.votes = self.language = self.available_translations = None
-        self.genres = self.certification = None
+        self.tmdb_id = self.imdb_id = self.duration = self.trakt_id = None
         self._comments = self._images = self._aliases = self._people = None
         self._ratings = self._releases = self._translations = None
 
@@ -116,16 +141,18 @@ class Movie(object):
         return search(title, search_type='movie', year=year)
 
     @get
-    def _get(self):
+    def _get(self, extended=FULL):
         """Handle getting this :class:`Movie`'s data from trakt and building
         our attributes from the returned data
         """
-        data = yield self.ext_full
+        data = yield self.ext + '?extended={}'.format(extended)
         self._build(data)
+        self._extended = extended
 
     def _build(self, data):
         """Build this :class:`Movie` object with the data in *data*"""
         extract_ids(data)
+        self._extended = self._extended or extended_level(type(self), data)
         for key, val in data.items():
             if hasattr(self, '_' + key):
                 setattr(self, '_' + key, val)
@@ -168,9 +195,9 @@ class Movie(object):
     @get
     def comments(self):
         """All comments (shouts and reviews) for this :class:`Movie`. Most
-        recent comments returned first.
+        recent comments returned first. Only the first page of comments is
+        returned, use :meth:`iter_comments` to stream all of them.
         """
-        # TODO (jnappi) Pagination
         from trakt.users import User
         data = yield self.ext + '/comments'
         self._comments = []
@@ -181,6 +208,12 @@ class Movie(object):
             )
         yield self._comments
 
+    def iter_comments(self, sort=None, limit=100):
+        """Iterate over every comment on this :class:`Movie`, requesting them
+        a page at a time. See :func:`trakt.comments.iter_comments`
+        """
+        return iter_comments(self.ext + '/comments', sort=sort, limit=limit)
+
     @property
     def crew(self):
         """All of the crew members that worked on this :class:`Movie`"""
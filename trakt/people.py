@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Interfaces to all of the People objects offered by the Trakt.tv API"""
 from trakt.core import get
+from trakt.extended import FULL, ExtendedField, extended_level
 from trakt.sync import search
 from trakt.utils import extract_ids, slugify
 
@@ -10,11 +11,22 @@ __all__ = ['Person', 'ActingCredit', 'CrewCredit', 'Credits', 'MovieCredits',
 
 
 class Person(object):
-    """A Class representing a trakt.tv Person such as an Actor or Director"""
+    """A Class representing a trakt.tv Person such as an Actor or Director.
+    Fields only returned at the ``full`` extended level are fetched on first
+    access if this person was built from minimal data, see
+    :mod:`trakt.extended`
+    """
+    biography = ExtendedField()
+    birthday = ExtendedField()
+    death = ExtendedField()
+    birthplace = ExtendedField()
+    homepage = ExtendedField()
+
     def __init__(self, name, slug=None, **kwargs):
         super(Person, self).__init__()
+        self._extended = None
         self.name = name
-        self.biography = self.birthplace = self.tmdb_id = self.birthday = None
+        self.tmdb_id = None
         self.job = self.character = self._images = self._movie_credits = None
         self._tv_credits = None
         self.slug = slug or slugify(self.name)
@@ -54,12 +66,14 @@ class Person(object):
         return self.ext + '/shows'
 
     @get
-    def _get(self):
-        data = yield self.ext_full
+    def _get(self, extended=FULL):
+        data = yield self.ext + '?extended={}'.format(extended)
         self._build(data)
+        self._extended = extended
 
     def _build(self, data):
         extract_ids(data)
+        self._extended = self._extended or extended_level(type(self), data)
         for key, val in data.items():
             try:
                 setattr(self, key, val)
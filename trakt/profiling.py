@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Tools for finding code which fans out into many Trakt.tv API requests,
+such as building a list of objects which each load their own details
+"""
+import threading
+import warnings
+from collections import Counter
+
+from trakt.utils import endpoint_template
+
+__author__ = 'Jon Nappi'
+__all__ = ['NPlusOneWarning', 'NPlusOneError', 'RequestProfile',
+           'profile_requests']
+
+
+class NPlusOneWarning(UserWarning):
+    """Warning issued when the same endpoint is requested more times than
+    allowed inside a :func:`profile_requests` block
+    """
+
+
+class NPlusOneError(AssertionError):
+    """Raised in place of a :class:`NPlusOneWarning` by a strict
+    :func:`profile_requests` block
+    """
+    def __init__(self, message, profile):
+        super(NPlusOneError, self).__init__(message)
+        self.profile = profile
+
+
+class RequestProfile(object):
+    """Counts the requests a :class:`Core` sends while it is installed,
+    grouped by HTTP method and :func:`trakt.utils.endpoint_template`
+    """
+    def __init__(self, threshold=10, strict=False, core=None):
+        """Create a new :class:`RequestProfile`
+
+        :param threshold: The number of times any single endpoint may be
+            requested before it is reported as an N+1 pattern
+        :param strict: If `True`, raise a :class:`NPlusOneError` rather than
+            warning when the threshold is exceeded
+        :param core: The :class:`Core` to profile. Defaults to the global
+            :data:`trakt.core.CORE`, which includes the calls routed to an
+            active :class:`trakt.client.TraktClient`
+        """
+        if core is None:
+            from trakt.core import CORE as core
+        self.threshold = threshold
+        self.strict = strict
+        self.core = core
+        self.counts = Counter()
+        self.urls = []
+        self._lock = threading.Lock()
+
+    @property
+    def total(self):
+        """The total number of requests sent"""
+        return sum(self.counts.values())
+
+    def _before_request(self, method, url, **kwargs):
+        key = '{} {}'.format(method.upper(), endpoint_template(url))
+        with self._lock:
+            self.counts[key] += 1
+            self.urls.append(url)
+
+    def offenders(self):
+        """A dict of the endpoints which were requested more than
+        :attr:`threshold` times, and how many times they were requested
+        """
+        return {key: count for key, count in self.counts.items()
+                if count > self.threshold}
+
+    def report(self):
+        """A human readable summary of the requests sent, busiest endpoint
+        first
+        """
+        lines = ['{} requests'.format(self.total)]
+        for key, count in self.counts.most_common():
+            lines.append('{:>6}  {}'.format(count, key))
+        return '\n'.join(lines)
+
+    def check(self):
+        """Warn, or raise in strict mode, if any endpoint was requested more
+        than :attr:`threshold` times
+        """
+        offenders = self.offenders()
+        if not offenders:
+            return
+        message = 'Possible N+1 requests (threshold {}): {}'.format(
+            self.threshold, ', '.join(
+                '{} x{}'.format(key, count)
+                for key, count in sorted(offenders.items())))
+        if self.strict:
+            raise NPlusOneError(message, self)
+        warnings.warn(message, NPlusOneWarning, stacklevel=3)
+
+    def __enter__(self):
+        self.core.register_hook('before_request', self._before_request)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.core.unregister_hook('before_request', self._before_request)
+        if exc_type is None:
+            self.check()
+        return False
+
+
+def profile_requests(threshold=10, strict=False, core=None):
+    """Count the API requests sent inside a ``with`` block, warning when any
+    one endpoint is requested more than *threshold* times, ie::
+
+        with profile_requests(threshold=1, strict=True) as profile:
+            season.episodes
+        print(profile.report())
+
+    Requests sent by other threads using the same :class:`Core` while the
+    block is running are counted too.
+
+    :param threshold: The number of times any single endpoint may be
+        requested before it is reported as an N+1 pattern
+    :param strict: If `True`, raise a :class:`NPlusOneError` rather than
+        warning, for catching fan-out regressions in test suites
+    :param core: The :class:`Core` to profile. Defaults to the global
+        :data:`trakt.core.CORE`, which includes the calls routed to an active
+        :class:`trakt.client.TraktClient`
+    :return: A :class:`RequestProfile` context manager
+    """
+    return RequestProfile(threshold, strict, core)
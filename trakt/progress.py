@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""Watched progress for every show a user has watched, computed locally
+instead of with a ``/progress/watched`` request per show::
+
+    for show, progress in trakt.progress.watched_progress('sean'):
+        print(show.title, progress['completed'], progress['next_episode'])
+
+A single ``users/{user}/watched/shows`` request lists every episode the user
+has played. It's combined with the structure of each show, the number of
+episodes aired in each of its seasons, which is taken from the loaded
+:attr:`trakt.tv.TVShow.seasons` of the shows passed in or else cached between
+calls for :data:`STRUCTURE_TTL` seconds. Missing structures are fetched
+concurrently. The progress of each show has the same shape as the one
+returned by :attr:`trakt.tv.TVShow.watched_progress`, except that its next
+and last episodes only hold their season and number. Plays from before the
+user last reset their progress of a show are left out, as trakt does, but
+seasons hidden from the progress aren't known without a request of their
+own, so *hidden_seasons* is always empty and every season is counted.
+"""
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from trakt import deadline
+from trakt.core import ACTIVE_CLIENT, get
+from trakt.tv import TVShow
+from trakt.utils import extract_ids, slugify
+
+__author__ = 'Jon Nappi'
+__all__ = ['STRUCTURE_TTL', 'ShowProgress', 'compute_progress',
+           'season_structure', 'clear_structures', 'watched_progress']
+
+#: The number of seconds the season structure of a show is cached for
+STRUCTURE_TTL = 24 * 60 * 60
+
+#: The watched progress of a :class:`trakt.tv.TVShow`
+ShowProgress = namedtuple('ShowProgress', ['show', 'progress'])
+
+_structures = {}
+_lock = threading.Lock()
+
+
+def clear_structures():
+    """Forget every cached season structure"""
+    with _lock:
+        _structures.clear()
+
+
+def _cached_structure(show, clock):
+    with _lock:
+        entry = _structures.get(show.trakt)
+    if entry is not None and entry[0] > clock():
+        return entry[1]
+    return None
+
+
+def _store_structure(show, structure, clock):
+    if show.trakt is not None:
+        with _lock:
+            _structures[show.trakt] = (clock() + STRUCTURE_TTL, structure)
+    return structure
+
+
+def _loaded_structure(show):
+    """The structure of *show* from its loaded seasons, if they hold the
+    number of episodes aired in each season
+    """
+    seasons = show._seasons
+    if not seasons or not all(hasattr(season, 'aired_episodes')
+                              for season in seasons):
+        return None
+    return {season.number: season.aired_episodes or 0 for season in seasons}
+
+
+@get
+def _fetch_structure(show):
+    data = yield show.ext + '/seasons?extended=full'
+    yield {season['number']: season.get('aired_episodes') or 0
+           for season in data or ()}
+
+
+def season_structure(show):
+    """The number of episodes aired in each season of *show*, by season
+    number. Taken from its loaded :attr:`trakt.tv.TVShow.seasons` if they're
+    complete, or else fetched
+
+    :param show: A :class:`trakt.tv.TVShow`
+    """
+    structure = _loaded_structure(show)
+    if structure is None:
+        structure = _fetch_structure(show)
+    return structure
+
+
+def _structure_as(client, show, clock):
+    """Fetch the structure of *show* from a worker thread with *client*
+    active, as it was in the thread which called :func:`watched_progress`
+    """
+    token = ACTIVE_CLIENT.set(client)
+    try:
+        return _store_structure(show, season_structure(show), clock)
+    finally:
+        ACTIVE_CLIENT.reset(token)
+
+
+def compute_progress(structure, seasons, specials=False, reset_at=None):
+    """Compute the watched progress of a show
+
+    :param structure: The number of episodes aired in each season of the
+        show, by season number, ie from :func:`season_structure`
+    :param seasons: The seasons the user has watched, as listed by
+        ``users/{user}/watched/shows``
+    :param specials: Whether to include the specials in season 0
+    :param reset_at: Optional timestamp the user reset their progress at,
+        episodes last watched before it not counting as watched
+    :return: A dict shaped like the one returned by
+        :attr:`trakt.tv.TVShow.watched_progress`
+    """
+    plays = {}
+    for season in seasons or ():
+        for episode in season.get('episodes') or ():
+            if reset_at is not None and \
+                    (episode.get('last_watched_at') or '') <= reset_at:
+                continue
+            plays[season['number'], episode['number']] = episode
+
+    progress = {'aired': 0, 'completed': 0, 'last_watched_at': None,
+                'reset_at': reset_at, 'seasons': [], 'hidden_seasons': [],
+                'next_episode': None, 'last_episode': None}
+    aired, last = [], None
+    for number in sorted(structure):
+        if number == 0 and not specials:
+            continue
+        episodes = []
+        for episode in range(1, structure[number] + 1):
+            played = plays.get((number, episode))
+            watched_at = played and played.get('last_watched_at')
+            episodes.append({'number': episode, 'completed': bool(played),
+                             'last_watched_at': watched_at})
+            aired.append((number, episode, bool(played)))
+            if played and (last is None or (watched_at or '') >= last[0]):
+                last = (watched_at or '', number, episode)
+        completed = sum(episode['completed'] for episode in episodes)
+        progress['seasons'].append({'number': number, 'aired': len(episodes),
+                                    'completed': completed,
+                                    'episodes': episodes})
+        progress['aired'] += len(episodes)
+        progress['completed'] += completed
+
+    if last is not None:
+        watched_at, number, episode = last
+        progress['last_watched_at'] = watched_at or None
+        progress['last_episode'] = {'season': number, 'number': episode}
+        # the next episode is the first unwatched one after the last watched
+        aired = aired[aired.index((number, episode, True)) + 1:]
+    for number, episode, completed in aired:
+        if not completed:
+            progress['next_episode'] = {'season': number, 'number': episode}
+            break
+    return progress
+
+
+@get
+def _watched_shows(username):
+    data = yield 'users/{user}/watched/shows'.format(user=slugify(username))
+    yield data
+
+
+def watched_progress(username='me', shows=None, specials=False,
+                     max_workers=8, clock=time.monotonic):
+    """Compute the watched progress of every show *username* has watched
+
+    :param username: The user whose progress to compute, defaults to the
+        authenticated user
+    :param shows: Optional :class:`trakt.tv.TVShow`'s to limit the progress
+        to. The structures of those whose seasons are already loaded are
+        taken from them
+    :param specials: Whether to include the specials in season 0
+    :param max_workers: The maximum number of concurrent requests for missing
+        season structures
+    :param clock: The function returning the current time in seconds
+    :return: A list of :class:`ShowProgress`, in the order the shows are
+        listed by trakt. Shows whose structure couldn't be fetched before a
+        :class:`trakt.deadline.Deadline` created with *partial* ran out are
+        left out
+    """
+    known = None
+    if shows is not None:
+        known = {show.trakt: show for show in shows}
+    watched = []
+    for item in _watched_shows(username) or ():
+        show_data = item['show']
+        extract_ids(show_data)
+        if known is not None:
+            if show_data.get('trakt') not in known:
+                continue
+            show = known[show_data['trakt']]
+        else:
+            show = TVShow(**show_data)
+        watched.append((show, item.get('seasons'), item.get('reset_at')))
+
+    structures, missing = {}, []
+    for show, _, _ in watched:
+        structure = _loaded_structure(show)
+        if structure is not None:
+            _store_structure(show, structure, clock)
+        else:
+            structure = _cached_structure(show, clock)
+        if structure is None:
+            missing.append(show)
+        else:
+            structures[id(show)] = structure
+    if missing:
+        client = ACTIVE_CLIENT.get()
+        fetch = deadline.bound(_structure_as)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(fetch, [client] * len(missing), missing,
+                                   [clock] * len(missing))
+            try:
+                for show, structure in zip(missing, results):
+                    structures[id(show)] = structure
+            except deadline.DeadlineExceeded:
+                if not deadline.allows_partial():
+                    raise
+
+    return [ShowProgress(show, compute_progress(structures[id(show)],
+                                                seasons, specials, reset_at))
+            for show, seasons, reset_at in watched if id(show) in structures]
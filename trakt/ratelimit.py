@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Token bucket rate limiters which keep a :class:`trakt.core.Core` within the
+Trakt.tv API rate limits. A :class:`FileTokenBucket` keeps its state in a
+locked file, so that every process on a host sharing the same file draws
+from a single budget.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+    import msvcrt
+
+__author__ = 'Jon Nappi'
+__all__ = ['TokenBucket', 'FileTokenBucket', 'retry_after']
+
+
+def retry_after(response, default=1.0):
+    """The number of seconds a 429 *response* asks us to wait before trying
+    again, read from its ``Retry-After`` header
+    """
+    value = response.headers.get('Retry-After')
+    if value is None:
+        # the headers of responses from custom transports may be plain dicts
+        value = next((v for k, v in response.headers.items()
+                      if k.lower() == 'retry-after'), default)
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket(object):
+    """A token bucket shared by the threads of a single process. Tokens are
+    refilled continuously at *rate* per second, up to *capacity*, and every
+    request takes one token, waiting for it when the bucket is empty.
+    """
+    def __init__(self, rate, capacity=None, max_retries=3):
+        """Create a new, full :class:`TokenBucket`
+
+        :param rate: The number of requests allowed per second, ie
+            ``1000 / 300.0`` for 1000 requests every 5 minutes
+        :param capacity: The largest burst of requests allowed. Defaults to
+            one second's worth of requests, and no less than one
+        :param max_retries: The number of times a :class:`Core` retries a
+            request which was rate limited anyway
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(self.rate, 1.0))
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._memory = self._initial_state()
+
+    def _initial_state(self):
+        return {'tokens': self.capacity, 'updated': time.time(),
+                'blocked_until': 0.0}
+
+    @contextmanager
+    def _state(self):
+        """Hold the lock on, and yield, the mutable state of this bucket"""
+        with self._lock:
+            yield self._memory
+
+    def _take(self, state, tokens, now):
+        """Take *tokens* from *state* if possible, returning 0, or else the
+        number of seconds to wait before trying again
+        """
+        elapsed = max(now - state['updated'], 0.0)
+        state['tokens'] = min(self.capacity,
+                              state['tokens'] + elapsed * self.rate)
+        state['updated'] = now
+        if state['blocked_until'] > now:
+            return state['blocked_until'] - now
+        if state['tokens'] >= tokens:
+            state['tokens'] -= tokens
+            return 0.0
+        return (tokens - state['tokens']) / self.rate
+
+    def acquire(self, tokens=1, timeout=None):
+        """Take *tokens* from the bucket, waiting for them if necessary
+
+        :param tokens: The number of tokens to take
+        :param timeout: The longest time, in seconds, to wait. Waits for as
+            long as it takes if `None`
+        :return: `True` if the tokens were taken, `False` on a timeout
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            with self._state() as state:
+                wait = self._take(state, tokens, time.time())
+            if not wait:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def backoff(self, seconds):
+        """Stop handing out tokens for *seconds*, ie after a 429 response, and
+        empty the bucket so that requests resume at the steady rate
+        """
+        with self._state() as state:
+            now = time.time()
+            state['blocked_until'] = max(state['blocked_until'],
+                                         now + seconds)
+            state['tokens'] = 0.0
+            state['updated'] = now
+
+
+class FileTokenBucket(TokenBucket):
+    """A :class:`TokenBucket` whose state lives in a file guarded by an
+    exclusive lock, so that it may be shared by every process on a host::
+
+        bucket = FileTokenBucket('/tmp/trakt-budget', rate=1000 / 300.0)
+        trakt.core.CORE.rate_limiter = bucket
+    """
+    def __init__(self, path, rate, capacity=None, max_retries=3):
+        """Create a new :class:`FileTokenBucket`
+
+        :param path: The path of the file shared by all processes. It is
+            created, full, if it does not exist yet
+        :param rate: The number of requests allowed per second, across all
+            processes
+        :param capacity: The largest burst of requests allowed
+        :param max_retries: The number of times a :class:`Core` retries a
+            request which was rate limited anyway
+        """
+        self.path = path
+        super(FileTokenBucket, self).__init__(rate, capacity, max_retries)
+
+    @staticmethod
+    def _lock_file(fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:  # pragma: no cover
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+    @staticmethod
+    def _unlock_file(fd):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:  # pragma: no cover
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    @contextmanager
+    def _state(self):
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                self._lock_file(fd)
+                try:
+                    raw = b''
+                    chunk = os.read(fd, 4096)
+                    while chunk:
+                        raw += chunk
+                        chunk = os.read(fd, 4096)
+                    try:
+                        state = json.loads(raw.decode('UTF-8'))
+                    except ValueError:
+                        state = self._initial_state()
+                    yield state
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    os.ftruncate(fd, 0)
+                    os.write(fd, json.dumps(state).encode('UTF-8'))
+                finally:
+                    self._unlock_file(fd)
+            finally:
+                os.close(fd)
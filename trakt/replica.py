@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""A client-side replica of a user's library, refreshed using the
+sync/last_activities timestamps so that only changed sections are downloaded
+"""
+import json
+import os
+from copy import deepcopy
+
+from trakt.core import fetch
+from trakt.movies import Movie
+from trakt.sync import get_last_activities
+from trakt.tv import TVShow, TVSeason
+from trakt.utils import slugify, extract_ids
+
+__author__ = 'Jon Nappi'
+__all__ = ['LibraryReplica']
+
+
+class LibraryReplica(object):
+    """A local, indexed copy of a :class:`User`'s watched history, collection
+    and watchlists. :meth:`refresh` first requests sync/last_activities and
+    only re-downloads the sections whose activity timestamps moved.
+
+    Because sync/last_activities describes the authenticated user, the
+    replica should be created for that user (or 'me').
+    """
+    #: Each section maps to its uri, the last_activities group and field
+    #: that track it, and the key holding the media object in each item
+    SECTIONS = {
+        'watched_movies': ('users/{user}/watched/movies',
+                           'movies', 'watched_at', 'movie'),
+        'watched_shows': ('users/{user}/watched/shows',
+                          'episodes', 'watched_at', 'show'),
+        'movie_collection': ('users/{user}/collection/movies'
+                             '?extended=metadata',
+                             'movies', 'collected_at', 'movie'),
+        'show_collection': ('users/{user}/collection/shows?extended=metadata',
+                            'episodes', 'collected_at', 'show'),
+        'watchlist_movies': ('users/{user}/watchlist/movies',
+                             'movies', 'watchlisted_at', 'movie'),
+        'watchlist_shows': ('users/{user}/watchlist/shows',
+                            'shows', 'watchlisted_at', 'show'),
+    }
+
+    def __init__(self, username, path=None):
+        """Create a new :class:`LibraryReplica`
+
+        :param username: The username of the library to replicate
+        :param path: Optional path to a JSON file used to persist the replica
+            between runs. If the file exists it is loaded immediately
+        """
+        super(LibraryReplica, self).__init__()
+        self.username = username
+        self.path = path
+        self.activities = {}
+        self._sections = {}
+        self._index = {}
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        """Load the replica contents and activity timestamps from *path*"""
+        with open(self.path) as replica_file:
+            data = json.load(replica_file)
+        self.activities = data.get('activities', {})
+        for section, items in data.get('sections', {}).items():
+            self._apply(section, items)
+
+    def save(self):
+        """Persist the replica contents and activity timestamps to *path*"""
+        if self.path is None:
+            return
+        data = {'activities': self.activities,
+                'sections': {section: list(items.values())
+                             for section, items in self._sections.items()}}
+        with open(self.path, 'w') as replica_file:
+            json.dump(data, replica_file)
+
+    def _stamp(self, activities, section):
+        """Extract the timestamp tracking *section* from *activities*"""
+        _, group, field, _ = self.SECTIONS[section]
+        return activities.get(group, {}).get(field)
+
+    def stale_sections(self, activities):
+        """Return the names of the sections that have either never been
+        downloaded or whose timestamp in *activities* has moved
+
+        :param activities: The decoded sync/last_activities response
+        """
+        return [section for section in self.SECTIONS
+                if section not in self._sections or
+                self._stamp(activities, section) !=
+                self._stamp(self.activities, section)]
+
+    def refresh(self):
+        """Bring this replica up to date, downloading only stale sections
+
+        :return: A list of the names of the sections that were re-downloaded
+        """
+        activities = get_last_activities()
+        stale = self.stale_sections(activities)
+        for section in stale:
+            uri = self.SECTIONS[section][0]
+            items = fetch(uri.format(user=slugify(self.username)))
+            self._apply(section, items or [])
+        self.activities = activities
+        if stale:
+            self.save()
+        return stale
+
+    def _apply(self, section, items):
+        """Replace the contents of *section* with *items*, re-indexing them by
+        each of their ids
+        """
+        media_key = self.SECTIONS[section][3]
+        store, index = {}, {}
+        for item in items:
+            ids = item[media_key]['ids']
+            store[ids['trakt']] = item
+            for id_type, value in ids.items():
+                if value is not None:
+                    index[(id_type, value)] = ids['trakt']
+        self._sections[section] = store
+        self._index[section] = index
+
+    def _build(self, section, item):
+        """Build the model object for a stored *item* of *section*, the same
+        way the corresponding :class:`User` property would
+        """
+        item = deepcopy(item)
+        media_key = self.SECTIONS[section][3]
+        media = extract_ids(item.pop(media_key))
+        if section == 'show_collection':
+            seasons = item.pop('seasons', [])
+            show = TVShow(**media)
+            show._seasons = [TVSeason(show=show.title, **season)
+                             for season in seasons]
+            return show
+        if section != 'movie_collection':
+            media.update(item)
+        if media_key == 'movie':
+            return Movie(**media)
+        return TVShow(**media)
+
+    def items(self, section):
+        """All of the model objects held in *section*
+
+        :param section: The name of one of the replica's *SECTIONS*
+        """
+        return [self._build(section, item)
+                for item in self._sections.get(section, {}).values()]
+
+    def find(self, section, **ids):
+        """Look up a single item of *section* by any of its ids, ie
+        ``replica.find('watched_movies', imdb='tt0372784')``. Returns `None`
+        if no item matches
+        """
+        index = self._index.get(section, {})
+        for id_type, value in ids.items():
+            trakt_id = index.get((id_type, value))
+            if trakt_id is not None:
+                return self._build(section, self._sections[section][trakt_id])
+        return None
+
+    @property
+    def watched_movies(self):
+        """All watched :class:`Movie`'s in the replicated library"""
+        return self.items('watched_movies')
+
+    @property
+    def watched_shows(self):
+        """All watched :class:`TVShow`'s in the replicated library"""
+        return self.items('watched_shows')
+
+    @property
+    def movie_collection(self):
+        """All collected :class:`Movie`'s in the replicated library"""
+        return self.items('movie_collection')
+
+    @property
+    def show_collection(self):
+        """All collected :class:`TVShow`'s in the replicated library"""
+        return self.items('show_collection')
+
+    @property
+    def watchlist_movies(self):
+        """All watchlisted :class:`Movie`'s in the replicated library"""
+        return self.items('watchlist_movies')
+
+    @property
+    def watchlist_shows(self):
+        """All watchlisted :class:`TVShow`'s in the replicated library"""
+        return self.items('watchlist_shows')
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""Compact binary snapshots of model objects, for warm starting a process's
+in-memory catalog without re-fetching or re-parsing any JSON::
+
+    trakt.snapshot.dump(shows, 'catalog.snapshot')
+    ...
+    shows = trakt.snapshot.load('catalog.snapshot')
+
+Objects are flattened by :func:`to_dict` into plain dicts, lists and scalars,
+keeping their complete state, ie cached seasons, episodes and comments, and
+rebuilt by :func:`from_dict` without calling their constructors. An object
+referenced more than once is rebuilt as separate copies. Snapshots are
+encoded with msgpack when it's installed (``pip install trakt[snapshot]``), or
+else with the standard library's :mod:`marshal`, whose format is only readable
+by the Python version which wrote it. Snapshot files are memory mapped when
+loaded.
+"""
+import importlib
+import marshal
+import mmap
+import sys
+from copy import deepcopy
+from datetime import date, datetime, timedelta, timezone
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, snapshots fall back to marshal
+    msgpack = None
+
+__author__ = 'Jon Nappi'
+__all__ = ['MSGPACK', 'MARSHAL', 'SnapshotError', 'to_dict', 'from_dict',
+           'dumps', 'loads', 'dump', 'load']
+
+#: The bytes every snapshot starts with
+MAGIC = b'TRKTSNAP'
+#: The encodings a snapshot may use, by the byte identifying them
+MSGPACK, MARSHAL = b'p', b'm'
+
+_TYPE = '__type__'
+_classes = {}
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot can't be read"""
+
+
+def _tag(cls):
+    return '{}.{}'.format(cls.__module__, cls.__qualname__)
+
+
+def _resolve(tag):
+    """The trakt class identified by *tag*, only ever importing trakt
+    modules
+    """
+    cls = _classes.get(tag)
+    if cls is None:
+        module, _, name = tag.rpartition('.')
+        if module != 'trakt' and not module.startswith('trakt.'):
+            raise SnapshotError('Refusing to load {!r}'.format(tag))
+        cls = _classes[tag] = getattr(importlib.import_module(module), name)
+    return cls
+
+
+def _encode(value):
+    if value is None or isinstance(value, (str, int, float, bytes)):
+        return value
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        if not hasattr(value, '_fields'):
+            return [_encode(item) for item in value]
+        encoded = {_TYPE: _tag(type(value)),
+                   'fields': [_encode(item) for item in value]}
+        state = getattr(value, '__dict__', None)
+        if state:
+            encoded['state'] = _encode(state)
+        return encoded
+    if isinstance(value, datetime):
+        encoded = {_TYPE: 'datetime', 'value': [
+            value.year, value.month, value.day, value.hour, value.minute,
+            value.second, value.microsecond]}
+        if value.tzinfo is not None:
+            encoded['offset'] = value.utcoffset().total_seconds()
+        return encoded
+    if isinstance(value, date):
+        return {_TYPE: 'date', 'value': [value.year, value.month, value.day]}
+    if type(value).__module__.startswith('trakt.') and \
+            hasattr(value, '__dict__'):
+        return {_TYPE: _tag(type(value)), 'state': _encode(vars(value))}
+    raise TypeError('Cannot snapshot {!r}'.format(value))
+
+
+#: Types decoded as they are, which are skipped without a call to _decode
+_SCALARS = frozenset([type(None), str, int, float, bool, bytes])
+
+
+def _decode(value):
+    """Decode *value* in place, since it was freshly unpacked and isn't
+    shared with anything else
+    """
+    if type(value) is list:
+        for index, item in enumerate(value):
+            if type(item) not in _SCALARS:
+                value[index] = _decode(item)
+        return value
+    if type(value) is not dict:
+        return value
+    tag = value.get(_TYPE)
+    if tag is None:
+        for key, item in value.items():
+            if type(item) not in _SCALARS:
+                value[key] = _decode(item)
+        return value
+    if tag == 'datetime':
+        offset = value.get('offset')
+        tzinfo = None
+        if offset is not None:
+            tzinfo = timezone(timedelta(seconds=offset))
+        return datetime(*value['value'], tzinfo=tzinfo)
+    if tag == 'date':
+        return date(*value['value'])
+    cls = _resolve(tag)
+    if 'fields' in value:
+        obj = tuple.__new__(cls, _decode(value['fields']))
+    else:
+        obj = cls.__new__(cls)
+    state = value.get('state')
+    if state:
+        obj.__dict__.update(_decode(state))
+    return obj
+
+
+def to_dict(obj):
+    """Flatten *obj*, a model object or any list or dict of them, into plain
+    dicts, lists and scalars which :func:`from_dict` rebuilds it from
+    """
+    return _encode(obj)
+
+
+def from_dict(data):
+    """Rebuild the object flattened into *data* by :func:`to_dict`"""
+    return _decode(deepcopy(data))
+
+
+def dumps(obj, encoding=None):
+    """Encode *obj* as a snapshot
+
+    :param obj: A model object, or any list or dict of them
+    :param encoding: :data:`MSGPACK` or :data:`MARSHAL`. Defaults to msgpack
+        if it's installed
+    :return: The snapshot's bytes
+    """
+    if encoding is None:
+        encoding = MARSHAL if msgpack is None else MSGPACK
+    data = to_dict(obj)
+    if encoding == MSGPACK:
+        if msgpack is None:
+            raise SnapshotError('msgpack is not installed')
+        payload = msgpack.packb(data, use_bin_type=True)
+    elif encoding == MARSHAL:
+        encoding += bytes(sys.version_info[:2])
+        payload = marshal.dumps(data)
+    else:
+        raise ValueError('Unknown snapshot encoding {!r}'.format(encoding))
+    return MAGIC + encoding + payload
+
+
+def loads(data):
+    """Rebuild the object encoded in the snapshot *data*, which may be any
+    bytes-like object, ie a memory map
+    """
+    with memoryview(data) as view:
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise SnapshotError('Not a trakt snapshot')
+        offset = len(MAGIC)
+        encoding = bytes(view[offset:offset + 1])
+        if encoding == MSGPACK:
+            if msgpack is None:
+                raise SnapshotError('msgpack is required to load this '
+                                    'snapshot')
+            with view[offset + 1:] as payload:
+                decoded = msgpack.unpackb(payload, raw=False,
+                                          strict_map_key=False)
+        elif encoding == MARSHAL:
+            version = tuple(view[offset + 1:offset + 3])
+            if version != tuple(sys.version_info[:2]):
+                raise SnapshotError('Snapshot was written by Python '
+                                    '{}.{}'.format(*version))
+            with view[offset + 3:] as payload:
+                decoded = marshal.loads(payload)
+        else:
+            raise SnapshotError('Unknown snapshot encoding '
+                                '{!r}'.format(encoding))
+    return _decode(decoded)
+
+
+def dump(obj, path, encoding=None):
+    """Write a snapshot of *obj* to the file at *path*"""
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(dumps(obj, encoding))
+
+
+def load(path):
+    """Load the snapshot written to the file at *path*"""
+    with open(path, 'rb') as snapshot_file:
+        with mmap.mmap(snapshot_file.fileno(), 0,
+                       access=mmap.ACCESS_READ) as mapped:
+            return loads(mapped)
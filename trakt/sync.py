@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 """This module contains Trakt.tv sync endpoint support functions"""
+import logging
+import threading
+import time
 from datetime import datetime, timezone
 
 from trakt.core import get, post, delete
@@ -11,7 +14,18 @@ __all__ = ['Scrobbler', 'comment', 'rate', 'add_to_history', 'get_collection',
            'get_watchlist', 'add_to_watchlist', 'remove_from_history',
            'remove_from_watchlist', 'add_to_collection',
            'remove_from_collection', 'search', 'search_by_id', 'checkin_media',
-           'delete_checkin']
+           'delete_checkin', 'get_last_activities', 'DebouncedScrobbler',
+           'ScrobbleScheduler']
+
+
+@get
+def get_last_activities():
+    """Get the timestamps of the last time the authenticated user's watched,
+    collected, rated, watchlisted, commented and paused items changed. Compare
+    them with stored values to tell which parts of a library need re-syncing.
+    """
+    data = yield 'sync/last_activities'
+    yield data
 
 
 @post
@@ -504,6 +518,188 @@ class Scrobbler(object):
         self.finish()
 
 
+class DebouncedScrobbler(Scrobbler):
+    """A :class:`Scrobbler` which coalesces frequent progress updates. Calls to
+    :meth:`update` only record the latest progress, which is sent to trakt at
+    most once every *interval* seconds. Starting, pausing, stopping and
+    finishing are always sent immediately, so trakt never misses a change of
+    state, only intermediate progress.
+    """
+    def __init__(self, media, progress, app_version, app_date, interval=900,
+                 clock=time.monotonic):
+        """Create a new :class:`DebouncedScrobbler` instance
+
+        :param media: The media object you're scrobbling. Must be either a
+            :class:`Movie` or :class:`TVEpisode` type
+        :param progress: The progress made through *media* at the time of
+            creation
+        :param app_version: The media center application version
+        :param app_date: The date that *app_version* was released
+        :param interval: The minimum number of seconds between two progress
+            updates sent to trakt. Trakt recommends 15 minutes
+        :param clock: The function returning the current time in seconds
+        """
+        self.interval, self.clock = interval, clock
+        self.playing = self.pending = self.stopped = False
+        self.last_sent = None
+        self._lock = threading.RLock()
+        super(DebouncedScrobbler, self).__init__(media, progress, app_version,
+                                                 app_date)
+
+    def _send(self, uri):
+        with self._lock:
+            # the progress stays pending if trakt couldn't be reached, so that
+            # it's sent again by the next update or flush
+            self._post(uri)
+            self.pending = False
+            self.last_sent = self.clock()
+
+    def start(self):
+        """Start, or resume, scrobbling this :class:`DebouncedScrobbler`'s
+        *media* object immediately
+        """
+        with self._lock:
+            self.playing, self.stopped = True, False
+            self._send('scrobble/start')
+
+    def pause(self):
+        """Pause the scrobbling of this :class:`DebouncedScrobbler`'s *media*
+        object immediately
+        """
+        with self._lock:
+            self.playing = False
+            self._send('scrobble/pause')
+
+    def stop(self):
+        """Stop the scrobbling of this :class:`DebouncedScrobbler`'s *media*
+        object immediately
+        """
+        with self._lock:
+            self.playing, self.stopped = False, True
+            self._send('scrobble/stop')
+
+    def update(self, progress):
+        """Record the latest progress through this :class:`DebouncedScrobbler`
+        's *media* object, only sending it if *interval* seconds have passed
+        since trakt was last updated. Updating a paused or stopped scrobble
+        resumes it immediately
+        """
+        with self._lock:
+            self.progress = progress
+            self.pending = True
+            if not self.playing or self.due():
+                self.start()
+
+    def due(self):
+        """Whether *interval* seconds have passed since trakt was last
+        updated
+        """
+        return (self.last_sent is None or
+                self.clock() - self.last_sent >= self.interval)
+
+    def flush(self, force=False):
+        """Send the latest progress if it hasn't been sent yet and, unless
+        *force* is set, *interval* seconds have passed since the last update
+
+        :return: `True` if an update was sent
+        """
+        with self._lock:
+            if self.playing and self.pending and (force or self.due()):
+                self.start()
+                return True
+        return False
+
+
+class ScrobbleScheduler(object):
+    """Sends the pending progress of many :class:`DebouncedScrobbler` sessions
+    from a single background thread, so that the last progress reported
+    before a long quiet period still reaches trakt once its interval is up::
+
+        scheduler = ScrobbleScheduler(interval=900).start()
+        scrobbler = scheduler.scrobbler(episode, 0.0, '1.0.0', '2015-02-01')
+        scrobbler.update(12.5)
+        ...
+        scheduler.stop()
+    """
+    def __init__(self, interval=900, resolution=1.0, clock=time.monotonic):
+        """Create a new :class:`ScrobbleScheduler`
+
+        :param interval: The minimum number of seconds between two progress
+            updates sent for any one session
+        :param resolution: How often, in seconds, the background thread checks
+            for pending updates
+        :param clock: The function returning the current time in seconds
+        """
+        self.interval, self.resolution = interval, resolution
+        self.clock = clock
+        self.sessions = []
+        self.logger = logging.getLogger('trakt.sync')
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def scrobbler(self, media, progress, app_version, app_date):
+        """Create a :class:`DebouncedScrobbler` session managed by this
+        scheduler. Sessions are forgotten once they are stopped
+        """
+        session = DebouncedScrobbler(media, progress, app_version, app_date,
+                                     interval=self.interval, clock=self.clock)
+        with self._lock:
+            self.sessions.append(session)
+        return session
+
+    def tick(self):
+        """Send the pending progress of every session which is due, and drop
+        sessions which have been stopped. A session whose update fails is
+        logged and keeps its progress pending, to be sent on a later tick
+
+        :return: The number of updates sent
+        """
+        with self._lock:
+            sessions = list(self.sessions)
+        sent = 0
+        for session in sessions:
+            try:
+                sent += bool(session.flush())
+            except Exception:
+                self.logger.warning('Sending the progress of %s failed',
+                                    session.media, exc_info=True)
+        with self._lock:
+            self.sessions = [session for session in self.sessions
+                             if not session.stopped]
+        return sent
+
+    def flush(self):
+        """Send the pending progress of every session, due or not"""
+        with self._lock:
+            sessions = list(self.sessions)
+        return sum(1 for session in sessions if session.flush(force=True))
+
+    def _run(self):
+        while not self._stopped.wait(self.resolution):
+            self.tick()
+
+    def start(self):
+        """Start the background thread sending pending updates"""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name='ScrobbleScheduler')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self, flush=True):
+        """Stop the background thread, first sending every pending update
+        unless *flush* is `False`
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.flush()
+
+
 class SearchResult(object):
     """A SearchResult is an individual result item from the trakt.tv search
     API. It wraps a single media entity whose type is indicated by the type
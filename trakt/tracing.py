@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Optional tracing of the phases of each Trakt.tv API call. When a
+:class:`Tracer` is set as the *tracer* of a :class:`trakt.core.Core`, every
+decorated call is recorded as a ``call`` span, containing a ``network`` span
+for the HTTP round trip, a ``decode`` span for parsing the JSON response and
+a ``build`` span for the post-processing that builds model objects. Calls
+made while building, ie by a property which lazily loads more data, are
+nested inside the ``build`` span which triggered them.
+"""
+import itertools
+import json
+import threading
+import time
+from collections import defaultdict
+
+__author__ = 'Jon Nappi'
+__all__ = ['Span', 'Tracer', 'InMemoryExporter', 'FileExporter', 'NULL_SPAN']
+
+_ids = itertools.count(1)
+
+
+class _NullSpan(object):
+    """A do-nothing context manager used in place of a span when tracing is
+    disabled
+    """
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+#: Shared context manager used when no :class:`Tracer` is configured
+NULL_SPAN = _NullSpan()
+
+
+class Span(object):
+    """A single timed phase of an API call"""
+    def __init__(self, name, parent=None, **attributes):
+        self.name = name
+        self.span_id = next(_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else \
+            self.span_id
+        self.attributes = attributes
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.error = None
+
+    def finish(self, error=None):
+        self.duration = time.perf_counter() - self._start
+        if error is not None:
+            self.error = error.__class__.__name__
+
+    def to_dict(self):
+        return {'name': self.name, 'span_id': self.span_id,
+                'parent_id': self.parent_id, 'trace_id': self.trace_id,
+                'thread': self.thread, 'start': self.start,
+                'duration': self.duration, 'error': self.error,
+                'attributes': self.attributes}
+
+    def __str__(self):
+        return '<Span {} ({:.6f}s)>'.format(self.name, self.duration or 0)
+    __repr__ = __str__
+
+
+class _SpanContext(object):
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span = None
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        parent = stack[-1] if stack else None
+        self.span = Span(self.name, parent, **self.attributes)
+        stack.append(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.tracer._stack().pop()
+        self.span.finish(exc_val)
+        self.tracer.exporter.export(self.span)
+        return False
+
+
+class Tracer(object):
+    """Creates spans and hands every finished span to an exporter. Spans are
+    nested per thread, so a :class:`Tracer` may be shared by several threads
+    """
+    def __init__(self, exporter=None):
+        """Create a new :class:`Tracer`
+
+        :param exporter: The exporter finished spans are handed to. Defaults
+            to a new :class:`InMemoryExporter`
+        """
+        self.exporter = exporter
+        if exporter is None:
+            self.exporter = InMemoryExporter()
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, **attributes):
+        """A context manager timing the code it wraps as a span called *name*,
+        nested inside the span currently open in this thread, if any
+        """
+        return _SpanContext(self, name, attributes)
+
+
+class InMemoryExporter(object):
+    """Keeps finished spans in memory, for inspection in-process"""
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self):
+        """Discard all collected spans"""
+        with self._lock:
+            del self.spans[:]
+
+    def totals(self):
+        """The total wall time, in seconds, spent in spans of each name. Note
+        that time spent in nested calls is counted by every span containing
+        it, ie a ``network`` span inside a ``build`` span counts towards both
+        """
+        totals = defaultdict(float)
+        with self._lock:
+            for span in self.spans:
+                totals[span.name] += span.duration
+        return dict(totals)
+
+    def exclusive_totals(self):
+        """The total wall time, in seconds, spent in spans of each name,
+        excluding the time spent in their child spans
+        """
+        with self._lock:
+            spans = list(self.spans)
+        child_time = defaultdict(float)
+        for span in spans:
+            if span.parent_id is not None:
+                child_time[span.parent_id] += span.duration
+        totals = defaultdict(float)
+        for span in spans:
+            totals[span.name] += span.duration - child_time[span.span_id]
+        return dict(totals)
+
+
+class FileExporter(object):
+    """Appends finished spans to a file, one JSON object per line"""
+    def __init__(self, path):
+        """Create a new :class:`FileExporter`
+
+        :param path: The path of the file to append spans to
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), default=str) + '\n'
+        with self._lock:
+            with open(self.path, 'a') as trace_file:
+                trace_file.write(line)
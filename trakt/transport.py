@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""Pluggable transports used by :class:`trakt.core.Core` to send HTTP
+requests. Any object providing a ``request(method, url, headers=None,
+params=None, body=None)`` method which returns an object with
+``status_code``, ``headers`` and ``content`` attributes may be used as a
+transport. GET requests pass their data as query *params*, all other
+requests pass it as a *body* which the transport must send JSON encoded.
+Transports accepting a *timeout* keyword argument, the number of seconds to
+wait for the response, are passed one whenever a timeout or a
+:class:`trakt.deadline.Deadline` applies to the request.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from urllib.parse import urlencode, urlsplit
+
+__author__ = 'Jon Nappi'
+__all__ = ['Response', 'SessionTransport', 'Urllib3Transport',
+           'HTTPXTransport', 'MemoryTransport', 'RecordingTransport',
+           'ReplayTransport', 'request_key']
+
+
+def request_key(method, url, params=None):
+    """Build the key identifying a request, made up of the upper cased HTTP
+    method and the uri relative to the API host, including the query string.
+    ie, ``GET shows/game-of-thrones?extended=full``
+
+    :param method: The HTTP method of the request
+    :param url: The fully qualified url of the request
+    :param params: Optional dict of query parameters sent with the request
+    """
+    parts = urlsplit(url)
+    uri = parts.path.lstrip('/')
+    query = parts.query
+    if params:
+        query = '&'.join(q for q in (query, urlencode(params)) if q)
+    if query:
+        uri += '?' + query
+    return '{method} {uri}'.format(method=method.upper(), uri=uri)
+
+
+class Response(object):
+    """A minimal HTTP response, exposing the same *status_code*, *headers*,
+    *content* and *reason* attributes as a :class:`requests.Response`.
+    Like theirs, its *headers* are looked up case-insensitively
+    """
+    #: Whether this response was served from a cache, see :mod:`trakt.cache`
+    from_cache = False
+
+    def __init__(self, status_code=200, headers=None, content=b'',
+                 reason=''):
+        # imported here, as requests itself is only imported when first used
+        from requests.structures import CaseInsensitiveDict
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+        self.reason = reason
+
+    @property
+    def text(self):
+        return self.content.decode('UTF-8', 'ignore')
+
+    def json(self):
+        return json.loads(self.text)
+
+    def __str__(self):
+        return '<Response [{}]>'.format(self.status_code)
+    __repr__ = __str__
+
+
+class SessionTransport(object):
+    """The default transport, sending requests through a
+    :class:`requests.Session`
+    """
+    def __init__(self, session=None):
+        """Create a new :class:`SessionTransport`
+
+        :param session: The session to send requests with. Defaults to the
+            global :data:`trakt.core.session`, looked up on every request so
+            that it may still be replaced at runtime
+        """
+        self._session = session
+
+    @property
+    def session(self):
+        if self._session is not None:
+            return self._session
+        from trakt import core
+        return core.session
+
+    def request(self, method, url, headers=None, params=None, body=None,
+                timeout=None):
+        if method == 'get':
+            return self.session.request(method, url, headers=headers,
+                                        params=params, timeout=timeout)
+        return self.session.request(method, url, headers=headers,
+                                    data=json.dumps(body), timeout=timeout)
+
+
+class Urllib3Transport(object):
+    """A transport sending requests straight through a
+    :class:`urllib3.PoolManager`, skipping the per request overhead of a
+    :class:`requests.Session` (hooks, cookies, redirect and proxy handling)
+    which trakt's API has no use for
+    """
+    def __init__(self, pool=None, **pool_kwargs):
+        """Create a new :class:`Urllib3Transport`
+
+        :param pool: Optional :class:`urllib3.PoolManager` to send requests
+            with. Created, on first use, from *pool_kwargs* otherwise
+        :param pool_kwargs: Extra keyword args for
+            :class:`urllib3.PoolManager`, ie *maxsize* or *retries*
+        """
+        self.pool_kwargs = pool_kwargs
+        self._pool = pool
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    import urllib3
+                    self._pool = urllib3.PoolManager(**self.pool_kwargs)
+        return self._pool
+
+    def request(self, method, url, headers=None, params=None, body=None,
+                timeout=None):
+        headers = {k: v for k, v in (headers or {}).items() if v is not None}
+        # without a timeout, the timeout the pool was created with applies
+        extra = {} if timeout is None else {'timeout': timeout}
+        if method == 'get':
+            if params:
+                url += ('&' if '?' in url else '?') + urlencode(params)
+            response = self.pool.request('GET', url, headers=headers, **extra)
+        else:
+            response = self.pool.request(method.upper(), url, headers=headers,
+                                         body=json.dumps(body).encode('UTF-8'),
+                                         **extra)
+        return Response(response.status, response.headers,
+                        response.data, response.reason or '')
+
+
+class HTTPXTransport(object):
+    """A transport sending requests through an :class:`httpx.AsyncClient`,
+    which multiplexes concurrent requests over a few HTTP/2 connections
+    rather than opening an HTTP/1.1 connection per in-flight request.
+    Requires the optional httpx dependency, installed with
+    ``pip install trakt[http2]``
+
+    The synchronous HTTP/2 connections of httpx aren't safe to share between
+    threads: threads opening streams at the same time may send them out of
+    order, which the server rejects. The client is therefore driven by an
+    event loop running in a thread of its own, and calling threads wait for
+    their response while the loop multiplexes every request in flight.
+    """
+    def __init__(self, http2=True, client=None, **client_kwargs):
+        """Create a new :class:`HTTPXTransport`
+
+        :param http2: Whether to negotiate HTTP/2 with the server
+        :param client: Optional :class:`httpx.AsyncClient` to send requests
+            with. Created, on first use, from *http2* and *client_kwargs*
+            otherwise
+        :param client_kwargs: Extra keyword args for
+            :class:`httpx.AsyncClient`, ie *limits* or *timeout*
+        """
+        self.http2 = http2
+        self.client_kwargs = client_kwargs
+        self._client = client
+        self._loop = self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """The :class:`httpx.AsyncClient` every request is sent with"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import httpx
+                    self._client = httpx.AsyncClient(http2=self.http2,
+                                                     **self.client_kwargs)
+        return self._client
+
+    @property
+    def loop(self):
+        """The event loop driving :attr:`client`, started on first use"""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(
+                        target=loop.run_forever, name='HTTPXTransport',
+                        daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return self._loop
+
+    def request(self, method, url, headers=None, params=None, body=None,
+                timeout=None):
+        # requests drops headers whose value is None, httpx rejects them
+        headers = {k: v for k, v in (headers or {}).items() if v is not None}
+        # without a timeout, the timeout the client was created with applies
+        extra = {} if timeout is None else {'timeout': timeout}
+        if method == 'get':
+            extra['params'] = params
+        else:
+            extra['content'] = json.dumps(body)
+        request = self.client.request(method, url, headers=headers, **extra)
+        return asyncio.run_coroutine_threadsafe(request, self.loop).result()
+
+    def close(self):
+        """Close the connections held open by the client and stop its event
+        loop
+        """
+        with self._lock:
+            client, loop, thread = self._client, self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            if client is not None:
+                asyncio.run(client.aclose())
+            return
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+class MemoryTransport(object):
+    """A transport serving canned responses from memory. Response bodies are
+    encoded once, when they're added, and the encoded bytes are shared by
+    every response served. Each request therefore decodes a private copy of
+    just the data it asked for, and nothing a caller does to its decoded data
+    can leak into later responses.
+    """
+    def __init__(self, missing_status=404):
+        """Create a new, empty :class:`MemoryTransport`
+
+        :param missing_status: The status code returned for requests that
+            have no canned response
+        """
+        self.missing_status = missing_status
+        self._responses = {}
+
+    @classmethod
+    def from_mock_data(cls, data, **kwargs):
+        """Create a :class:`MemoryTransport` from a dict mapping uris to dicts
+        of HTTP methods and their decoded JSON responses, ie
+        ``{'shows/trending': {'GET': [...]}}``
+        """
+        transport = cls(**kwargs)
+        for uri, methods in data.items():
+            for method, body in methods.items():
+                transport.add(method, uri, body)
+        return transport
+
+    def __len__(self):
+        return len(self._responses)
+
+    def add(self, method, uri, body, status_code=None, headers=None):
+        """Add a canned response
+
+        :param method: The HTTP method to respond to
+        :param uri: The uri to respond to, relative to the API host
+        :param body: The JSON serializable response body. A body of `None`
+            results in a 204 No Content response
+        :param status_code: Optional status code overriding the default
+        :param headers: Optional dict of response headers
+        """
+        if body is None:
+            content = b''
+            status_code = status_code or 204
+        else:
+            content = json.dumps(body).encode('UTF-8')
+        self.add_raw(method, uri, content, status_code or 200, headers)
+
+    def add_raw(self, method, uri, content, status_code=200, headers=None):
+        """Add a canned response with an already encoded body"""
+        key = request_key(method, uri)
+        self._responses[key] = (status_code, dict(headers or {}), content)
+
+    def _lookup(self, key):
+        return self._responses.get(key)
+
+    def request(self, method, url, headers=None, params=None, body=None,
+                timeout=None):
+        canned = self._lookup(request_key(method, url, params))
+        if canned is None:
+            return Response(self.missing_status)
+        status_code, response_headers, content = canned
+        return Response(status_code, dict(response_headers), content)
+
+
+class RecordingTransport(object):
+    """A transport which passes requests through to another transport and
+    records every response, headers included, to a cassette file which can
+    later be served by a :class:`ReplayTransport`
+    """
+    def __init__(self, path, transport=None):
+        """Create a new :class:`RecordingTransport`
+
+        :param path: The path of the cassette file to record to
+        :param transport: The transport to pass requests through to. Defaults
+            to a :class:`SessionTransport`
+        """
+        self.path = path
+        self.transport = transport
+        if transport is None:
+            self.transport = SessionTransport()
+        self.interactions = []
+
+    def request(self, method, url, headers=None, params=None, body=None,
+                timeout=None):
+        extra = {} if timeout is None else {'timeout': timeout}
+        response = self.transport.request(method, url, headers=headers,
+                                          params=params, body=body, **extra)
+        self.interactions.append({
+            'request': request_key(method, url, params),
+            'status_code': response.status_code,
+            'headers': dict(response.headers),
+            'body': response.content.decode('UTF-8', 'ignore'),
+        })
+        return response
+
+    def save(self):
+        """Write all recorded interactions to the cassette file"""
+        with open(self.path, 'w') as cassette:
+            json.dump({'interactions': self.interactions}, cassette, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.save()
+
+
+class ReplayTransport(MemoryTransport):
+    """A transport serving the responses recorded in a cassette file by a
+    :class:`RecordingTransport`. Requests which were recorded several times
+    are served their recordings in order, the last one being repeated once
+    the others have been used up.
+    """
+    def __init__(self, path, latency=0.0):
+        """Create a new :class:`ReplayTransport`
+
+        :param path: The path of the cassette file to replay
+        :param latency: Optional latency, in seconds, to inject before serving
+            each response. May also be a callable returning the latency to
+            use, for simulating jittery networks. Requests whose *timeout* is
+            shorter raise a :class:`TimeoutError` once it has passed
+        """
+        super(ReplayTransport, self).__init__()
+        self.latency = latency
+        with open(path) as cassette:
+            interactions = json.load(cassette)['interactions']
+        for interaction in interactions:
+            canned = (interaction['status_code'], interaction['headers'],
+                      interaction['body'].encode('UTF-8'))
+            queue = self._responses.setdefault(interaction['request'],
+                                               deque())
+            queue.append(canned)
+
+    def _lookup(self, key):
+        queue = self._responses.get(key)
+        if not queue:
+            raise KeyError('No recorded response for {}'.format(key))
+        return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def request(self, method, url, headers=None, params=None, body=None,
+                timeout=None):
+        latency = self.latency() if callable(self.latency) else self.latency
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError('{} timed out'.format(
+                request_key(method, url, params)))
+        if latency:
+            time.sleep(latency)
+        return super(ReplayTransport, self).request(method, url, headers,
+                                                    params, body)
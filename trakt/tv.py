@@ -2,8 +2,10 @@
 """Interfaces to all of the TV objects offered by the Trakt.tv API"""
 from collections import namedtuple
 from datetime import datetime, timedelta
+from trakt.comments import iter_comments
 from trakt.core import Airs, Alias, Comment, Genre, delete, get
 from trakt.errors import NotFoundException
+from trakt.extended import FULL, ExtendedField, extended_level
 from trakt.sync import (Scrobbler, rate, comment, add_to_collection,
                         add_to_watchlist, add_to_history, remove_from_history,
                         remove_from_collection, remove_from_watchlist, search,
@@ -89,7 +91,13 @@ def updated_shows(timestamp=None, page=1, limit=10, extended=None):
         uri += '&extended={extended}'.format(extended=extended)
 
     data = yield uri
-    yield [TVShow(**show) for show in data]
+    to_ret = []
+    for show in data:
+        show_data = show.pop('show')
+        extract_ids(show_data)
+        show_data.update({'updated_at': show.pop('updated_at')})
+        to_ret.append(TVShow(**show_data))
+    yield to_ret
 
 
 @get
@@ -196,13 +204,35 @@ def anticipated_shows(page=1, limit=10, extended=None):
 
 
 class TVShow(object):
-    """A Class representing a TV Show object."""
+    """A Class representing a TV Show object. Fields only returned at the
+    ``full`` extended level are fetched on first access if this show was built
+    from minimal data, see :mod:`trakt.extended`
+    """
+    overview = ExtendedField()
+    first_aired = ExtendedField()
+    airs = ExtendedField()
+    runtime = ExtendedField()
+    certification = ExtendedField()
+    network = ExtendedField()
+    country = ExtendedField()
+    updated_at = ExtendedField(infer=False)
+    trailer = ExtendedField()
+    homepage = ExtendedField()
+    status = ExtendedField()
+    rating = ExtendedField(infer=False)
+    votes = ExtendedField(infer=False)
+    language = ExtendedField()
+    available_translations = ExtendedField()
+    genres = ExtendedField()
+    aired_episodes = ExtendedField()
+    comment_count = ExtendedField()
 
     def __init__(self, title='', slug=None, **kwargs):
         super(TVShow, self).__init__()
+        self._extended = None
         self.media_type = 'shows'
         self.top_watchers = self.top_episodes = self.year = self.tvdb = None
-        self.imdb = self.genres = self.certification = self.network = None
+        self.imdb = None
         self.trakt = self.tmdb = self._aliases = self._comments = None
         self._images = self._people = self._ratings = self._translations = None
         self._seasons = None
@@ -235,14 +265,25 @@ class TVShow(object):
         return search(title, search_type='show', year=year)
 
     @get
-    def _get(self):
-        data = yield self.ext_full
-        data['first_aired'] = airs_date(data['first_aired'])
-        data['airs'] = Airs(**data['airs'])
-        self._build(data)
+    def _get(self, extended=FULL):
+        data = yield self.ext + '?extended={}'.format(extended)
+        self._build(self._parse_fetched(data))
+        self._extended = extended
+
+    @staticmethod
+    def _parse_fetched(data):
+        """Parse the air dates of show *data* fetched by uri, which listings
+        leave as they were returned
+        """
+        if data.get('first_aired') is not None:
+            data['first_aired'] = airs_date(data['first_aired'])
+        if data.get('airs') is not None:
+            data['airs'] = Airs(**data['airs'])
+        return data
 
     def _build(self, data):
         extract_ids(data)
+        self._extended = self._extended or extended_level(type(self), data)
         for key, val in data.items():
             if hasattr(self, '_' + key):
                 setattr(self, '_' + key, val)
@@ -283,9 +324,9 @@ class TVShow(object):
     @get
     def comments(self):
         """All comments (shouts and reviews) for this :class:`TVShow`. Most
-        recent comments returned first.
+        recent comments returned first. Only the first page of comments is
+        returned, use :meth:`iter_comments` to stream all of them.
         """
-        # TODO (jnappi) Pagination
         from .users import User
 
         data = yield self.ext + '/comments'
@@ -295,6 +336,12 @@ class TVShow(object):
             self._comments.append(Comment(user=user, **com))
         yield self._comments
 
+    def iter_comments(self, sort=None, limit=100):
+        """Iterate over every comment on this :class:`TVShow`, requesting
+        them a page at a time. See :func:`trakt.comments.iter_comments`
+        """
+        return iter_comments(self.ext + '/comments', sort=sort, limit=limit)
+
     @property
     @get
     def progress(self):
@@ -305,7 +352,23 @@ class TVShow(object):
         The next_episode will be the next episode the user should collect,
         if there are no upcoming episodes it will be set to null.
         """
-        yield (self.ext + '/progress/collection')
+        data = yield self.ext + '/progress/collection'
+        yield data
+
+    @property
+    @get
+    def watched_progress(self):
+        """
+        watched progress for a show including details on all aired seasons
+        and episodes.
+
+        The next_episode will be the next episode the user should watch, if
+        there are no upcoming episodes it will be set to null. Use
+        :func:`trakt.progress.watched_progress` to compute the progress of
+        every show a user has watched at once.
+        """
+        data = yield self.ext + '/progress/watched'
+        yield data
 
     @property
     def crew(self):
@@ -540,9 +603,9 @@ class TVSeason(object):
     @get
     def comments(self):
         """All comments (shouts and reviews) for this :class:`TVSeason`. Most
-        recent comments returned first.
+        recent comments returned first. Only the first page of comments is
+        returned, use :meth:`iter_comments` to stream all of them.
         """
-        # TODO (jnappi) Pagination
         from .users import User
 
         data = yield self.ext + '/comments'
@@ -553,6 +616,12 @@ class TVSeason(object):
             self._comments.append(comment)
         yield self._comments
 
+    def iter_comments(self, sort=None, limit=100):
+        """Iterate over every comment on this :class:`TVSeason`, requesting
+        them a page at a time. See :func:`trakt.comments.iter_comments`
+        """
+        return iter_comments(self.ext + '/comments', sort=sort, limit=limit)
+
     @property
     def episodes(self):
         """A list of :class:`TVEpisode` objects representing all of the
@@ -680,9 +749,9 @@ class TVEpisode(object):
     @get
     def comments(self):
         """All comments (shouts and reviews) for this :class:`TVEpisode`. Most
-        recent comments returned first.
+        recent comments returned first. Only the first page of comments is
+        returned, use :meth:`iter_comments` to stream all of them.
         """
-        # TODO (jnappi) Pagination
         from .users import User
 
         data = yield self.ext + '/comments'
@@ -692,6 +761,12 @@ class TVEpisode(object):
             self._comments.append(Comment(user=user, **com))
         yield self._comments
 
+    def iter_comments(self, sort=None, limit=100):
+        """Iterate over every comment on this :class:`TVEpisode`, requesting
+        them a page at a time. See :func:`trakt.comments.iter_comments`
+        """
+        return iter_comments(self.ext + '/comments', sort=sort, limit=limit)
+
     @property
     def ext(self):
         return 'shows/{id}/seasons/{season}/episodes/{episode}'.format(
@@ -5,7 +5,7 @@ from trakt.core import get, post, delete
 from trakt.movies import Movie
 from trakt.people import Person
 from trakt.tv import TVShow, TVSeason, TVEpisode
-from trakt.utils import slugify, extract_ids
+from trakt.utils import slugify, extract_ids, paginate
 
 __author__ = 'Jon Nappi'
 __all__ = ['User', 'UserList', 'Request', 'follow', 'get_all_requests',
@@ -60,6 +60,33 @@ def unfollow(user_name):
     yield 'users/{username}/follow'.format(username=slugify(user_name))
 
 
+def _build_list_items(data):
+    """Build the class instances for the items in a list's *data*, using the
+    media data embedded in each item rather than requesting it again
+    """
+    items = []
+    for item in data:
+        # match list item type
+        if 'type' not in item:
+            continue
+        item_type = item['type']
+        item_data = extract_ids(item.pop(item_type))
+        if item_type == 'movie':
+            items.append(Movie(**item_data))
+        elif item_type == 'show':
+            items.append(TVShow(**item_data))
+        elif item_type == 'season':
+            show_data = extract_ids(item.pop('show'))
+            items.append(TVSeason(show_data['title'], item_data['number'],
+                                  show_data['slug'], **item_data))
+        elif item_type == 'episode':
+            show_data = extract_ids(item.pop('show'))
+            items.append(TVEpisode(show_data['title'], **item_data))
+        elif item_type == 'person':
+            items.append(Person(**item_data))
+    return items
+
+
 class UserList(namedtuple('UserList', ['name', 'description', 'privacy',
                                        'display_numbers', 'allow_comments',
                                        'sort_by', 'sort_how', 'created_at',
@@ -123,37 +150,25 @@ class UserList(namedtuple('UserList', ['name', 'description', 'privacy',
         data = yield 'users/{user}/lists/{id}/items'.format(
             user=slugify(self.creator), id=self.slug)
 
-        for item in data:
-            # match list item type
-            if 'type' not in item:
-                continue
-            item_type = item['type']
-            item_data = item.pop(item_type)
-            extract_ids(item_data)
-            if item_type == 'movie':
-                self._items.append(Movie(item_data['title'], item_data['year'],
-                                         item_data['slug']))
-            elif item_type == 'show':
-                self._items.append(TVShow(item_data['title'],
-                                          item_data['slug']))
-            elif item_type == 'season':
-                show_data = item.pop('show')
-                extract_ids(show_data)
-                season = TVSeason(show_data['title'], item_data['number'],
-                                  show_data['slug'])
-                self._items.append(season)
-            elif item_type == 'episode':
-                show_data = item.pop('show')
-                extract_ids(show_data)
-                episode = TVEpisode(show_data['title'], item_data['season'],
-                                    item_data['number'])
-                self._items.append(episode)
-            elif item_type == 'person':
-                self._items.append(Person(item_data['name'],
-                                          item_data['slug']))
-
+        self._items.extend(_build_list_items(data))
         yield self._items
 
+    @get
+    def _get_items_page(self, page, limit):
+        """A single page of this list's items, as built class instances"""
+        uri = 'users/{user}/lists/{id}/items?page={page}&limit={limit}'
+        data = yield uri.format(user=slugify(self.creator), id=self.slug,
+                                page=page, limit=limit)
+        yield _build_list_items(data or [])
+
+    def iter_items(self, limit=100):
+        """Iterate over the items in this list, requesting them from trakt a
+        page at a time rather than all at once
+
+        :param limit: The number of items to request per page
+        """
+        return paginate(self._get_items_page, limit=limit)
+
     @post
     def add_items(self, *items):
         """Add *items* to this :class:`UserList`, where items is an iterable"""
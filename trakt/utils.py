@@ -2,9 +2,28 @@
 import re
 import unicodedata
 from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from trakt.deadline import DeadlineExceeded, allows_partial
 
 __author__ = 'Jon Nappi'
-__all__ = ['slugify', 'airs_date', 'now', 'timestamp', 'extract_ids']
+__all__ = ['slugify', 'airs_date', 'now', 'timestamp', 'extract_ids',
+           'paginate', 'endpoint_template']
+
+#: Path segments which are followed by the id or slug of a resource
+_ID_PARENTS = {'shows', 'movies', 'people', 'users', 'seasons', 'episodes',
+               'lists', 'comments', 'imdb', 'tmdb', 'tvdb', 'trakt'}
+
+#: Path segments which name a collection of resources, rather than identify
+#: a single one, despite following one of the *_ID_PARENTS*, or which filter
+#: or sort a listing, like the ``newest`` of ``shows/{id}/comments/newest``
+_STATIC_SEGMENTS = {'added', 'all', 'anticipated', 'boxoffice',
+                    'collaborations', 'collected', 'favorites', 'hidden',
+                    'highest', 'items', 'likes', 'lowest', 'newest',
+                    'official', 'oldest', 'personal', 'played', 'plays',
+                    'popular', 'recent', 'recommended', 'replies', 'requests',
+                    'settings', 'trending', 'updated', 'updates', 'watched',
+                    'watchlists'}
 
 
 def slugify(value):
@@ -50,3 +69,48 @@ def extract_ids(id_dict):
     """
     id_dict.update(id_dict.pop('ids', {}))
     return id_dict
+
+
+def paginate(fetch, limit=100, page=1):
+    """Iterate over every item of a paginated trakt endpoint, requesting pages
+    until a short (or empty) page signals that the last page was reached.
+    Iteration ends early, rather than raising, when a
+    :class:`trakt.deadline.Deadline` created with *partial* runs out.
+
+    :param fetch: A callable accepting *page* and *limit* keyword args and
+        returning a list of items for that page
+    :param limit: The number of items to request per page
+    :param page: The page to start from
+    """
+    while True:
+        try:
+            items = fetch(page=page, limit=limit) or []
+        except DeadlineExceeded:
+            if not allows_partial():
+                raise
+            return
+        for item in items:
+            yield item
+        if len(items) < limit:
+            return
+        page += 1
+
+
+def endpoint_template(url):
+    """Reduce a request *url* to the template of the endpoint it targets by
+    dropping the host and query string and replacing ids, slugs and dates
+    with placeholders, ie ``shows/{id}/seasons/{id}`` for
+    ``https://api.trakt.tv/shows/game-of-thrones/seasons/1?extended=full``
+    """
+    segments = [s for s in urlsplit(url).path.split('/') if s]
+    template = []
+    for index, segment in enumerate(segments):
+        parent = segments[index - 1] if index else None
+        if re.match(r'^\d{4}-\d{2}-\d{2}', segment):
+            template.append('{date}')
+        elif segment.isdigit() or (parent in _ID_PARENTS and
+                                   segment not in _STATIC_SEGMENTS):
+            template.append('{id}')
+        else:
+            template.append(segment)
+    return '/'.join(template)